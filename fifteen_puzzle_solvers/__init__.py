@@ -1 +1,6 @@
-from .main import run_ui
+def __getattr__(name):
+    # the UI needs tkinter, which is only imported when the UI is started
+    if name == 'run_ui':
+        from .main import run_ui
+        return run_ui
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,5 @@
+import sys
+
+from fifteen_puzzle_solvers.cli import main
+
+sys.exit(main())
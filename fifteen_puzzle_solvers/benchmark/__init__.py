@@ -0,0 +1,2 @@
+from .instances import INSTANCE_SETS, random_instances, scrambled_instances, load_instances
+from .runner import run_benchmark, compare_results, format_table
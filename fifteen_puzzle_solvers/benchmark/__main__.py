@@ -0,0 +1,86 @@
+import argparse
+import json
+import sys
+
+from fifteen_puzzle_solvers.benchmark.instances import DEFAULT_SEED, INSTANCE_SETS, load_instances
+from fifteen_puzzle_solvers.benchmark.runner import compare_results, format_table, get_environment, run_benchmark
+from fifteen_puzzle_solvers.services.puzzle.constants import ASTAR, IDA_STAR
+from fifteen_puzzle_solvers.services.registry import registry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m fifteen_puzzle_solvers.benchmark',
+                                     description='Benchmarks the puzzle solvers on fixed instance sets')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    run_parser = commands.add_parser('run', help='solve the instance sets with every strategy and heuristic')
+    run_parser.add_argument('--set', dest='sets', action='append', choices=sorted(INSTANCE_SETS),
+                            help='seeded instance set (default: random-3x3 and scramble-4x4)')
+    run_parser.add_argument('--instances', action='append', default=[],
+                            help='file with one position per line, tiles separated by whitespace')
+    run_parser.add_argument('--blank-first', action='store_true',
+                            help='the instance files use the end position with the blank in the top left corner')
+    run_parser.add_argument('--strategy', dest='strategies', action='append',
+                            choices=sorted(registry.strategies),
+                            help=f'(default: {ASTAR} and {IDA_STAR})')
+    run_parser.add_argument('--heuristic', dest='heuristics', action='append', choices=list(registry.heuristics),
+                            help='heuristic of the informed strategies (default: the strategy default)')
+    run_parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    run_parser.add_argument('--timeout', type=float, default=60, help='seconds per instance (default: 60)')
+    run_parser.add_argument('--output', help='write the results as JSON to this file, - for stdout')
+
+    compare_parser = commands.add_parser('compare', help='report the regressions between two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--tolerance', type=float, default=0.1,
+                                help='allowed relative change of the measurements (default: 0.1)')
+
+    args = parser.parse_args(argv)
+    if args.command == 'compare':
+        return _compare(args)
+    return _run(args)
+
+
+def _run(args):
+    instance_sets = {}
+    for name in args.sets or ([] if args.instances else ['random-3x3', 'scramble-4x4']):
+        instance_sets[name] = INSTANCE_SETS[name](args.seed)
+    for path in args.instances:
+        instance_sets[path] = load_instances(path, blank_first=args.blank_first)
+
+    pairs = []
+    for strategy in args.strategies or [ASTAR, IDA_STAR]:
+        heuristics = args.heuristics if registry.get_strategy(strategy).uses_heuristic else None
+        for heuristic in heuristics or [None]:
+            pairs.append((strategy, heuristic))
+
+    results = run_benchmark(instance_sets, pairs, timeout=args.timeout)
+    report = {'environment': get_environment(args.seed), 'results': results}
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print(format_table(results))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+    return 0
+
+
+def _compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = compare_results(baseline['results'], current['results'], tolerance=args.tolerance)
+    for regression in regressions:
+        print(regression)
+    if not regressions:
+        print('No regressions')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
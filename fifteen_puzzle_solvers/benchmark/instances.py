@@ -0,0 +1,66 @@
+import random
+from typing import List
+
+from fifteen_puzzle_solvers.domain import Puzzle, PuzzleEncoder
+from fifteen_puzzle_solvers.services.puzzle.shuffle import PuzzleShuffleService
+
+DEFAULT_SEED = 15
+
+
+def random_instances(size: int, count: int, seed: int = DEFAULT_SEED) -> List[Puzzle]:
+    """
+    Uniformly random solvable positions, drawn from a generator of their own so the set only depends on the seed
+    """
+    generator = random.Random(seed)
+    return [PuzzleShuffleService.shuffle_puzzle(size, generator) for _ in range(count)]
+
+
+def scrambled_instances(size: int, depths, count: int, seed: int = DEFAULT_SEED) -> List[Puzzle]:
+    """
+    Random walks from the end position of every given depth, which never undo the previous move.
+    The optimal solution can be shorter than the walk, but it never is longer.
+    """
+    generator = random.Random(seed)
+    encoder = PuzzleEncoder.for_size(size)
+    instances = []
+    for depth in depths:
+        for _ in range(count):
+            state, blank, previous_blank = encoder.end_state, encoder.end_blank, -1
+            for _ in range(depth):
+                state, _, move_blank = generator.choice(encoder.get_successors(state, blank, previous_blank))
+                previous_blank, blank = blank, move_blank
+            instances.append(Puzzle(encoder.decode(state)))
+    return instances
+
+
+def load_instances(path: str, blank_first: bool = False) -> List[Puzzle]:
+    """
+    Reads one position per line as whitespace separated tiles in row-major order, with 0 for the blank.
+    Empty lines and lines starting with # are skipped.
+
+    Published instance sets, such as the 100 instances of Korf (1985), are stated for the end position with the
+    blank in the top left corner. With blank_first the positions are rotated by 180 degrees and relabeled
+    (tile t becomes n*n - t), which maps them to the end position used here without changing their distances.
+    """
+    instances = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            tiles = [int(tile) for tile in line.split()]
+            size = int(len(tiles) ** 0.5)
+            if size * size != len(tiles) or sorted(tiles) != list(range(size * size)):
+                raise RuntimeError(f'Invalid puzzle position: {line}')
+            if blank_first:
+                tiles = [len(tiles) - tile if tile else 0 for tile in reversed(tiles)]
+            instances.append(Puzzle([tiles[i:i + size] for i in range(0, len(tiles), size)]))
+    return instances
+
+
+INSTANCE_SETS = {
+    'random-3x3': lambda seed: random_instances(3, 20, seed),
+    'scramble-3x3': lambda seed: scrambled_instances(3, (10, 20, 30), 5, seed),
+    'scramble-4x4': lambda seed: scrambled_instances(4, (10, 20, 30, 40), 5, seed),
+    'random-4x4': lambda seed: random_instances(4, 10, seed),
+}
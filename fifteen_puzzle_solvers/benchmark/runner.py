@@ -0,0 +1,131 @@
+import multiprocessing
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fifteen_puzzle_solvers.domain import Puzzle
+from fifteen_puzzle_solvers.services.registry import registry
+from fifteen_puzzle_solvers.services.solver import PuzzleSolver
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def run_benchmark(instance_sets: Dict[str, List[Puzzle]], pairs: Iterable[Tuple[str, Optional[str]]],
+                  timeout: float = None) -> List[dict]:
+    """
+    Solves every instance set with every (strategy, heuristic) pair and returns one result per combination.
+    Each combination runs in a fresh process, so the peak memory of one search does not hide the next one.
+    """
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for set_name, puzzles in instance_sets.items():
+        for strategy_name, heuristic in pairs:
+            registry.get_strategy(strategy_name)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(_run_pair, puzzles, strategy_name, heuristic, timeout).result()
+            result['instance_set'] = set_name
+            results.append(result)
+    return results
+
+
+def get_environment(seed: int) -> dict:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'seed': seed,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare_results(baseline: List[dict], current: List[dict], tolerance: float = 0.1) -> List[str]:
+    """
+    Returns a description of every regression of the current results against the baseline.
+    Expanded nodes, wall time, peak memory and throughput may change by the tolerance (a fraction of the baseline)
+    before they are reported, while solving fewer instances or finding longer solutions is always a regression.
+    """
+    regressions = []
+    baseline_results = {_result_key(result): result for result in baseline}
+    for result in current:
+        key = _result_key(result)
+        previous = baseline_results.get(key)
+        if previous is None:
+            continue
+        name = ' / '.join(part or '-' for part in key)
+
+        if result['solved'] < previous['solved']:
+            regressions.append(f'{name}: solved {result["solved"]} instances, {previous["solved"]} before')
+        longer = sum(1 for length, previous_length in zip(result['solution_lengths'], previous['solution_lengths'])
+                     if length > previous_length >= 0)
+        if longer:
+            regressions.append(f'{name}: {longer} solutions are longer than before')
+
+        for metric, higher_is_better in (('expanded_nodes', False), ('wall_time', False), ('peak_rss', False),
+                                         ('nodes_per_second', True)):
+            value, previous_value = result.get(metric), previous.get(metric)
+            if not value or not previous_value:
+                continue
+            change = (value - previous_value) / previous_value
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(f'{name}: {metric} changed by {change:+.1%} ({previous_value} -> {value})')
+    return regressions
+
+
+def format_table(results: List[dict]) -> str:
+    header = ('Instance set', 'Strategy', 'Heuristic', 'Solved', 'Expanded nodes', 'Nodes/sec', 'Wall time (s)',
+              'Peak RSS (MB)')
+    rows = [header]
+    for result in results:
+        peak_rss = result['peak_rss']
+        rows.append((
+            result['instance_set'],
+            result['strategy'],
+            result['heuristic'] or '-',
+            f'{result["solved"]}/{result["instances"]}',
+            str(result['expanded_nodes']),
+            f'{result["nodes_per_second"]:.0f}',
+            f'{result["wall_time"]:.2f}',
+            f'{peak_rss / 2 ** 20:.1f}' if peak_rss else '-',
+        ))
+    widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+    lines = ['  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows]
+    lines.insert(1, '  '.join('-' * width for width in widths))
+    return '\n'.join(lines)
+
+
+def _result_key(result):
+    return result['instance_set'], result['strategy'], result['heuristic']
+
+
+def _run_pair(puzzles, strategy_name, heuristic, timeout) -> dict:
+    strategy = registry.get_strategy_class(strategy_name)
+    results = sorted(PuzzleSolver.solve_many(puzzles, strategy, heuristic=heuristic, workers=1, timeout=timeout),
+                     key=lambda result: result.index)
+    expanded_nodes = sum(result.num_expanded_nodes for result in results)
+    wall_time = sum(result.wall_time for result in results)
+    return {
+        'strategy': strategy_name,
+        'heuristic': heuristic,
+        'instances': len(results),
+        'solved': sum(1 for result in results if result.solution_length >= 0 and not result.timed_out),
+        'timed_out': sum(1 for result in results if result.timed_out),
+        'expanded_nodes': expanded_nodes,
+        'wall_time': wall_time,
+        'nodes_per_second': expanded_nodes / wall_time if wall_time else 0.0,
+        'peak_rss': _get_peak_rss(),
+        'solution_lengths': [result.solution_length if not result.timed_out else -1 for result in results],
+    }
+
+
+def _get_peak_rss() -> Optional[int]:
+    """Peak resident memory of this process in bytes"""
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == 'darwin' else peak_rss * 1024  # kilobytes everywhere but macOS
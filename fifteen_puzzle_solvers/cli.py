@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from fifteen_puzzle_solvers.domain import Puzzle
+from fifteen_puzzle_solvers.services.puzzle.constants import IDA_STAR
+from fifteen_puzzle_solvers.services.registry import registry
+from fifteen_puzzle_solvers.services.solver import PuzzleSolver, SolveResult
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fifteen-puzzle', description='Solves sliding puzzles without the GUI')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    solve_parser = commands.add_parser(
+        'solve', help='solve the boards of a NDJSON stream and write one NDJSON result per board',
+        description='Every input line is a board: a JSON array of rows or of tiles (0 for the blank), or an object '
+                    'with the board under "position" or "tiles" and an optional "id" that is copied to the result.')
+    solve_parser.add_argument('input', nargs='?', default='-', help='NDJSON file of boards (default: stdin)')
+    solve_parser.add_argument('--strategy', default=IDA_STAR, choices=list(registry.strategies),
+                              help=f'(default: {IDA_STAR})')
+    solve_parser.add_argument('--heuristic', choices=list(registry.heuristics),
+                              help='heuristic of the informed strategies (default: the strategy default)')
+    solve_parser.add_argument('--workers', type=int, default=1, help='worker processes (default: 1)')
+    solve_parser.add_argument('--timeout', type=float, help='seconds per board')
+    solve_parser.add_argument('--max-nodes', type=int, help='expanded nodes per board')
+
+    serve_parser = commands.add_parser('serve', help='serve solves over HTTP/JSON on a local port')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8015)
+    serve_parser.add_argument('--strategy', default=IDA_STAR, choices=list(registry.strategies),
+                              help=f'default strategy of the requests (default: {IDA_STAR})')
+    serve_parser.add_argument('--heuristic', choices=list(registry.heuristics),
+                              help='default heuristic of the requests (default: the strategy default)')
+    serve_parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    serve_parser.add_argument('--max-queued', type=int, default=100,
+                              help='solves waiting for a worker before new ones are rejected (default: 100)')
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        return _serve(args)
+    return _solve(args)
+
+
+def _solve(args):
+    strategy = registry.get_strategy_class(args.strategy)
+    heuristic = args.heuristic if registry.get_strategy(args.strategy).uses_heuristic else None
+    output = sys.stdout
+    ids = []  # id of every board handed to the solver, by its index in the batch
+
+    def write(record):
+        output.write(json.dumps(record) + '\n')
+        output.flush()
+
+    def read_puzzles(lines):
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                board_id, puzzle = parse_board(json.loads(line), line_number)
+            except (ValueError, TypeError) as e:
+                write({'id': line_number, 'error': str(e)})
+                continue
+            ids.append(board_id)
+            yield puzzle
+
+    input_file = sys.stdin if args.input == '-' else open(args.input)
+    try:
+        for result in PuzzleSolver.solve_many(read_puzzles(input_file), strategy, heuristic=heuristic,
+                                              workers=args.workers, timeout=args.timeout, max_nodes=args.max_nodes):
+            write(result_record(ids[result.index], result))
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+    return 0
+
+
+def _serve(args):
+    from fifteen_puzzle_solvers.server import serve
+
+    try:
+        asyncio.run(serve(args.host, args.port, strategy=args.strategy, heuristic=args.heuristic,
+                          workers=args.workers, max_queued_jobs=args.max_queued))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def parse_board(board, default_id=None):
+    """
+    Returns the id and the puzzle of a decoded JSON board: an array of rows or of tiles, or an object with the
+    board under "position" or "tiles" and an optional "id" (default_id otherwise)
+    """
+    board_id = default_id
+    if isinstance(board, dict):
+        board_id = board.get('id', default_id)
+        board = board.get('position', board.get('tiles'))
+    if not isinstance(board, list) or not board:
+        raise ValueError('Expected a board as a list of rows or of tiles')
+
+    tiles = [tile for row in board for tile in row] if isinstance(board[0], list) else board
+    # 8.0 and True compare equal to the integer tiles, but can't index the board
+    if not all(isinstance(tile, int) and not isinstance(tile, bool) for tile in tiles):
+        raise ValueError(f'Expected integer tiles, got {tiles}')
+    size = int(round(len(tiles) ** 0.5))
+    if size < 2 or size * size != len(tiles) or sorted(tiles) != list(range(size * size)):
+        raise ValueError(f'Expected the tiles 0 to n * n - 1 of a square board, got {tiles}')
+    return board_id, Puzzle([tiles[i:i + size] for i in range(0, len(tiles), size)])
+
+
+def result_record(board_id, result: SolveResult) -> dict:
+    return {
+        'id': board_id,
+        'moves': result.solution.moves if result.solution else None,
+        'length': result.solution_length,
+        'expanded_nodes': result.num_expanded_nodes,
+        'time': round(result.wall_time, 6),
+        'timed_out': result.timed_out,
+        'node_limit_reached': result.node_limit_reached,
+        'error': result.error,
+    }
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1 +1,3 @@
 from .puzzle import Puzzle
+from .encoding import PuzzleEncoder
+from .solution import Solution
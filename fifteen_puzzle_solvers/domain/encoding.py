@@ -0,0 +1,108 @@
+from typing import Dict, List, Tuple
+
+# multiplicative hashing of packed states for the open addressing tables: the slot of a state is the top bits of
+# its lowest 64 bits times 2 ** 64 divided by the golden ratio, which spreads nearby states apart
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+HASH_MASK = (1 << 64) - 1
+
+
+class PuzzleEncoder:
+    """
+    Packs puzzle positions of a given size into a single integer, using a fixed number of bits per tile.
+
+    Tiles are stored in row-major order starting from the least significant bits. Boards up to 4x4 use
+    4 bits per tile and fit in 64 bits, larger boards use as many bits per tile as their biggest tile needs.
+
+    The moves are precomputed for every blank index: the indexes the blank can move to (up, right, left, down, like
+    Puzzle.get_moves), and for each of them the shift of the tile that slides and the factor that moves it over
+    to the old blank index.
+    """
+    _encoders: Dict[int, 'PuzzleEncoder'] = {}
+
+    def __init__(self, size: int):
+        self.size = size
+        self.num_tiles = size * size
+        self.bits_per_tile = max(4, (self.num_tiles - 1).bit_length())
+        self.tile_mask = (1 << self.bits_per_tile) - 1
+        self.shifts = tuple(index * self.bits_per_tile for index in range(self.num_tiles))
+
+        self.end_blank = self.num_tiles - 1
+        self.end_state = self.encode_tiles(list(range(1, self.num_tiles)) + [0])
+
+        self.neighbours = tuple(self._generate_neighbours(blank) for blank in range(self.num_tiles))
+        # the blank is stored as zero, so sliding a tile only adds it at one offset and removes it at the other
+        self._move_table = tuple(
+            tuple((target, self.shifts[target], (1 << self.shifts[blank]) - (1 << self.shifts[target]))
+                  for target in targets)
+            for blank, targets in enumerate(self.neighbours))
+
+    @classmethod
+    def for_size(cls, size: int) -> 'PuzzleEncoder':
+        encoder = cls._encoders.get(size)
+        if encoder is None:
+            encoder = cls._encoders[size] = cls(size)
+        return encoder
+
+    def encode(self, position: List[List[int]]) -> int:
+        return self.encode_tiles([tile for row in position for tile in row])
+
+    def encode_tiles(self, tiles) -> int:
+        state = 0
+        for shift, tile in zip(self.shifts, tiles):
+            state |= tile << shift
+        return state
+
+    def decode(self, state: int) -> List[List[int]]:
+        tiles = self.decode_tiles(state)
+        return [tiles[i:i + self.size] for i in range(0, self.num_tiles, self.size)]
+
+    def decode_tiles(self, state: int) -> List[int]:
+        mask = self.tile_mask
+        return [(state >> shift) & mask for shift in self.shifts]
+
+    def tile_at(self, state: int, index: int) -> int:
+        return (state >> self.shifts[index]) & self.tile_mask
+
+    def find_blank(self, state: int) -> int:
+        mask = self.tile_mask
+        for index, shift in enumerate(self.shifts):
+            if not (state >> shift) & mask:
+                return index
+        raise RuntimeError('Tile not found')
+
+    def get_moves(self, state: int, blank: int) -> List[Tuple[int, int]]:
+        """
+        Returns the (state, blank index) pairs reachable in one move, in the same order as Puzzle.get_moves
+        """
+        return [(move_state, move_blank) for move_state, _, move_blank in self.get_successors(state, blank)]
+
+    def get_successors(self, state: int, blank: int, previous_blank: int = -1) -> List[Tuple[int, int, int]]:
+        """
+        Returns the (state, moved tile, blank index) triples reachable in one move, without the move back to the
+        previous blank index
+        """
+        mask = self.tile_mask
+        successors = []
+        for target, shift, factor in self._move_table[blank]:
+            if target != previous_blank:
+                tile = (state >> shift) & mask
+                successors.append((state + tile * factor, tile, target))
+        return successors
+
+    def move_blank(self, state: int, blank: int, target: int) -> Tuple[int, int]:
+        tile = (state >> self.shifts[target]) & self.tile_mask
+        return state + (tile << self.shifts[blank]) - (tile << self.shifts[target]), target
+
+    def _generate_neighbours(self, blank: int) -> Tuple[int, ...]:
+        size = self.size
+        row, column = divmod(blank, size)
+        targets = []
+        if row > 0:
+            targets.append(blank - size)  # move up
+        if column < size - 1:
+            targets.append(blank + 1)  # move right
+        if column > 0:
+            targets.append(blank - 1)  # move left
+        if row < size - 1:
+            targets.append(blank + size)  # move down
+        return tuple(targets)
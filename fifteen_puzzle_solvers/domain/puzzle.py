@@ -1,7 +1,16 @@
+from fifteen_puzzle_solvers.domain.encoding import PuzzleEncoder
+
+# directions in which the blank moves, with their row and column offsets
+MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT = 'U', 'D', 'L', 'R'
+MOVE_OFFSETS = {MOVE_UP: (-1, 0), MOVE_DOWN: (1, 0), MOVE_LEFT: (0, -1), MOVE_RIGHT: (0, 1)}
+INVERSE_MOVES = {MOVE_UP: MOVE_DOWN, MOVE_DOWN: MOVE_UP, MOVE_LEFT: MOVE_RIGHT, MOVE_RIGHT: MOVE_LEFT}
+
+
 class Puzzle:
     """
     Represents the state of a sliding puzzle with any square matrix size (e.g. 3x3, 4x4...)
     """
+    __slots__ = ('_position', '_blank', 'num_rows', 'num_columns')
 
     def __init__(self, position):
         self.position = position
@@ -21,6 +30,22 @@ class Puzzle:
         puzzle_string += '—' * puzzle_length + '\n'
         return puzzle_string
 
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, position):
+        self._position = position
+        self._blank = None  # found again on the next move
+
+    @classmethod
+    def from_state(cls, state, size):
+        return cls(PuzzleEncoder.for_size(size).decode(state))
+
+    def to_state(self):
+        return PuzzleEncoder.for_size(self.num_rows).encode(self.position)
+
     @staticmethod
     def generate_end_position(size):
         end_position = []
@@ -46,7 +71,17 @@ class Puzzle:
         return puzzle_copy
 
     def find_empty_tile(self):
-        return self.find_tile_position(0)
+        if self._blank is None:
+            self._blank = self.find_tile_position(0)
+        return self._blank
+
+    def move_blank(self, move):
+        """
+        Returns the puzzle after the blank moved in the given direction (U, D, L or R)
+        """
+        i, j = self.find_empty_tile()
+        row_offset, column_offset = MOVE_OFFSETS[move]
+        return Puzzle(self.swap_tiles(i, j, i + row_offset, j + column_offset))
 
     def get_moves(self):
         moves = []
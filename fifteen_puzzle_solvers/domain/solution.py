@@ -0,0 +1,116 @@
+from collections.abc import Sequence
+from typing import Iterator, List
+
+from fifteen_puzzle_solvers.domain.encoding import PuzzleEncoder
+from fifteen_puzzle_solvers.domain.puzzle import Puzzle, MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT
+
+
+class Solution(Sequence):
+    """
+    The positions from the start position to the end position, stored as the packed start position and the
+    directions in which the blank moves (U, D, L, R). The positions are replayed on demand, so a solution costs one
+    character per move until it is indexed or iterated. Solution() is the empty solution of an unsolved search.
+    """
+    __slots__ = ('size', 'start_state', 'moves')
+
+    def __init__(self, start: Puzzle = None, moves: str = ''):
+        self.size = start.num_rows if start is not None else 0
+        self.start_state = start.to_state() if start is not None else None
+        self.moves = moves
+
+    @classmethod
+    def from_blank_path(cls, start: Puzzle, blank_path: List[int]) -> 'Solution':
+        """Builds the solution from the positions of the blank after every move"""
+        size = start.num_rows
+        directions = {-size: MOVE_UP, size: MOVE_DOWN, -1: MOVE_LEFT, 1: MOVE_RIGHT}
+        row, column = start.find_empty_tile()
+        blank = row * size + column
+        moves = []
+        for target in blank_path:
+            moves.append(directions[target - blank])
+            blank = target
+        return cls(start, ''.join(moves))
+
+    @classmethod
+    def from_states(cls, start: Puzzle, states: List[int]) -> 'Solution':
+        """Builds the solution from the packed positions, starting with the start position"""
+        if not states:
+            return cls()
+        encoder = PuzzleEncoder.for_size(start.num_rows)
+        return cls.from_blank_path(start, [encoder.find_blank(state) for state in states[1:]])
+
+    @classmethod
+    def from_puzzles(cls, puzzles: List[Puzzle]) -> 'Solution':
+        if not puzzles:
+            return cls()
+        size = puzzles[0].num_rows
+        blank_path = []
+        for puzzle in puzzles[1:]:
+            row, column = puzzle.find_empty_tile()
+            blank_path.append(row * size + column)
+        return cls.from_blank_path(puzzles[0], blank_path)
+
+    @property
+    def start(self) -> Puzzle:
+        return Puzzle.from_state(self.start_state, self.size)
+
+    @property
+    def blank_path(self) -> List[int]:
+        """The positions of the blank after every move"""
+        offsets = self._offsets()
+        blank = PuzzleEncoder.for_size(self.size).find_blank(self.start_state)
+        path = []
+        for move in self.moves:
+            blank += offsets[move]
+            path.append(blank)
+        return path
+
+    def states(self) -> Iterator[int]:
+        """Replays the packed positions"""
+        if self.start_state is None:
+            return
+        encoder = PuzzleEncoder.for_size(self.size)
+        state = self.start_state
+        blank = encoder.find_blank(state)
+        yield state
+        for target in self.blank_path:
+            state, blank = encoder.move_blank(state, blank, target)
+            yield state
+
+    def to_list(self) -> List[Puzzle]:
+        """The solution as the list of all its positions"""
+        return list(self)
+
+    def __len__(self):
+        return len(self.moves) + 1 if self.start_state is not None else 0
+
+    def __iter__(self) -> Iterator[Puzzle]:
+        for state in self.states():
+            yield Puzzle.from_state(state, self.size)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_list()[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Solution index out of range')
+
+        states = self.states()
+        for _ in range(index):
+            next(states)
+        return Puzzle.from_state(next(states), self.size)
+
+    def __eq__(self, other):
+        if not isinstance(other, Solution):
+            return NotImplemented
+        return (self.size, self.start_state, self.moves) == (other.size, other.start_state, other.moves)
+
+    def __hash__(self):
+        return hash((self.size, self.start_state, self.moves))
+
+    def __repr__(self):
+        return f'Solution({len(self.moves)} moves: {self.moves})' if self.start_state is not None else 'Solution()'
+
+    def _offsets(self):
+        return {MOVE_UP: -self.size, MOVE_DOWN: self.size, MOVE_LEFT: -1, MOVE_RIGHT: 1}
@@ -0,0 +1,116 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+from fifteen_puzzle_solvers.cli import parse_board, result_record
+from fifteen_puzzle_solvers.services.async_solver import AsyncPuzzleSolver, SolverBusyError
+
+MAX_REQUEST_SIZE = 2 ** 20
+
+
+class SolverServer:
+    """
+    Minimal HTTP/JSON endpoint around an AsyncPuzzleSolver, meant for local use within one process.
+
+    POST /solve takes a board like the command line (an array, or an object with "position" or "tiles" and an
+    optional "id"), with optional "strategy", "heuristic", "timeout" and "max_nodes" fields, and answers with the
+    same result record. GET /health reports the running and queued solves. A client that disconnects cancels its
+    search, and a full queue is answered with 503.
+    """
+
+    def __init__(self, solver: AsyncPuzzleSolver):
+        self.solver = solver
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8015):
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            status, body = await self._handle_request(reader)
+            if status is not None:
+                payload = json.dumps(body).encode()
+                writer.write(f'HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: application/json\r\n'
+                             f'Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n'.encode() + payload)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader):
+        """Returns the status and the JSON body of the response, or no status when the client is gone"""
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            return HTTPStatus.BAD_REQUEST, {'error': 'Malformed request line'}
+        method, path, _ = request_line
+        content_length = 0
+        while True:
+            header = (await reader.readline()).decode('latin-1')
+            if header in ('\r\n', '\n', ''):
+                break
+            name, _, value = header.partition(':')
+            if name.strip().lower() == 'content-length':
+                try:
+                    content_length = int(value.strip() or 0)
+                except ValueError:
+                    content_length = -1
+                if content_length < 0:
+                    return HTTPStatus.BAD_REQUEST, {'error': f'Invalid Content-Length {value.strip()}'}
+
+        if path == '/health':
+            if method != 'GET':
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f'{method} is not allowed'}
+            return HTTPStatus.OK, {'running': self.solver.num_running_jobs, 'queued': self.solver.num_queued_jobs}
+        if path != '/solve':
+            return HTTPStatus.NOT_FOUND, {'error': f'No such endpoint {path}'}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f'{method} is not allowed'}
+        if content_length > MAX_REQUEST_SIZE:
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'The board is too large'}
+
+        try:
+            request = json.loads(await reader.readexactly(content_length))
+            board_id, puzzle = parse_board(request)
+            options = request if isinstance(request, dict) else {}
+            timeout = _limit(options, 'timeout', (int, float))
+            max_nodes = _limit(options, 'max_nodes', (int,))
+            solve = asyncio.ensure_future(self.solver.solve(
+                puzzle, strategy=options.get('strategy'), heuristic=options.get('heuristic'),
+                timeout=timeout, max_nodes=max_nodes))
+        except (ValueError, TypeError) as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+
+        # the connection reads end of file when the client hangs up, which cancels the search
+        disconnected = asyncio.ensure_future(reader.read(1))
+        await asyncio.wait({solve, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        if not solve.done():
+            solve.cancel()
+            return None, None
+        disconnected.cancel()
+
+        try:
+            return HTTPStatus.OK, result_record(board_id, solve.result())
+        except SolverBusyError as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': str(e)}
+        except (RuntimeError, ValueError, TypeError) as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except Exception as e:
+            # every request gets an answer, even when the solve fails in an unexpected way
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e) or type(e).__name__}
+
+
+def _limit(options, name, types):
+    """Returns the optional limit of the request, which must be a non-negative number of the given types"""
+    value = options.get(name)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, types) or value < 0):
+        raise ValueError(f'Expected "{name}" to be a non-negative {"integer" if types == (int,) else "number"}, '
+                         f'got {value!r}')
+    return value
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8015, **solver_options):
+    """Serves solves until cancelled"""
+    async with AsyncPuzzleSolver(**solver_options) as solver:
+        server = await SolverServer(solver).start(host, port)
+        async with server:
+            await server.serve_forever()
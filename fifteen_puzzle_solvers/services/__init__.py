@@ -1,2 +1,9 @@
 from .puzzle import *
-from .algorithms import *
+from . import algorithms
+
+
+def __getattr__(name):
+    # the strategies stay lazy, see services.algorithms
+    if name in algorithms.__all__:
+        return getattr(algorithms, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
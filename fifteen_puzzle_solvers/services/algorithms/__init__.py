@@ -1,2 +1,31 @@
-from .astar import AStar
-from .breadth_first import BreadthFirst
+import importlib
+
+# the strategies are imported on first access, so importing the package doesn't load every search
+_EXPORTS = {
+    'AStar': 'astar',
+    'BreadthFirst': 'breadth_first',
+    'BidirectionalBreadthFirst': 'bidirectional_breadth_first',
+    'IDAStar': 'ida_star',
+    'ParallelIDAStar': 'parallel_ida_star',
+    'MemoryBoundedAStar': 'memory_bounded_astar',
+    'AnytimeAStar': 'anytime_astar',
+    'AnytimeSolution': 'anytime_astar',
+    'TableLookup': 'table_lookup',
+    'TranspositionTable': 'transposition_table',
+    'SearchProgress': 'base',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'{__name__}.{module}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
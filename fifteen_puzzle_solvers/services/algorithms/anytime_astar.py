@@ -0,0 +1,179 @@
+import heapq
+import time
+from typing import Callable, NamedTuple
+from fifteen_puzzle_solvers.domain import Puzzle, Solution
+from fifteen_puzzle_solvers.services.algorithms.astar import AStar
+from fifteen_puzzle_solvers.services.algorithms.base import PROGRESS_CHECK_INTERVAL, PHASE_HEURISTIC, \
+    PHASE_MOVE_GENERATION, PHASE_QUEUE
+from fifteen_puzzle_solvers.services.puzzle.constants import ANYTIME_ASTAR
+
+DEADLINE_CHECK_INTERVAL = 128  # expanded nodes between two looks at the clock
+
+
+class AnytimeSolution(NamedTuple):
+    solution: Solution
+    bound: float  # the solution is at most this many times longer than the optimal one
+    weight: float  # heuristic weight of the search that found it
+    num_expanded_nodes: int
+    elapsed: float
+
+
+class AnytimeAStar(AStar):
+    """
+    Anytime Repairing A* (Likhachev et al.): weighted A* searches with a decreasing heuristic weight.
+
+    The first search orders the nodes by g + weight * h and finds a solution quickly, which is at most weight times
+    longer than the optimal one. Every following search lowers the weight and reuses the costs of the previous
+    searches, expanding again only the nodes whose cost improved, until the weight reaches 1 and the solution is
+    optimal, or the deadline passes, or the search is stopped. The best solution so far is kept in solution, and
+    every improvement is published with its suboptimality bound.
+    """
+
+    def __init__(self, initial_puzzle: Puzzle, heuristic: str = None, weight: float = 2.5, weight_step: float = 0.5,
+                 deadline: float = None):
+        super().__init__(initial_puzzle, heuristic)
+        if weight < 1 or weight_step <= 0:
+            raise RuntimeError('The weight must be at least 1 and the weight step positive')
+        self.weight = weight
+        self.weight_step = weight_step
+        self.deadline = deadline  # seconds from the start of the search
+        self.suboptimality_bound = None
+        self.solutions = []
+        self._solution_callbacks = []
+
+    def __str__(self):
+        return ANYTIME_ASTAR
+
+    @property
+    def optimal(self):
+        return self.suboptimality_bound == 1
+
+    def add_solution_callback(self, callback: Callable[[AnytimeSolution], None]):
+        """Calls back with every improved solution or bound, from the thread that runs the search"""
+        self._solution_callbacks.append(callback)
+
+    def solve_puzzle(self) -> Solution:
+        heuristic = getattr(self.puzzle_heuristic_service, self.heuristic_function)
+        encoder = self.encoder
+        start_time = time.perf_counter()
+        deadline = start_time + self.deadline if self.deadline is not None else None
+        self._heuristic_delta = self._timed_phase(
+            PHASE_HEURISTIC, getattr(self.puzzle_heuristic_service, self.heuristic_delta_function))
+        self._get_successors = self._timed_phase(PHASE_MOVE_GENERATION, encoder.get_successors)
+        self._heappush = self._timed_phase(PHASE_QUEUE, heapq.heappush)
+        self._heappop = self._timed_phase(PHASE_QUEUE, heapq.heappop)
+        self._report_progress = self._progress_reporter()
+
+        # Queue entries are (g + weight * h, h, insertion order, g, state, blank index, parent blank index). Entries
+        # whose g is higher than the best known cost of their state are stale and skipped.
+        start_state = encoder.encode(self.start.position)
+        initial_heuristic = heuristic(self.start.position)
+        weight = self.weight
+        start_blank = encoder.find_blank(start_state)
+        queue = [(weight * initial_heuristic, initial_heuristic, 0, 0, start_state, start_blank, -1)]
+        costs = {start_state: 0}
+        parents = {start_state: None}
+        inconsistent = {}  # states whose cost improved after they were expanded in the current search
+        self.num_expanded_nodes = 0
+        self._num_generated_nodes = 1
+        self.solution = Solution()
+        self.solutions = []
+        self.suboptimality_bound = None
+
+        while not self.should_stop:
+            completed = self._improve_path(queue, costs, parents, inconsistent, weight, deadline)
+            solution_cost = costs.get(encoder.end_state)
+            if solution_cost is not None:
+                # an interrupted search only has the bound of the costs it proved so far
+                lower_bound = min((cost + h for _, h, _, cost, state, _, _ in queue if costs[state] == cost),
+                                  default=solution_cost)
+                lower_bound = min([lower_bound] + [costs[state] + h for state, (h, _, _) in inconsistent.items()])
+                bound = solution_cost / lower_bound if lower_bound else 1.0
+                if completed:
+                    bound = min(weight, bound)
+                self._publish(parents, solution_cost, bound, weight, start_time)
+            if weight == 1 or not completed:
+                break
+
+            # the next search starts from the nodes still queued and the nodes that improved after their expansion
+            weight = max(1.0, weight - self.weight_step)
+            entries = [(cost, h, state, blank, parent_blank)
+                       for _, h, _, cost, state, blank, parent_blank in queue if costs[state] == cost]
+            entries.extend((costs[state], h, state, blank, parent_blank)
+                           for state, (h, blank, parent_blank) in inconsistent.items())
+            queue = [(cost + weight * h, h, order, cost, state, blank, parent_blank)
+                     for order, (cost, h, state, blank, parent_blank) in enumerate(entries)]
+            heapq.heapify(queue)
+            inconsistent = {}
+
+        if self._report_progress is not None:
+            self._report_progress(self.num_expanded_nodes, self._num_generated_nodes, len(queue), len(costs),
+                                  queue[0][0] if queue else None, finished=True)
+        return self.solution
+
+    def _improve_path(self, queue, costs, parents, inconsistent, weight, deadline):
+        """
+        Expands the nodes in the order of g + weight * h, each node at most once, until the end position can not
+        be reached for a lower cost than the best known one within the weight. Returns False when the search was
+        interrupted by the deadline or stop().
+        """
+        encoder = self.encoder
+        tile_at = encoder.tile_at
+        end_state = encoder.end_state
+        heuristic_delta, get_successors = self._heuristic_delta, self._get_successors
+        heappush, heappop = self._heappush, self._heappop
+        report_progress = self._report_progress
+        expanded = set()
+
+        while queue and not self.should_stop:
+            estimate, current_heuristic, _, current_cost, current_state, current_blank, parent_blank = queue[0]
+            if costs[current_state] < current_cost or current_state in expanded:
+                heappop(queue)
+                continue
+            if costs.get(end_state, float('inf')) <= estimate:
+                break
+            if not self.num_expanded_nodes % DEADLINE_CHECK_INTERVAL:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return False
+                if report_progress is not None and not self.num_expanded_nodes % PROGRESS_CHECK_INTERVAL:
+                    report_progress(self.num_expanded_nodes, self._num_generated_nodes, len(queue), len(costs),
+                                    estimate)
+
+            heappop(queue)
+            expanded.add(current_state)
+            self.num_expanded_nodes += 1
+
+            move_cost = current_cost + 1
+            for move_state, tile, move_blank in get_successors(current_state, current_blank, parent_blank):
+                if costs.get(move_state, move_cost + 1) <= move_cost:
+                    continue
+
+                costs[move_state] = move_cost
+                parents[move_state] = current_state
+                move_heuristic = current_heuristic + heuristic_delta(move_state, tile_at, tile, move_blank,
+                                                                     current_blank)
+                if move_state in expanded:
+                    inconsistent[move_state] = (move_heuristic, move_blank, current_blank)
+                else:
+                    heappush(queue, (move_cost + weight * move_heuristic, move_heuristic, self._num_generated_nodes,
+                                     move_cost, move_state, move_blank, current_blank))
+                self._num_generated_nodes += 1
+        return not self.should_stop
+
+    def _publish(self, parents, solution_cost, bound, weight, start_time):
+        if self.solutions and len(self.solution) - 1 <= solution_cost and self.suboptimality_bound <= bound:
+            return
+
+        if not self.solution or solution_cost < len(self.solution) - 1:
+            states = [self.encoder.end_state]
+            while parents[states[-1]] is not None:
+                states.append(parents[states[-1]])
+            states.reverse()
+            self.solution = Solution.from_states(self.start, states)
+        self.suboptimality_bound = min(bound, self.suboptimality_bound or bound)
+        solution = AnytimeSolution(solution=self.solution, bound=self.suboptimality_bound, weight=weight,
+                                   num_expanded_nodes=self.num_expanded_nodes,
+                                   elapsed=time.perf_counter() - start_time)
+        self.solutions.append(solution)
+        for callback in self._solution_callbacks:
+            callback(solution)
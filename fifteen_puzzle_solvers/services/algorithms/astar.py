@@ -1,73 +1,123 @@
 # services/algorithms/astar.py
-from typing import List
-from fifteen_puzzle_solvers.domain import Puzzle
-from fifteen_puzzle_solvers.services.algorithms.base import IStrategy
+import heapq
+from fifteen_puzzle_solvers.domain import Puzzle, PuzzleEncoder, Solution
+from fifteen_puzzle_solvers.services.algorithms.base import IStrategy, PROGRESS_CHECK_INTERVAL, PHASE_HEURISTIC, \
+    PHASE_MOVE_GENERATION, PHASE_QUEUE
+from fifteen_puzzle_solvers.services.algorithms.transposition_table import TranspositionTable
+from fifteen_puzzle_solvers.services.puzzle.endgame_database import EndgameDatabase
 from fifteen_puzzle_solvers.services.puzzle.heuristic import PuzzleHeuristicService
-from fifteen_puzzle_solvers.services.puzzle.constants import (
-    HEURISTIC_MANHATTAN_DISTANCE, HEURISTIC_MISPLACED, HEURISTIC_TOTAL, HEURISTIC_OPTIONS,
-    ASTAR
-)
+from fifteen_puzzle_solvers.services.puzzle.constants import HEURISTIC_TOTAL, ASTAR
+from fifteen_puzzle_solvers.services.registry import registry
 
 
 class AStar(IStrategy):
-    heuristic_functions = {
-        HEURISTIC_MANHATTAN_DISTANCE: 'heuristic_manhattan_distance',
-        HEURISTIC_MISPLACED: 'heuristic_misplaced',
-        HEURISTIC_TOTAL: 'heuristic_total'
-    }
+    open_node_size = 200  # queue entry with its packed state
+    closed_node_size = 24  # transposition table slots of a position at the average load factor
 
-    def __init__(self, initial_puzzle: Puzzle, heuristic: str = None):
+    def __init__(self, initial_puzzle: Puzzle, heuristic: str = None, endgame_database: EndgameDatabase = None):
         self.start = initial_puzzle
+        self.encoder = PuzzleEncoder.for_size(len(initial_puzzle.position))
         self.end_position = Puzzle.generate_end_position(len(initial_puzzle.position))
         self.puzzle_heuristic_service = PuzzleHeuristicService(self.end_position)
-        self.heuristic_function = self.heuristic_functions[HEURISTIC_TOTAL]  # combined heuristic as default
+        heuristic_info = registry.get_heuristic(heuristic or HEURISTIC_TOTAL)  # combined heuristic as default
+        self.heuristic_function = heuristic_info.function
+        self.heuristic_delta_function = heuristic_info.delta_function
+        self.endgame_database = endgame_database
+        self.transposition_table = None
         self.should_stop = False
 
-        if heuristic:
-            if heuristic not in HEURISTIC_OPTIONS:
-                raise RuntimeError(f'Invalid Heuristic Function Name. Must be one of {HEURISTIC_OPTIONS}')
-            self.heuristic_function = self.heuristic_functions[heuristic]
-
     def __str__(self):
         return ASTAR
 
-    def solve_puzzle(self) -> List[Puzzle]:
-        initial_heuristic = getattr(self.puzzle_heuristic_service, self.heuristic_function)(self.start.position)
-        queue = [[initial_heuristic, self.start]]
-        expanded = set()
+    def solve_puzzle(self) -> Solution:
+        heuristic = getattr(self.puzzle_heuristic_service, self.heuristic_function)
+        heuristic_delta = self._timed_phase(
+            PHASE_HEURISTIC, getattr(self.puzzle_heuristic_service, self.heuristic_delta_function))
+        get_successors = self._timed_phase(PHASE_MOVE_GENERATION, self.encoder.get_successors)
+        heappush = self._timed_phase(PHASE_QUEUE, heapq.heappush)
+        heappop = self._timed_phase(PHASE_QUEUE, heapq.heappop)
+        report_progress = self._progress_reporter()
+        encoder = self.encoder
+        tile_at = encoder.tile_at
+        end_state = encoder.end_state
+        endgame_lookup = self.endgame_database.lookup if self.endgame_database is not None else None
+        endgame_depth = self.endgame_database.depth if self.endgame_database is not None else -1
+
+        # Queue entries are (f, h, insertion order, g, state, blank index, parent blank index). Ties on f prefer
+        # the node with the smaller h (i.e. the deeper one), then the node that was queued first. Only the start
+        # position is evaluated in full, the children update their parent's heuristic incrementally.
+        # The transposition table keeps the best g and the parent of every reached position, so a position reached
+        # again by a path that is no shorter never enters the queue, and an entry whose position was reached by
+        # a shorter path after it was queued is skipped when it is popped.
+        # The f of a position in the endgame database uses its exact distance instead of h, so the first one that
+        # is popped completes an optimal solution. The heuristic never exceeds the exact distance, which makes
+        # positions with h above the depth of the database certain misses.
+        start_state = encoder.encode(self.start.position)
+        start_blank = encoder.find_blank(start_state)
+        initial_heuristic = heuristic(self.start.position)
+        initial_estimate = initial_heuristic
+        if initial_heuristic <= endgame_depth:
+            initial_estimate = endgame_lookup(start_state) or initial_heuristic
+        queue = [(initial_estimate, initial_heuristic, 0, 0, start_state, start_blank, -1)]
+        table = self.transposition_table = TranspositionTable(encoder.bits_per_tile * encoder.num_tiles,
+                                                              encoder.num_tiles)
+        offer, close = table.offer, table.close
+        offer(start_state, 0, -1)
         num_expanded_nodes = 0
+        num_generated_nodes = 1
+        self.solution = Solution()
 
         while queue and not self.should_stop:
-            current_index = min(range(len(queue)), key=lambda i: queue[i][0])
-            current_path = queue.pop(current_index)
-            current_heuristic, current_node = current_path[0], current_path[-1]
-
-            if current_node.position == self.end_position:
-                self.num_expanded_nodes = num_expanded_nodes
-                self.solution = current_path[1:]
-                return self.solution
+            current_estimate, current_heuristic, _, current_cost, current_state, current_blank, parent_blank = \
+                heappop(queue)
 
-            if tuple(map(tuple, current_node.position)) in expanded:
+            if not close(current_state, current_cost):
                 continue
+            if current_state == end_state:
+                self.solution = self._reconstruct_path(current_state, current_blank)
+                break
+            if current_heuristic <= endgame_depth and endgame_lookup(current_state) is not None:
+                self.solution = self._reconstruct_path(current_state, current_blank,
+                                                       self.endgame_database.blank_path(current_state, current_blank))
+                break
 
-            expanded.add(tuple(map(tuple, current_node.position)))
             num_expanded_nodes += 1
+            if report_progress is not None and not num_expanded_nodes % PROGRESS_CHECK_INTERVAL:
+                report_progress(num_expanded_nodes, num_generated_nodes, len(queue), len(table), current_estimate)
 
-            for move in current_node.get_moves():
-                if tuple(map(tuple, move.position)) in expanded:
+            move_cost = current_cost + 1
+            for move_state, tile, move_blank in get_successors(current_state, current_blank, parent_blank):
+                if not offer(move_state, move_cost, current_blank):
                     continue
 
-                new_heuristic = self._calculate_new_heuristic(move, current_node)
-                new_path = [current_heuristic + new_heuristic] + current_path[1:] + [move]
-                queue.append(new_path)
+                # the tile slid from the new blank position into the old one
+                move_heuristic = current_heuristic + heuristic_delta(
+                    move_state, tile_at, tile, move_blank, current_blank)
+                move_estimate = move_cost + move_heuristic
+                if move_heuristic <= endgame_depth:
+                    move_estimate = move_cost + (endgame_lookup(move_state) or move_heuristic)
+                heappush(queue, (move_estimate, move_heuristic, num_generated_nodes,
+                                 move_cost, move_state, move_blank, current_blank))
+                num_generated_nodes += 1
 
         self.num_expanded_nodes = num_expanded_nodes
-        self.solution = []
+        if report_progress is not None:
+            report_progress(num_expanded_nodes, num_generated_nodes, len(queue), len(table),
+                            queue[0][0] if queue else None, finished=True)
         return self.solution
 
-    def _calculate_new_heuristic(self, move: Puzzle, end_node: Puzzle) -> int:
-        return getattr(self.puzzle_heuristic_service, self.heuristic_function)(move.position) - \
-            getattr(self.puzzle_heuristic_service, self.heuristic_function)(end_node.position)
+    def _reconstruct_path(self, end_state: int, end_blank: int, endgame_path=()) -> Solution:
+        """Follows the parents in the transposition table back to the start position"""
+        move_blank = self.encoder.move_blank
+        state, blank = end_state, end_blank
+        blank_path = []
+        _, parent_blank, _ = self.transposition_table.get(state)
+        while parent_blank >= 0:
+            blank_path.append(blank)
+            state, blank = move_blank(state, blank, parent_blank)
+            _, parent_blank, _ = self.transposition_table.get(state)
+        blank_path.reverse()
+        return Solution.from_blank_path(self.start, blank_path + list(endgame_path))
 
     def stop(self):
         self.should_stop = True
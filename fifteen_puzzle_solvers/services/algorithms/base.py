@@ -1,10 +1,110 @@
+import time
 from abc import ABC, abstractmethod
+from typing import Callable, Dict, NamedTuple, Optional
+
+PROGRESS_CHECK_INTERVAL = 1024  # expanded nodes between two looks at the clock
+
+PHASE_MOVE_GENERATION = 'move_generation'
+PHASE_HEURISTIC = 'heuristic'
+PHASE_QUEUE = 'queue'
+
+
+class SearchProgress(NamedTuple):
+    expanded_nodes: int
+    generated_nodes: Optional[int]  # None when the strategy does not keep track of them
+    open_nodes: int  # nodes waiting to be expanded, the current path for depth-first searches
+    closed_nodes: int
+    f_bound: Optional[int]  # lowest f-cost in the open set, or the threshold of the current iteration
+    nodes_per_second: float
+    memory_estimate: int  # rough size of the open and closed sets in bytes
+    elapsed: float
+    phase_times: Optional[Dict[str, float]]  # seconds spent in every phase, when phase timing is enabled
+    finished: bool
 
 
 class IStrategy(ABC):
     num_expanded_nodes = 0
     solution = None
 
+    # rough size in bytes of a node in the open and in the closed set, used for the memory estimate
+    open_node_size = 0
+    closed_node_size = 0
+
+    phase_times = None
+    _progress_callbacks = ()
+    _progress_interval = 0.5
+
     @abstractmethod
     def solve_puzzle(self):
         raise NotImplementedError
+
+    def add_progress_callback(self, callback: Callable[[SearchProgress], None], interval: float = 0.5):
+        """
+        Calls back with a SearchProgress at most once every interval (in seconds) while the search runs,
+        and once more when it ends. Searches without callbacks do not look at the clock at all.
+        """
+        if not self._progress_callbacks:
+            self._progress_callbacks = []
+        self._progress_callbacks.append(callback)
+        self._progress_interval = interval
+
+    def enable_phase_timing(self):
+        """
+        Measures the time spent in move generation, heuristic evaluation and queue operations, as far as the
+        strategy has them. Every timed call goes through a wrapper, so this slows the search down noticeably.
+        """
+        self.phase_times = {}
+
+    def _progress_reporter(self):
+        """
+        Returns the function that the search calls every PROGRESS_CHECK_INTERVAL expanded nodes, or None when
+        nobody listens, in which case the search skips the call.
+        """
+        if not self._progress_callbacks:
+            return None
+
+        start_time = time.perf_counter()
+        last_report = [start_time]
+        interval = self._progress_interval
+
+        def report_progress(expanded_nodes, generated_nodes, open_nodes, closed_nodes, f_bound, finished=False):
+            now = time.perf_counter()
+            if not finished and now - last_report[0] < interval:
+                return
+            last_report[0] = now
+            elapsed = now - start_time
+            progress = SearchProgress(
+                expanded_nodes=expanded_nodes,
+                generated_nodes=generated_nodes,
+                open_nodes=open_nodes,
+                closed_nodes=closed_nodes,
+                f_bound=f_bound,
+                nodes_per_second=expanded_nodes / elapsed if elapsed else 0.0,
+                memory_estimate=open_nodes * self.open_node_size + closed_nodes * self.closed_node_size,
+                elapsed=elapsed,
+                phase_times=dict(self.phase_times) if self.phase_times is not None else None,
+                finished=finished)
+            for callback in self._progress_callbacks:
+                callback(progress)
+
+        return report_progress
+
+    def _timed_phase(self, phase: str, function):
+        """
+        Wraps the function so that the time spent in it adds up in phase_times, or returns it unchanged when
+        phase timing is disabled
+        """
+        if self.phase_times is None:
+            return function
+
+        phase_times = self.phase_times
+        phase_times.setdefault(phase, 0.0)
+        perf_counter = time.perf_counter
+
+        def timed(*args):
+            start = perf_counter()
+            result = function(*args)
+            phase_times[phase] += perf_counter() - start
+            return result
+
+        return timed
@@ -0,0 +1,83 @@
+from collections import deque
+from fifteen_puzzle_solvers.domain import Puzzle, PuzzleEncoder, Solution
+from fifteen_puzzle_solvers.services.algorithms.base import IStrategy, PROGRESS_CHECK_INTERVAL, \
+    PHASE_MOVE_GENERATION
+from fifteen_puzzle_solvers.services.algorithms.breadth_first import trace_path
+from fifteen_puzzle_solvers.services.puzzle.constants import BIDIRECTIONAL_BREADTH_FIRST
+
+
+class BidirectionalBreadthFirst(IStrategy):
+    """
+    Breadth first search that grows one frontier from the initial position and one from the end position,
+    always expanding a full layer of the smaller frontier, and stops as soon as the two frontiers meet.
+    """
+    open_node_size = 100  # frontier entry with its packed state
+    closed_node_size = 100  # parent map entry
+
+    def __init__(self, initial_puzzle: Puzzle):
+        self.start = initial_puzzle
+        self.encoder = PuzzleEncoder.for_size(len(initial_puzzle.position))
+        self.end_position = initial_puzzle.generate_end_position(len(initial_puzzle.position))
+        self.should_stop = False
+
+    def __str__(self):
+        return BIDIRECTIONAL_BREADTH_FIRST
+
+    def solve_puzzle(self) -> Solution:
+        encoder = self.encoder
+        start_state = encoder.encode(self.start.position)
+        end_state = encoder.end_state
+
+        # the parent maps double as the sets of states seen from each side
+        forward_parents, backward_parents = {start_state: None}, {end_state: None}
+        # frontier entries are (state, blank index, parent blank index)
+        forward_frontier = deque([(start_state, encoder.find_blank(start_state), -1)])
+        backward_frontier = deque([(end_state, encoder.end_blank, -1)])
+        meeting_state = start_state if start_state == end_state else None
+        self.num_expanded_nodes = 0
+        self.solution = Solution()
+        self._get_successors = self._timed_phase(PHASE_MOVE_GENERATION, encoder.get_successors)
+        self._report_progress = self._progress_reporter()
+        self._frontiers = forward_frontier, backward_frontier
+
+        while meeting_state is None and forward_frontier and backward_frontier and not self.should_stop:
+            if len(forward_frontier) <= len(backward_frontier):
+                meeting_state = self._expand_layer(forward_frontier, forward_parents, backward_parents)
+            else:
+                meeting_state = self._expand_layer(backward_frontier, backward_parents, forward_parents)
+
+        if meeting_state is not None:
+            path = trace_path(forward_parents, meeting_state) + trace_path(backward_parents, meeting_state)[-2::-1]
+            self.solution = Solution.from_states(self.start, path)
+        if self._report_progress is not None:
+            self._publish_progress(forward_parents, backward_parents, finished=True)
+        return self.solution
+
+    def _publish_progress(self, parents, other_parents, finished=False):
+        open_nodes = len(self._frontiers[0]) + len(self._frontiers[1])
+        generated_nodes = len(parents) + len(other_parents)
+        self._report_progress(self.num_expanded_nodes, generated_nodes, open_nodes, generated_nodes - open_nodes,
+                              None, finished=finished)
+
+    def _expand_layer(self, frontier, parents, other_parents):
+        # The puzzle graph is bipartite (every move changes the parity of the blank's position and of the
+        # permutation), so all the paths through states that meet while expanding the first such layer have the
+        # same length and the first meeting state already gives an optimal solution.
+        get_successors = self._get_successors
+        report_progress = self._report_progress
+        for _ in range(len(frontier)):
+            state, blank, parent_blank = frontier.popleft()
+            self.num_expanded_nodes += 1
+            if report_progress is not None and not self.num_expanded_nodes % PROGRESS_CHECK_INTERVAL:
+                self._publish_progress(parents, other_parents)
+            for move_state, _, move_blank in get_successors(state, blank, parent_blank):
+                if move_state in parents:
+                    continue
+                parents[move_state] = state
+                if move_state in other_parents:
+                    return move_state
+                frontier.append((move_state, move_blank, blank))
+        return None
+
+    def stop(self):
+        self.should_stop = True
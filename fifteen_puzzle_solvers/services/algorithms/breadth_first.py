@@ -1,45 +1,77 @@
+from collections import deque
 from typing import List
-from fifteen_puzzle_solvers.domain import Puzzle
-from fifteen_puzzle_solvers.services.algorithms.base import IStrategy
+from fifteen_puzzle_solvers.domain import Puzzle, PuzzleEncoder, Solution
+from fifteen_puzzle_solvers.services.algorithms.base import IStrategy, PROGRESS_CHECK_INTERVAL, \
+    PHASE_MOVE_GENERATION, PHASE_QUEUE
 from fifteen_puzzle_solvers.services.puzzle.constants import BREADTH_FIRST
 
 
 class BreadthFirst(IStrategy):
+    open_node_size = 150  # queue entry with its packed states
+    closed_node_size = 100  # parent map entry
+
     def __init__(self, initial_puzzle: Puzzle):
         self.start = initial_puzzle
+        self.encoder = PuzzleEncoder.for_size(len(initial_puzzle.position))
         self.end_position = initial_puzzle.generate_end_position(len(initial_puzzle.position))
         self.should_stop = False
 
     def __str__(self):
         return BREADTH_FIRST
 
-    def solve_puzzle(self) -> List[Puzzle]:
-        queue = [[self.start]]
+    def solve_puzzle(self) -> Solution:
+        encoder = self.encoder
+        end_state = encoder.end_state
+        get_successors = self._timed_phase(PHASE_MOVE_GENERATION, encoder.get_successors)
+        report_progress = self._progress_reporter()
+        start_state = encoder.encode(self.start.position)
+        queue = deque([(start_state, encoder.find_blank(start_state), None, -1)])
+        enqueue = self._timed_phase(PHASE_QUEUE, queue.append)
+        dequeue = self._timed_phase(PHASE_QUEUE, queue.popleft)
+        parents = {}  # expanded state -> parent state, doubles as the set of expanded states
         path = []
-        expanded = set()  # Use a set for faster lookups
         num_expanded_nodes = 0
+        num_duplicate_nodes = 0
 
         while queue and not self.should_stop:
-            path = queue.pop(0)
-            end_node = path[-1]
+            state, blank, parent_state, parent_blank = dequeue()
 
-            if tuple(map(tuple, end_node.position)) in expanded:
+            if state in parents:
+                num_duplicate_nodes += 1
                 continue
 
-            for move in end_node.get_moves():
-                if tuple(map(tuple, move.position)) in expanded:
-                    continue
-                queue.append(path + [move])
-
-            expanded.add(tuple(map(tuple, end_node.position)))
+            parents[state] = parent_state
             num_expanded_nodes += 1
+            if report_progress is not None and not num_expanded_nodes % PROGRESS_CHECK_INTERVAL:
+                report_progress(num_expanded_nodes, num_expanded_nodes + num_duplicate_nodes + len(queue),
+                                len(queue), len(parents), None)
 
-            if end_node.position == self.end_position:
+            if state == end_state:
+                path = trace_path(parents, state)
                 break
 
+            for move_state, _, move_blank in get_successors(state, blank, parent_blank):
+                if move_state not in parents:
+                    enqueue((move_state, move_blank, state, blank))
+
         self.num_expanded_nodes = num_expanded_nodes
-        self.solution = path
+        self.solution = Solution.from_states(self.start, path)
+        if report_progress is not None:
+            report_progress(num_expanded_nodes, num_expanded_nodes + num_duplicate_nodes + len(queue),
+                            len(queue), len(parents), None, finished=True)
         return self.solution
 
     def stop(self):
         self.should_stop = True
+
+
+def trace_path(parents, state) -> List[int]:
+    """
+    Follows the parent map from the given state back to the root and returns the states from the root
+    """
+    path = []
+    while state is not None:
+        path.append(state)
+        state = parents[state]
+    path.reverse()
+    return path
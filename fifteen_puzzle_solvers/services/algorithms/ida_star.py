@@ -0,0 +1,144 @@
+from operator import getitem
+from typing import List, Sequence, Tuple
+
+from fifteen_puzzle_solvers.domain import Puzzle, PuzzleEncoder, Solution
+from fifteen_puzzle_solvers.services.algorithms.base import IStrategy, PROGRESS_CHECK_INTERVAL, PHASE_HEURISTIC
+from fifteen_puzzle_solvers.services.puzzle.endgame_database import EndgameDatabase
+from fifteen_puzzle_solvers.services.puzzle.heuristic import PuzzleHeuristicService
+from fifteen_puzzle_solvers.services.puzzle.constants import HEURISTIC_MANHATTAN_DISTANCE, IDA_STAR
+from fifteen_puzzle_solvers.services.registry import registry
+
+FOUND = -1
+
+
+class IDAStar(IStrategy):
+    """
+    Iterative deepening A*: repeated depth-first searches bounded by an increasing f-cost threshold.
+
+    Only the current path is kept in memory. The search slides the tiles of a single flat board in place and
+    undoes every move on the way back, and it never generates the move that reverts the previous one.
+
+    With an endgame database, a position within its depth is not searched further: its exact distance either
+    completes the solution or is the f-cost that exceeded the threshold.
+    """
+    open_node_size = 500  # stack frame of the recursive search
+
+    def __init__(self, initial_puzzle: Puzzle, heuristic: str = None, endgame_database: EndgameDatabase = None):
+        self.start = initial_puzzle
+        self.size = len(initial_puzzle.position)
+        self.encoder = PuzzleEncoder.for_size(self.size)
+        self.end_position = Puzzle.generate_end_position(self.size)
+        self.end_tiles = [tile for row in self.end_position for tile in row]
+        self.puzzle_heuristic_service = PuzzleHeuristicService(self.end_position)
+        # manhattan distance is the cheapest admissible heuristic to update on every move
+        heuristic_info = registry.get_heuristic(heuristic or HEURISTIC_MANHATTAN_DISTANCE)
+        self.heuristic_function = heuristic_info.function
+        self.heuristic_delta_function = heuristic_info.delta_function
+        self.endgame_database = endgame_database
+        self.iteration_expanded_nodes = []
+        self.should_stop = False
+
+        self._heuristic_delta = getattr(self.puzzle_heuristic_service, self.heuristic_delta_function)
+        self._neighbours = self.encoder.neighbours
+        self._endgame_depth = endgame_database.depth if endgame_database is not None else -1
+        self._iteration_nodes = 0
+        self._report_progress = None
+
+    def __str__(self):
+        return IDA_STAR
+
+    def solve_puzzle(self) -> Solution:
+        board = [tile for row in self.start.position for tile in row]
+        blank = board.index(0)
+        heuristic = getattr(self.puzzle_heuristic_service, self.heuristic_function)(self.start.position)
+        threshold = heuristic
+        path = []
+        self.iteration_expanded_nodes = []
+        self.solution = Solution()
+        self._heuristic_delta = self._timed_phase(
+            PHASE_HEURISTIC, getattr(self.puzzle_heuristic_service, self.heuristic_delta_function))
+        self._report_progress = self._progress_reporter()
+
+        while not self.should_stop:
+            self._iteration_nodes = 0
+            result = self._search(board, blank, 0, heuristic, threshold, -1, path)
+            self.iteration_expanded_nodes.append(self._iteration_nodes)
+
+            if result == FOUND:
+                self.solution = self._replay_path(path)
+                break
+            if result == float('inf'):
+                break
+            threshold = result
+
+        self.num_expanded_nodes = sum(self.iteration_expanded_nodes)
+        if self._report_progress is not None:
+            self._report_progress(self.num_expanded_nodes, None, len(path), 0, threshold, finished=True)
+        return self.solution
+
+    def bounded_search(self, tiles: Sequence[int], blank: int, cost: int, heuristic: int, threshold: int,
+                       previous_blank: int = -1) -> Tuple[int, List[int], int]:
+        """
+        A single depth-first search bounded by the f-cost threshold from a position that is cost moves away from
+        the start, where heuristic is its estimate and previous_blank the blank position before the last move.
+        Returns FOUND or the smallest f-cost that exceeded the threshold, the blank positions of the moves to the
+        end position (only on FOUND) and the number of expanded nodes.
+        """
+        self._iteration_nodes = 0
+        path = []
+        result = self._search(list(tiles), blank, cost, heuristic, threshold, previous_blank, path)
+        return result, path, self._iteration_nodes
+
+    def _search(self, board, blank, cost, heuristic, threshold, previous_blank, path):
+        """
+        Searches below the current node and returns FOUND when the end position is reached, otherwise the
+        smallest f-cost that exceeded the threshold. On FOUND the blank positions of the solution stay in path.
+        """
+        estimate = cost + heuristic
+        if estimate > threshold:
+            return estimate
+        if heuristic == 0 and board == self.end_tiles:
+            return FOUND
+        if heuristic <= self._endgame_depth:
+            # the heuristic never exceeds the exact distance, so only these positions can be in the database
+            state = self.encoder.encode_tiles(board)
+            distance = self.endgame_database.lookup(state)
+            if distance is not None:
+                if cost + distance > threshold:
+                    return cost + distance
+                path.extend(self.endgame_database.blank_path(state, blank))
+                return FOUND
+
+        self._iteration_nodes += 1
+        if self._report_progress is not None and not self._iteration_nodes % PROGRESS_CHECK_INTERVAL:
+            self._report_progress(sum(self.iteration_expanded_nodes) + self._iteration_nodes, None, len(path), 0,
+                                  threshold)
+        heuristic_delta = self._heuristic_delta
+        minimum = float('inf')
+        for target in self._neighbours[blank]:
+            if target == previous_blank:
+                continue
+
+            tile = board[target]
+            board[blank], board[target] = tile, 0
+            path.append(target)
+
+            result = self._search(board, target, cost + 1,
+                                  heuristic + heuristic_delta(board, getitem, tile, target, blank),
+                                  threshold, blank, path)
+            if result == FOUND:
+                return FOUND
+
+            path.pop()
+            board[blank], board[target] = 0, tile
+            if result < minimum:
+                minimum = result
+            if self.should_stop:
+                break
+        return minimum
+
+    def _replay_path(self, path) -> Solution:
+        return Solution.from_blank_path(self.start, path)
+
+    def stop(self):
+        self.should_stop = True
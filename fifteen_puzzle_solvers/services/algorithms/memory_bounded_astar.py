@@ -0,0 +1,121 @@
+import heapq
+from fifteen_puzzle_solvers.domain import Puzzle, Solution
+from fifteen_puzzle_solvers.services.algorithms.astar import AStar
+from fifteen_puzzle_solvers.services.algorithms.base import PROGRESS_CHECK_INTERVAL, PHASE_HEURISTIC, \
+    PHASE_MOVE_GENERATION, PHASE_QUEUE
+from fifteen_puzzle_solvers.services.puzzle.constants import MEMORY_BOUNDED_ASTAR
+
+
+class MemoryBoundedAStar(AStar):
+    """
+    A* that keeps the open and closed sets within a budget of nodes (or bytes).
+
+    When the budget is reached, the transposition table of expanded states is dropped first if it takes more than
+    half of the budget, since it only saves re-expansions, and then the open nodes with the highest f-cost are
+    evicted until a quarter of the budget is free again. Each open node keeps its path as a chain of blank positions
+    shared with its siblings, so evicting a node also frees the part of the path that only it used.
+
+    The lowest f-cost of all evicted nodes bounds every solution that went through them. A solution that is not
+    longer than this bound is optimal, otherwise it is returned as a best-effort solution with optimal set to False.
+    """
+    open_node_size = 250  # queue entry with its link in the path chain
+    closed_node_size = 100  # transposition table entry
+
+    def __init__(self, initial_puzzle: Puzzle, heuristic: str = None, max_nodes: int = 1000000,
+                 max_bytes: int = None):
+        super().__init__(initial_puzzle, heuristic)
+        if max_bytes is not None:
+            max_nodes = min(max_nodes, max_bytes // self.open_node_size)
+        if max_nodes < 16:
+            raise RuntimeError('The memory budget must allow at least 16 nodes')
+        self.max_nodes = max_nodes
+        self.optimal = None  # whether the solution is proven optimal, None before the search
+        self.lower_bound = None  # lowest cost that any solution can have, as far as the search could prove
+        self.num_evicted_nodes = 0
+
+    def __str__(self):
+        return MEMORY_BOUNDED_ASTAR
+
+    def solve_puzzle(self) -> Solution:
+        heuristic = getattr(self.puzzle_heuristic_service, self.heuristic_function)
+        heuristic_delta = self._timed_phase(
+            PHASE_HEURISTIC, getattr(self.puzzle_heuristic_service, self.heuristic_delta_function))
+        get_successors = self._timed_phase(PHASE_MOVE_GENERATION, self.encoder.get_successors)
+        heappush = self._timed_phase(PHASE_QUEUE, heapq.heappush)
+        heappop = self._timed_phase(PHASE_QUEUE, heapq.heappop)
+        report_progress = self._progress_reporter()
+        encoder = self.encoder
+        tile_at = encoder.tile_at
+        end_state = encoder.end_state
+        max_nodes = self.max_nodes
+
+        # Queue entries are (f, h, insertion order, g, state, blank index, path, parent blank index), where the path
+        # is a chain of (blank index, parent path) links. The transposition table maps the expanded states to their
+        # cost.
+        start_state = encoder.encode(self.start.position)
+        initial_heuristic = heuristic(self.start.position)
+        queue = [(initial_heuristic, initial_heuristic, 0, 0, start_state, encoder.find_blank(start_state), None, -1)]
+        expanded = {}
+        pruned_bound = float('inf')
+        num_expanded_nodes = 0
+        num_generated_nodes = 1
+        self.solution = Solution()
+        self.optimal = False
+        self.lower_bound = initial_heuristic
+        self.num_evicted_nodes = 0
+
+        while queue and not self.should_stop:
+            current_estimate, current_heuristic, _, current_cost, current_state, current_blank, path, parent_blank = \
+                heappop(queue)
+            # some node on an optimal path is either still queued or was evicted
+            self.lower_bound = max(self.lower_bound, min(current_estimate, pruned_bound))
+
+            if current_state == end_state:
+                self.solution = self._replay_path(path)
+                self.optimal = current_cost <= pruned_bound
+                if self.optimal:
+                    self.lower_bound = current_cost
+                break
+
+            if expanded.get(current_state, current_cost + 1) <= current_cost:
+                continue
+
+            expanded[current_state] = current_cost
+            num_expanded_nodes += 1
+            if report_progress is not None and not num_expanded_nodes % PROGRESS_CHECK_INTERVAL:
+                report_progress(num_expanded_nodes, num_generated_nodes, len(queue), len(expanded),
+                                current_estimate)
+
+            move_cost = current_cost + 1
+            for move_state, tile, move_blank in get_successors(current_state, current_blank, parent_blank):
+                if expanded.get(move_state, move_cost + 1) <= move_cost:
+                    continue
+
+                move_heuristic = current_heuristic + heuristic_delta(move_state, tile_at, tile, move_blank,
+                                                                     current_blank)
+                heappush(queue, (move_cost + move_heuristic, move_heuristic, num_generated_nodes,
+                                 move_cost, move_state, move_blank, (move_blank, path), current_blank))
+                num_generated_nodes += 1
+
+            if len(queue) + len(expanded) > max_nodes:
+                if len(expanded) > max_nodes // 2:
+                    expanded.clear()
+                num_kept = max(1, max_nodes * 3 // 4 - len(expanded))
+                if len(queue) > num_kept:
+                    self.num_evicted_nodes += len(queue) - num_kept
+                    queue = heapq.nsmallest(num_kept + 1, queue)  # a sorted list is a valid heap
+                    pruned_bound = min(pruned_bound, queue.pop()[0])
+
+        self.num_expanded_nodes = num_expanded_nodes
+        if report_progress is not None:
+            report_progress(num_expanded_nodes, num_generated_nodes, len(queue), len(expanded),
+                            queue[0][0] if queue else None, finished=True)
+        return self.solution
+
+    def _replay_path(self, path) -> Solution:
+        targets = []
+        while path is not None:
+            target, path = path
+            targets.append(target)
+        targets.reverse()
+        return Solution.from_blank_path(self.start, targets)
@@ -0,0 +1,178 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fifteen_puzzle_solvers.domain import Puzzle, PuzzleEncoder, Solution
+from fifteen_puzzle_solvers.services.algorithms.base import IStrategy
+from fifteen_puzzle_solvers.services.algorithms.ida_star import FOUND, IDAStar
+from fifteen_puzzle_solvers.services.puzzle import batch_heuristic
+from fifteen_puzzle_solvers.services.puzzle.batch_heuristic import BatchHeuristicService
+from fifteen_puzzle_solvers.services.puzzle.constants import PARALLEL_IDA_STAR
+
+
+class ParallelIDAStar(IStrategy):
+    """
+    IDA* for a single puzzle spread over a pool of worker processes.
+
+    The root is expanded breadth first into a frontier of distinct positions, and every IDA* iteration searches
+    the subtrees of the frontier in parallel under the same f-cost threshold. The first subtree that reaches the
+    end position holds an optimal solution, so the other workers are cancelled right away.
+    """
+    open_node_size = 400  # frontier entry with its board and path
+
+    def __init__(self, initial_puzzle: Puzzle, heuristic: str = None, workers: int = None,
+                 frontier_size: int = 2000):
+        self.start = initial_puzzle
+        self.heuristic = heuristic
+        self.workers = workers or os.cpu_count()
+        self.frontier_size = frontier_size
+        self.encoder = PuzzleEncoder.for_size(len(initial_puzzle.position))
+        self.iteration_expanded_nodes = []
+        self.should_stop = False
+        self._searcher = IDAStar(initial_puzzle, heuristic)  # validates the heuristic and evaluates the frontier
+        self._cancelled = None
+
+    def __str__(self):
+        return PARALLEL_IDA_STAR
+
+    def solve_puzzle(self) -> Solution:
+        self.iteration_expanded_nodes = []
+        frontier, solution_path, num_frontier_nodes = self._expand_frontier()
+        self.num_expanded_nodes = num_frontier_nodes
+        self.solution = Solution()
+        if solution_path is not None:
+            self.solution = Solution.from_blank_path(self.start, solution_path)
+            return self.solution
+        if not frontier:
+            return self.solution
+
+        threshold = min(cost + heuristic for _, _, cost, heuristic, _, _ in frontier)
+        report_progress = self._progress_reporter()
+        self._cancelled = multiprocessing.get_context().Event()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_initialize_worker,
+                                 initargs=(self._cancelled,)) as executor:
+            while not self.should_stop:
+                solution_path, next_threshold, num_nodes = self._search_iteration(executor, frontier, threshold,
+                                                                                  report_progress)
+                self.iteration_expanded_nodes.append(num_nodes)
+                self.num_expanded_nodes += num_nodes
+                if solution_path is not None:
+                    self.solution = Solution.from_blank_path(self.start, solution_path)
+                    break
+                if next_threshold == float('inf'):
+                    break
+                threshold = next_threshold
+                if report_progress is not None:
+                    report_progress(self.num_expanded_nodes, None, len(frontier), 0, threshold)
+
+        if report_progress is not None:
+            report_progress(self.num_expanded_nodes, None, len(frontier), 0, threshold, finished=True)
+        return self.solution
+
+    def _expand_frontier(self):
+        """
+        Breadth first expansion of the root until the last layer has enough positions for all the workers.
+        Returns the frontier, or the path to the end position when the expansion already reached it.
+        """
+        encoder = self.encoder
+        state = encoder.encode(self.start.position)
+        layer = [(state, encoder.find_blank(state), -1, [])]
+        seen = {state}
+        num_expanded_nodes = 0
+
+        if state == encoder.end_state:
+            return [], [], num_expanded_nodes
+
+        while layer and len(layer) < self.frontier_size and not self.should_stop:
+            next_layer = []
+            for state, blank, previous_blank, path in layer:
+                num_expanded_nodes += 1
+                for move_state, _, move_blank in encoder.get_successors(state, blank, previous_blank):
+                    if move_state in seen:
+                        continue
+                    if move_state == encoder.end_state:
+                        return [], path + [move_blank], num_expanded_nodes
+                    seen.add(move_state)
+                    next_layer.append((move_state, move_blank, blank, path + [move_blank]))
+            layer = next_layer
+
+        heuristics = self._evaluate_layer([state for state, _, _, _ in layer])
+        frontier = []
+        for (state, blank, previous_blank, path), heuristic in zip(layer, heuristics):
+            frontier.append((encoder.decode_tiles(state), blank, len(path), heuristic, previous_blank, path))
+        return frontier, None, num_expanded_nodes
+
+    def _evaluate_layer(self, states):
+        """Evaluates the frontier in a single batch when NumPy is installed and has the heuristic"""
+        if self.heuristic in BatchHeuristicService.heuristic_functions and batch_heuristic.is_available():
+            batch_service = BatchHeuristicService(self.encoder.size)
+            return batch_service.evaluate(batch_service.boards_from_states(states), self.heuristic).tolist()
+        heuristic_function = getattr(self._searcher.puzzle_heuristic_service, self._searcher.heuristic_function)
+        return [heuristic_function(self.encoder.decode(state)) for state in states]
+
+    def _search_iteration(self, executor, frontier, threshold, report_progress=None):
+        """
+        Searches the subtrees of the frontier under the threshold. The progress is reported every time a subtree
+        is done, so node limits and cancellations of the progress callbacks apply within an iteration.
+        """
+        futures = {executor.submit(_search_subtree, self.start.position, self.heuristic, tiles, blank, cost,
+                                   heuristic, threshold, previous_blank): path
+                   for tiles, blank, cost, heuristic, previous_blank, path in frontier}
+        next_threshold = float('inf')
+        solution_path = None
+        num_nodes = 0
+
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            result, subtree_path, subtree_nodes = future.result()
+            num_nodes += subtree_nodes
+            if result == FOUND:
+                if solution_path is None:
+                    solution_path = futures[future] + subtree_path
+                    # every solution within the threshold is optimal, the remaining subtrees can be dropped
+                    self._cancelled.set()
+                    for pending in futures:
+                        pending.cancel()
+            elif result < next_threshold:
+                next_threshold = result
+            if report_progress is not None and solution_path is None:
+                report_progress(self.num_expanded_nodes + num_nodes, None, len(frontier), 0, threshold)
+            if self.should_stop:
+                # stop() already told the running workers to stop, the ones that did not start are dropped
+                for pending in futures:
+                    pending.cancel()
+        return solution_path, next_threshold, num_nodes
+
+    def stop(self):
+        self.should_stop = True
+        self._searcher.stop()
+        if self._cancelled is not None:
+            self._cancelled.set()
+
+
+_cancelled = None
+_searchers = {}
+
+
+def _initialize_worker(cancelled):
+    global _cancelled
+    _cancelled = cancelled
+    threading.Thread(target=_watch_cancellation, daemon=True).start()
+
+
+def _watch_cancellation():
+    _cancelled.wait()
+    for searcher in list(_searchers.values()):
+        searcher.stop()
+
+
+def _search_subtree(start_position, heuristic, tiles, blank, cost, heuristic_value, threshold, previous_blank):
+    key = (len(start_position), heuristic)
+    searcher = _searchers.get(key)
+    if searcher is None:
+        searcher = _searchers[key] = IDAStar(Puzzle(start_position), heuristic)
+    if _cancelled.is_set():
+        searcher.stop()
+
+    return searcher.bounded_search(tiles, blank, cost, heuristic_value, threshold, previous_blank)
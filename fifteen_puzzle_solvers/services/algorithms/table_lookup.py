@@ -0,0 +1,27 @@
+from fifteen_puzzle_solvers.domain import Puzzle, Solution
+from fifteen_puzzle_solvers.services.algorithms.base import IStrategy
+from fifteen_puzzle_solvers.services.puzzle.constants import TABLE_LOOKUP
+from fifteen_puzzle_solvers.services.puzzle.distance_table import DistanceTable
+
+
+class TableLookup(IStrategy):
+    """
+    Optimal solutions of puzzles up to 3x3 read off the precomputed distance table of every position, without
+    any search. Every position on the way to the end counts as an expanded node.
+    """
+
+    def __init__(self, initial_puzzle: Puzzle):
+        self.start = initial_puzzle
+        self.distance_table = DistanceTable.for_size(len(initial_puzzle.position))
+
+    def __str__(self):
+        return TABLE_LOOKUP
+
+    def solve_puzzle(self) -> Solution:
+        tiles = [tile for row in self.start.position for tile in row]
+        self.solution = Solution()
+        self.num_expanded_nodes = 0
+        if self.distance_table.lookup(tiles) is not None:
+            self.solution = Solution.from_blank_path(self.start, self.distance_table.blank_path(tiles))
+            self.num_expanded_nodes = len(self.solution) - 1
+        return self.solution
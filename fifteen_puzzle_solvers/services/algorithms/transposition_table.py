@@ -0,0 +1,116 @@
+import sys
+from array import array
+from typing import Optional, Tuple
+
+from fifteen_puzzle_solvers.domain.encoding import HASH_MULTIPLIER, HASH_MASK
+
+MAX_LOAD_FACTOR = 0.75
+NO_PARENT = 0xFF  # the parent blank index is a byte, so boards have at most 255 cells
+OPEN, CLOSED = 1, 2
+
+
+class TranspositionTable:
+    """
+    Best known path cost, parent and open or closed flag of every position a best-first search has reached.
+
+    The table is an open addressing hash table with linear probing over parallel arrays: the packed state (zero
+    for an empty slot), the cost as 16 bits, and a byte each for the blank index of the parent and the flag. The
+    parent position is the position with the blank moved back to that index, so a slot takes 12 bytes instead of
+    the hundred or so of a dictionary entry. The table doubles when it is fuller than MAX_LOAD_FACTOR. States of
+    boards that don't pack into 64 bits are kept in a list instead of an array.
+    """
+
+    def __init__(self, key_bits: int = 64, num_tiles: int = 16, capacity: int = 1 << 12):
+        if num_tiles > NO_PARENT:
+            raise RuntimeError(f'Transposition tables are limited to boards of at most {NO_PARENT} cells')
+        self._packed_keys = key_bits <= 64
+        self.num_entries = 0
+        self._allocate(1 << max(1, int(capacity / MAX_LOAD_FACTOR)).bit_length())
+
+    def _allocate(self, num_slots):
+        self.num_slots = num_slots
+        self._slot_mask = num_slots - 1
+        self._hash_shift = 64 - num_slots.bit_length() + 1
+        self._keys = array('Q', bytes(8 * num_slots)) if self._packed_keys else [0] * num_slots
+        self._costs = array('H', bytes(2 * num_slots))
+        self._parents = bytearray(num_slots)
+        self._flags = bytearray(num_slots)
+
+    def __len__(self):
+        return self.num_entries
+
+    def __contains__(self, state: int):
+        return self._keys[self._find_slot(state)] != 0
+
+    @property
+    def load_factor(self) -> float:
+        return self.num_entries / self.num_slots
+
+    @property
+    def memory_usage(self) -> int:
+        """Size of the table in bytes"""
+        if self._packed_keys:
+            keys_size = self._keys.itemsize * self.num_slots
+        else:
+            keys_size = sys.getsizeof(self._keys) + self.num_entries * sys.getsizeof(1 << 64)
+        return keys_size + self._costs.itemsize * self.num_slots + 2 * self.num_slots
+
+    def get(self, state: int) -> Optional[Tuple[int, int, int]]:
+        """Returns the cost, the parent blank index (-1 for none) and the flag of the state, or None"""
+        slot = self._find_slot(state)
+        if not self._keys[slot]:
+            return None
+        parent = self._parents[slot]
+        return self._costs[slot], -1 if parent == NO_PARENT else parent, self._flags[slot]
+
+    def offer(self, state: int, cost: int, parent_blank: int) -> bool:
+        """
+        Records the path to the state unless a path that is at least as short is already known, and returns
+        whether it was recorded. A recorded state is open until it is closed.
+        """
+        slot = self._find_slot(state)
+        if self._keys[slot]:
+            if self._costs[slot] <= cost:
+                return False
+        else:
+            if self.num_entries >= self.num_slots * MAX_LOAD_FACTOR:
+                self._grow()
+                slot = self._find_slot(state)
+            self._keys[slot] = state
+            self.num_entries += 1
+        self._costs[slot] = cost
+        self._parents[slot] = NO_PARENT if parent_blank < 0 else parent_blank
+        self._flags[slot] = OPEN
+        return True
+
+    def close(self, state: int, cost: int) -> bool:
+        """
+        Marks the state as expanded with the cost, and returns False when it already is, or when a shorter path
+        to it was recorded in the meantime
+        """
+        slot = self._find_slot(state)
+        if self._flags[slot] != OPEN or self._costs[slot] != cost:
+            return False
+        self._flags[slot] = CLOSED
+        return True
+
+    def _find_slot(self, state):
+        """Returns the slot of the state, or the empty slot where it belongs"""
+        keys = self._keys
+        slot = ((state * HASH_MULTIPLIER) & HASH_MASK) >> self._hash_shift
+        while True:
+            key = keys[slot]
+            if key == state or not key:
+                return slot
+            slot = (slot + 1) & self._slot_mask
+
+    def _grow(self):
+        keys, costs, parents, flags = self._keys, self._costs, self._parents, self._flags
+        self._allocate(2 * self.num_slots)
+        for old_slot, key in enumerate(keys):
+            if key:
+                slot = self._find_slot(key)
+                self._keys[slot] = key
+                self._costs[slot] = costs[old_slot]
+                self._parents[slot] = parents[old_slot]
+                self._flags[slot] = flags[old_slot]
@@ -0,0 +1,132 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fifteen_puzzle_solvers.domain import Puzzle, Solution
+from fifteen_puzzle_solvers.services.puzzle.constants import IDA_STAR
+from fifteen_puzzle_solvers.services.registry import registry
+from fifteen_puzzle_solvers.services.solver import SolveResult, _solve_instance
+
+
+class SolverBusyError(RuntimeError):
+    """Raised when a solve is requested while the queue of waiting solves is full"""
+
+
+class AsyncPuzzleSolver:
+    """
+    Solves puzzles from asyncio code on a bounded pool of worker processes.
+
+    At most max_concurrent_jobs searches run at the same time, every one in its own worker. Further solves wait for
+    a free worker in a queue of at most max_queued_jobs, and beyond that they are rejected with SolverBusyError.
+
+    Every running search has a cancellation flag in memory shared with the workers, which the search checks every
+    PROGRESS_CHECK_INTERVAL expanded nodes. Cancelling the task that awaits solve() raises the flag and the search
+    stops through its stop() method, and stop() does the same for all the running searches. The timeout of a solve
+    covers its time in the queue as well, and a solve that runs out of time returns a timed out result.
+    """
+
+    def __init__(self, strategy: str = IDA_STAR, heuristic: str = None, workers: int = None,
+                 max_concurrent_jobs: int = None, max_queued_jobs: int = 100):
+        registry.get_strategy(strategy)
+        self.strategy = strategy
+        self.heuristic = heuristic
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrent_jobs = min(max_concurrent_jobs or self.workers, self.workers)
+        self.max_queued_jobs = max_queued_jobs
+        self.num_queued_jobs = 0  # solves waiting for a free worker
+        self._num_jobs = 0  # solves waiting or running
+        self._cancel_flags = multiprocessing.get_context().Array('b', self.max_concurrent_jobs, lock=False)
+        self._free_slots = list(range(self.max_concurrent_jobs))
+        self._semaphore = None  # created in the event loop of the first solve
+        self._executor = None
+        self._closed = False
+
+    @property
+    def num_running_jobs(self):
+        return self.max_concurrent_jobs - len(self._free_slots)
+
+    async def solve(self, puzzle: Puzzle, strategy: str = None, heuristic: str = None, timeout: float = None,
+                    max_nodes: int = None) -> SolveResult:
+        strategy = strategy or self.strategy
+        strategy_class = registry.get_strategy_class(strategy)
+        heuristic = (heuristic or self.heuristic) if registry.get_strategy(strategy).uses_heuristic else None
+        if self._closed:
+            raise RuntimeError('The solver service is closed')
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_jobs)
+            self._executor = ProcessPoolExecutor(max_workers=self.max_concurrent_jobs,
+                                                 initializer=_initialize_worker, initargs=(self._cancel_flags,))
+
+        if self._num_jobs >= self.max_concurrent_jobs + self.max_queued_jobs:
+            raise SolverBusyError(f'{self.num_queued_jobs} solves are already waiting')
+        self._num_jobs += 1
+        try:
+            return await self._run(puzzle, strategy_class, heuristic, timeout, max_nodes)
+        finally:
+            self._num_jobs -= 1
+
+    async def _run(self, puzzle, strategy_class, heuristic, timeout, max_nodes) -> SolveResult:
+        start_time = time.perf_counter()
+        self.num_queued_jobs += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            return SolveResult(index=0, solution=Solution(), solution_length=-1, num_expanded_nodes=0,
+                               wall_time=time.perf_counter() - start_time, timed_out=True,
+                               node_limit_reached=False, error=None)
+        finally:
+            self.num_queued_jobs -= 1
+
+        slot = self._free_slots.pop()
+        self._cancel_flags[slot] = 0
+        remaining = max(0.0, timeout - (time.perf_counter() - start_time)) if timeout is not None else None
+        loop = asyncio.get_event_loop()
+        try:
+            future = self._executor.submit(_solve_job, slot, puzzle, strategy_class, heuristic, remaining, max_nodes)
+        except BaseException:
+            self._release(slot)
+            raise
+        # the worker stays busy until the search has actually stopped, even when the caller is gone
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, slot))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            self._cancel_flags[slot] = 1
+            raise
+
+    def stop(self):
+        """Stops all the running searches, which return the results they have so far"""
+        for slot in range(self.max_concurrent_jobs):
+            if slot not in self._free_slots:
+                self._cancel_flags[slot] = 1
+
+    async def close(self):
+        self._closed = True
+        self.stop()
+        if self._executor is not None:
+            await asyncio.get_event_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def _release(self, slot):
+        self._free_slots.append(slot)
+        self._semaphore.release()
+
+
+_cancel_flags = None
+
+
+def _initialize_worker(cancel_flags):
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+
+
+def _solve_job(slot, puzzle, strategy, heuristic, timeout, max_nodes) -> SolveResult:
+    return _solve_instance(0, puzzle, strategy, heuristic, timeout, max_nodes,
+                           is_cancelled=lambda: _cancel_flags[slot] != 0)
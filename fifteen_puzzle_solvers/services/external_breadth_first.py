@@ -0,0 +1,205 @@
+import hashlib
+import heapq
+import json
+import os
+from array import array
+from typing import Iterable, Iterator, List, NamedTuple
+
+from fifteen_puzzle_solvers.domain import Puzzle, PuzzleEncoder
+from fifteen_puzzle_solvers.services.puzzle.storage import write_atomically
+
+CHECKPOINT_FILE = 'checkpoint.json'
+MAX_MERGE_FAN_IN = 64  # sorted runs merged at once, which keeps the number of open files bounded
+READ_BUFFER_SIZE = 1 << 16  # bytes read at once from every open level or run
+
+
+class SweepResult(NamedTuple):
+    level_sizes: List[int]  # number of positions at every distance from the start positions
+    complete: bool  # False when the sweep stopped at max_depth before it reached every position
+    directory: str
+
+
+class ExternalBreadthFirst:
+    """
+    Breadth-first sweep of the whole state space that keeps its levels on disk instead of in memory.
+
+    Every level is a file of the sorted, distinct packed states at one distance from the start positions, as
+    64-bit integers in native byte order. A level is expanded chunk_size positions at a time: the successors of a
+    chunk are sorted in memory and written as a sorted run, and the runs are merged in a stream that drops
+    duplicates and the positions of the expanded level and the one before it, the only levels a successor of
+    the expanded level can already be in. Memory is bounded by a few times chunk_size positions, for the chunk
+    that is sorted and the buffer that is written, plus a READ_BUFFER_SIZE buffer for each of the up to
+    MAX_MERGE_FAN_IN + 2 files that are read at once, whatever the size of the levels. A checkpoint is saved after
+    every level, and a sweep that was interrupted resumes from the last complete level when it runs again in the
+    same directory from the same start positions.
+    """
+
+    def __init__(self, size: int, directory: str, chunk_size: int = 1 << 20, start_states: Iterable[int] = None):
+        self.size = size
+        self.encoder = PuzzleEncoder.for_size(size)
+        if self.encoder.bits_per_tile * self.encoder.num_tiles > 64:
+            raise RuntimeError(f'External sweeps are limited to boards that pack into 64 bits, not {size}x{size}')
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.start_states = sorted(set(start_states or [self.encoder.end_state]))
+
+    def level_path(self, depth: int) -> str:
+        return os.path.join(self.directory, f'level-{depth:03d}.bin')
+
+    def run(self, max_depth: int = None) -> SweepResult:
+        """Sweeps until every position is reached or the levels reach max_depth, resuming from the checkpoint"""
+        os.makedirs(self.directory, exist_ok=True)
+        level_sizes = self._resume()
+        if not level_sizes:
+            level_sizes = [self._write_states(self.level_path(0), self.start_states)]
+            self._save_checkpoint(level_sizes)
+
+        while level_sizes[-1] and (max_depth is None or len(level_sizes) <= max_depth):
+            depth = len(level_sizes)
+            runs = self._expand(depth - 1)
+            reached = self._unique(self._merge(runs, depth))
+            previous_levels = heapq.merge(*(self.read_level(d) for d in (depth - 1, depth - 2) if d >= 0))
+            level_sizes.append(self._write_states(self.level_path(depth), self._subtract(reached, previous_levels)))
+            for run in runs:
+                os.remove(run)
+            self._save_checkpoint(level_sizes)
+
+        complete = not level_sizes[-1]
+        return SweepResult(level_sizes=level_sizes[:-1] if complete else level_sizes, complete=complete,
+                           directory=self.directory)
+
+    def read_level(self, depth: int) -> Iterator[int]:
+        return self._read_states(self.level_path(depth))
+
+    def hardest_positions(self, result: SweepResult, limit: int = 10) -> List[Puzzle]:
+        """Returns up to limit positions of the last level of the sweep"""
+        positions = []
+        for state in self.read_level(len(result.level_sizes) - 1):
+            if len(positions) == limit:
+                break
+            positions.append(Puzzle.from_state(state, self.size))
+        return positions
+
+    def _expand(self, depth):
+        """Writes the successors of the level as sorted runs, one for every chunk_size expanded positions"""
+        encoder = self.encoder
+        find_blank, get_successors = encoder.find_blank, encoder.get_successors
+        runs = []
+        chunk = []
+        num_positions = 0
+        for state in self.read_level(depth):
+            chunk.extend(move_state for move_state, _, _ in get_successors(state, find_blank(state)))
+            num_positions += 1
+            if num_positions == self.chunk_size:
+                runs.append(self._write_run(depth + 1, len(runs), chunk))
+                chunk = []
+                num_positions = 0
+        if chunk or not runs:
+            runs.append(self._write_run(depth + 1, len(runs), chunk))
+        return runs
+
+    def _write_run(self, depth, index, states):
+        path = os.path.join(self.directory, f'run-{depth:03d}-{index:06d}.bin')
+        self._write_states(path, sorted(set(states)))
+        return path
+
+    def _merge(self, runs, depth) -> Iterator[int]:
+        """
+        Merges the sorted runs into one sorted stream, in several passes when there are too many of them. The
+        runs of the intermediate passes replace the merged ones in the list.
+        """
+        merge_pass = 0
+        while len(runs) > MAX_MERGE_FAN_IN:
+            merged_runs = []
+            for start in range(0, len(runs), MAX_MERGE_FAN_IN):
+                group = runs[start:start + MAX_MERGE_FAN_IN]
+                path = os.path.join(self.directory, f'run-{depth:03d}-merge{merge_pass}-{len(merged_runs):06d}.bin')
+                self._write_states(path, self._unique(heapq.merge(*map(self._read_states, group))))
+                merged_runs.append(path)
+                for run in group:
+                    os.remove(run)
+            runs[:] = merged_runs
+            merge_pass += 1
+        return heapq.merge(*map(self._read_states, runs))
+
+    @staticmethod
+    def _unique(states):
+        previous = None
+        for state in states:
+            if state != previous:
+                yield state
+                previous = state
+
+    @staticmethod
+    def _subtract(states, excluded):
+        """The sorted states without the ones in the sorted excluded stream"""
+        excluded = iter(excluded)
+        current = next(excluded, None)
+        for state in states:
+            while current is not None and current < state:
+                current = next(excluded, None)
+            if state != current:
+                yield state
+
+    def _read_states(self, path) -> Iterator[int]:
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(READ_BUFFER_SIZE)
+                if not data:
+                    break
+                yield from array('Q', data)
+
+    def _write_states(self, path, states) -> int:
+        """Writes the states in chunks and returns how many there were"""
+        num_states = 0
+
+        def chunks():
+            nonlocal num_states
+            buffer = array('Q')
+            for state in states:
+                buffer.append(state)
+                if len(buffer) == self.chunk_size:
+                    num_states += len(buffer)
+                    yield buffer.tobytes()
+                    buffer = array('Q')
+            num_states += len(buffer)
+            yield buffer.tobytes()
+
+        write_atomically(path, chunks())
+        return num_states
+
+    def _save_checkpoint(self, level_sizes):
+        checkpoint = {'size': self.size, 'start_states': self._start_states_digest(), 'level_sizes': level_sizes}
+        write_atomically(os.path.join(self.directory, CHECKPOINT_FILE), json.dumps(checkpoint).encode())
+
+    def _start_states_digest(self):
+        return hashlib.sha256(array('Q', self.start_states).tobytes()).hexdigest()
+
+    def _resume(self):
+        """Returns the level sizes of the checkpoint, after removing the files of the level that was interrupted"""
+        path = os.path.join(self.directory, CHECKPOINT_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint['size'] != self.size or checkpoint.get('start_states') != self._start_states_digest():
+            raise RuntimeError(f'The sweep in {self.directory} was started from other positions')
+
+        level_sizes = checkpoint['level_sizes']
+        for name in os.listdir(self.directory):
+            if name.startswith('run-') or name.endswith('.tmp') or \
+                    (name.startswith('level-') and int(name[6:9]) >= len(level_sizes)):
+                os.remove(os.path.join(self.directory, name))
+        return level_sizes
+
+
+if __name__ == '__main__':
+    # sweeps the state space of a puzzle size, e.g. python -m <module> 3 /tmp/sweep-3x3
+    import sys
+
+    sweep = ExternalBreadthFirst(int(sys.argv[1]), sys.argv[2])
+    sweep_result = sweep.run()
+    for distance, level_size in enumerate(sweep_result.level_sizes):
+        print(distance, level_size)
+    for puzzle in sweep.hardest_positions(sweep_result):
+        print(puzzle)
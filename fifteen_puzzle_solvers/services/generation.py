@@ -0,0 +1,119 @@
+import random
+import struct
+from typing import Iterator
+
+from fifteen_puzzle_solvers.domain import Puzzle, PuzzleEncoder
+from fifteen_puzzle_solvers.services.algorithms.ida_star import FOUND, IDAStar
+from fifteen_puzzle_solvers.services.puzzle.constants import HEURISTIC_LINEAR_CONFLICT, HEURISTIC_MANHATTAN_DISTANCE
+from fifteen_puzzle_solvers.services.puzzle.shuffle import PuzzleShuffleService
+from fifteen_puzzle_solvers.services.puzzle.heuristic import PuzzleHeuristicService
+from fifteen_puzzle_solvers.services.puzzle.storage import write_atomically
+from fifteen_puzzle_solvers.services.registry import registry
+
+# magic, puzzle size, bytes per position and number of positions
+INSTANCE_FILE_HEADER = struct.Struct('<4sBBQ')
+INSTANCE_FILE_MAGIC = b'FPIS'
+INSTANCE_FILE_CHUNK_SIZE = 65536  # positions generated and written at once
+
+
+class PuzzleGenerationService:
+    """
+    Generates puzzle instances: uniformly random boards, boards at an exact optimal distance from the end position
+    or within a heuristic range, and seeded binary files of many boards for load tests.
+    """
+
+    @staticmethod
+    def random_walk(size, depth, generator: random.Random = None, heuristic: str = HEURISTIC_LINEAR_CONFLICT,
+                    max_restarts: int = 100) -> Puzzle:
+        """
+        Random walk from the end position on which every move takes the board exactly one move further away.
+
+        The puzzle graph is bipartite, so every move changes the optimal distance by exactly one, and the next board
+        is one move further away unless it can be solved within the current distance minus one. A single IDA*
+        iteration bounded by that distance answers this, and most of the time the heuristic alone already does.
+        The walk starts again when it gets stuck on a board that all its neighbours are closer to the end position.
+        """
+        generator = generator or random
+        searcher = IDAStar(Puzzle(Puzzle.generate_end_position(size)), heuristic)
+        evaluate = getattr(searcher.puzzle_heuristic_service, searcher.heuristic_function)
+        neighbours = PuzzleEncoder.for_size(size).neighbours
+
+        def is_farther_than(tiles, blank, distance):
+            estimate = evaluate([tiles[i:i + size] for i in range(0, len(tiles), size)])
+            if estimate > distance:
+                return True
+            return searcher.bounded_search(tiles, blank, 0, estimate, distance)[0] != FOUND
+
+        for _ in range(max_restarts):
+            tiles = list(range(1, size * size)) + [0]
+            blank, previous_blank, distance = len(tiles) - 1, -1, 0
+            while distance < depth:
+                targets = [target for target in neighbours[blank] if target != previous_blank]
+                generator.shuffle(targets)
+                for target in targets:
+                    tiles[blank], tiles[target] = tiles[target], 0
+                    if is_farther_than(tiles, target, distance - 1):
+                        blank, previous_blank, distance = target, blank, distance + 1
+                        break
+                    tiles[target], tiles[blank] = tiles[blank], 0
+                else:
+                    break
+            if distance == depth:
+                return Puzzle([tiles[i:i + size] for i in range(0, len(tiles), size)])
+        raise RuntimeError(f'Could not reach an optimal distance of {depth} on a {size}x{size} puzzle')
+
+    @staticmethod
+    def random_walk_in_range(size, min_heuristic, max_heuristic, generator: random.Random = None,
+                             heuristic: str = HEURISTIC_MANHATTAN_DISTANCE, max_steps: int = 10000) -> Puzzle:
+        """
+        Random walk from the end position, which never undoes the previous move and stops on the first board whose
+        heuristic estimate is within the range (both ends included)
+        """
+        generator = generator or random
+        heuristic_service = PuzzleHeuristicService(Puzzle.generate_end_position(size))
+        evaluate = getattr(heuristic_service, registry.get_heuristic(heuristic).function)
+        neighbours = PuzzleEncoder.for_size(size).neighbours
+
+        tiles = list(range(1, size * size)) + [0]
+        blank, previous_blank = len(tiles) - 1, -1
+        for _ in range(max_steps):
+            target = generator.choice([target for target in neighbours[blank] if target != previous_blank])
+            tiles[blank], tiles[target] = tiles[target], 0
+            blank, previous_blank = target, blank
+            position = [tiles[i:i + size] for i in range(0, len(tiles), size)]
+            if min_heuristic <= evaluate(position) <= max_heuristic:
+                return Puzzle(position)
+        raise RuntimeError(f'No board with a heuristic between {min_heuristic} and {max_heuristic} within {max_steps} '
+                           f'moves')
+
+    @staticmethod
+    def generate_file(path, size, count, seed: int = None):
+        """
+        Writes count uniformly random solvable boards, drawn from a generator seeded with the seed, as packed
+        positions of a fixed number of bytes after a small header
+        """
+        generator = random.Random(seed)
+        encoder = PuzzleEncoder.for_size(size)
+        state_size = (encoder.bits_per_tile * encoder.num_tiles + 7) // 8
+
+        def generate_chunks():
+            yield INSTANCE_FILE_HEADER.pack(INSTANCE_FILE_MAGIC, size, state_size, count)
+            for start in range(0, count, INSTANCE_FILE_CHUNK_SIZE):
+                yield b''.join(
+                    encoder.encode_tiles(PuzzleShuffleService.shuffle_tiles(size, generator)).to_bytes(
+                        state_size, 'little')
+                    for _ in range(min(INSTANCE_FILE_CHUNK_SIZE, count - start)))
+
+        write_atomically(path, generate_chunks())
+
+    @staticmethod
+    def read_file(path) -> Iterator[Puzzle]:
+        with open(path, 'rb') as f:
+            magic, size, state_size, count = INSTANCE_FILE_HEADER.unpack(f.read(INSTANCE_FILE_HEADER.size))
+            if magic != INSTANCE_FILE_MAGIC:
+                raise RuntimeError(f'{path} is not a puzzle instance file')
+            encoder = PuzzleEncoder.for_size(size)
+            for start in range(0, count, INSTANCE_FILE_CHUNK_SIZE):
+                data = f.read(min(INSTANCE_FILE_CHUNK_SIZE, count - start) * state_size)
+                for offset in range(0, len(data), state_size):
+                    yield Puzzle(encoder.decode(int.from_bytes(data[offset:offset + state_size], 'little')))
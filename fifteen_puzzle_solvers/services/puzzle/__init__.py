@@ -1,3 +1,8 @@
 from .shuffle import PuzzleShuffleService
 from .validation import PuzzleValidationService
 from .heuristic import PuzzleHeuristicService
+from .pattern_database import PatternDatabase
+from .endgame_database import EndgameDatabase
+from .distance_table import DistanceTable
+from .walking_distance import WalkingDistanceTable
+from .batch_heuristic import BatchHeuristicService
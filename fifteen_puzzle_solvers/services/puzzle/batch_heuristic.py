@@ -0,0 +1,110 @@
+import importlib.util
+
+from fifteen_puzzle_solvers.domain import PuzzleEncoder
+from fifteen_puzzle_solvers.services.puzzle.constants import HEURISTIC_MANHATTAN_DISTANCE, HEURISTIC_MISPLACED, \
+    HEURISTIC_LINEAR_CONFLICT
+from fifteen_puzzle_solvers.services.puzzle.heuristic import _count_line_conflicts
+
+
+class BatchHeuristicService:
+    """
+    Evaluates heuristics for many boards at once with NumPy, which is an optional dependency
+    (pip install fifteen_puzzle_solvers[numpy]).
+
+    Boards are the rows of an N x size² array of tiles in row-major order. Every heuristic is a gather from tables
+    computed once per size: the manhattan distance of every tile at every index, and the linear conflicts of every
+    possible line, indexed by the goal columns (or rows) of the tiles that belong to that line.
+    """
+    heuristic_functions = {
+        HEURISTIC_MANHATTAN_DISTANCE: 'heuristic_manhattan_distance',
+        HEURISTIC_MISPLACED: 'heuristic_misplaced',
+        HEURISTIC_LINEAR_CONFLICT: 'heuristic_manhattan_linear_conflict',
+    }
+
+    def __init__(self, size):
+        np = self._np = _import_numpy()
+        self.size = size
+        self.encoder = PuzzleEncoder.for_size(size)
+        num_tiles = size * size
+        indexes = np.arange(num_tiles)
+        goal_indexes = (np.arange(num_tiles) - 1) % num_tiles  # tile t belongs at t - 1, the blank at the end
+        goal_rows, goal_cols = np.divmod(goal_indexes, size)
+        rows, cols = np.divmod(indexes, size)
+
+        self._goal_tiles = ((indexes + 1) % num_tiles).astype(np.uint8)
+        self._manhattan = (np.abs(rows[None, :] - goal_rows[:, None]) +
+                           np.abs(cols[None, :] - goal_cols[:, None])).astype(np.int16)
+        self._manhattan[0] = 0
+        self._cells = indexes
+
+        # A tile is coded in a line by its goal column (or row) plus one when the line is its goal row (or column),
+        # and by zero otherwise. The codes of a line are the digits of its index in the conflicts table, so the
+        # weight of a tile at an index is its code times the place value of the index in its row (or column).
+        row_codes = np.where(goal_rows[:, None] == rows[None, :], goal_cols[:, None] + 1, 0)
+        column_codes = np.where(goal_cols[:, None] == cols[None, :], goal_rows[:, None] + 1, 0)
+        self._row_weights = (row_codes * (size + 1) ** cols[None, :]).astype(np.int32)
+        self._column_weights = (column_codes * (size + 1) ** rows[None, :]).astype(np.int32)
+        self._row_weights[0] = self._column_weights[0] = 0
+        self._line_conflicts = np.array([_count_line_conflicts(self._line_codes(index))
+                                         for index in range((size + 1) ** size)], dtype=np.int16)
+
+    def _line_codes(self, index):
+        codes = []
+        for _ in range(self.size):
+            index, code = divmod(index, self.size + 1)
+            if code:
+                codes.append(code)
+        return codes
+
+    def boards_from_states(self, states):
+        """Unpacks a sequence of packed positions into an N x size² array of tiles"""
+        np = self._np
+        encoder = self.encoder
+        if encoder.bits_per_tile * encoder.num_tiles > 64:
+            return np.array([encoder.decode_tiles(state) for state in states], dtype=np.uint8)
+        packed = np.fromiter(states, dtype=np.uint64)
+        shifts = np.array(encoder.shifts, dtype=np.uint64)
+        return ((packed[:, None] >> shifts[None, :]) & np.uint64(encoder.tile_mask)).astype(np.uint8)
+
+    def boards_from_positions(self, positions):
+        return self._np.array([[tile for row in position for tile in row] for position in positions],
+                              dtype=self._np.uint8)
+
+    def heuristic_misplaced(self, boards):
+        # the blank is counted as well, like PuzzleHeuristicService.heuristic_misplaced
+        return (self._np.asarray(boards) != self._goal_tiles).sum(axis=1)
+
+    def heuristic_manhattan_distance(self, boards):
+        return self._manhattan[boards, self._cells].sum(axis=1)
+
+    def heuristic_linear_conflict(self, boards):
+        np = self._np
+        size = self.size
+        boards = np.asarray(boards)
+        row_indexes = self._row_weights[boards, self._cells].reshape(-1, size, size).sum(axis=2)
+        column_indexes = self._column_weights[boards, self._cells].reshape(-1, size, size).sum(axis=1)
+        return (self._line_conflicts[row_indexes].sum(axis=1) +
+                self._line_conflicts[column_indexes].sum(axis=1))
+
+    def heuristic_manhattan_linear_conflict(self, boards):
+        boards = self._np.asarray(boards)
+        return self.heuristic_manhattan_distance(boards) + self.heuristic_linear_conflict(boards)
+
+    def evaluate(self, boards, heuristic: str = HEURISTIC_LINEAR_CONFLICT):
+        if heuristic not in self.heuristic_functions:
+            raise RuntimeError(f'No batch evaluation for the {heuristic} heuristic. '
+                               f'Must be one of {list(self.heuristic_functions)}')
+        return getattr(self, self.heuristic_functions[heuristic])(boards)
+
+
+def is_available():
+    """Whether NumPy can be imported, without importing it"""
+    return importlib.util.find_spec('numpy') is not None
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError('Batch heuristics require NumPy: pip install fifteen_puzzle_solvers[numpy]') from None
+    return numpy
@@ -3,19 +3,60 @@ HEURISTIC_MISPLACED = 'misplaced'
 HEURISTIC_LINEAR_CONFLICT = 'linear_conflict'
 HEURISTIC_WALKING_DISTANCE = 'walking_distance'
 HEURISTIC_TOTAL = 'total'
+HEURISTIC_PATTERN_DATABASE = 'pattern_database'
 
 HEURISTIC_OPTIONS = [
     HEURISTIC_MANHATTAN_DISTANCE,
     HEURISTIC_MISPLACED,
-    # HEURISTIC_LINEAR_CONFLICT,
-    # HEURISTIC_WALKING_DISTANCE,
-    HEURISTIC_TOTAL
+    HEURISTIC_LINEAR_CONFLICT,
+    HEURISTIC_WALKING_DISTANCE,
+    HEURISTIC_TOTAL,
+    HEURISTIC_PATTERN_DATABASE
 ]
 
+# the walking distance tables of bigger puzzles are too large to generate
+WALKING_DISTANCE_MAX_SIZE = 4
+
+# positions whose heuristic parts the total heuristic keeps for the moves from them, about 300 bytes each
+TOTAL_HEURISTIC_CACHE_SIZE = 1 << 16
+
+# disjoint tile partitions for the additive pattern databases
+PATTERN_DATABASE_PARTITION_4_4 = ((1, 2, 3, 4), (5, 6, 7, 8))
+PATTERN_DATABASE_PARTITION_5_5_5 = ((1, 5, 6, 9, 13), (2, 3, 4, 7, 8), (10, 11, 12, 14, 15))
+PATTERN_DATABASE_PARTITION_6_6_3 = ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4))
+PATTERN_DATABASE_PARTITION_7_8 = ((1, 2, 3, 4, 5, 6, 7), (8, 9, 10, 11, 12, 13, 14, 15))
+
+# partitions used by default for every puzzle size, bigger patterns are stronger but take longer to build
+PATTERN_DATABASE_PARTITIONS = {
+    3: PATTERN_DATABASE_PARTITION_4_4,
+    4: PATTERN_DATABASE_PARTITION_5_5_5
+}
+
+# positions within this many moves of the end position are stored in the endgame databases
+ENDGAME_DATABASE_DEPTH = 20
+
+# the distance tables hold one byte for every permutation of the tiles, which is 16! for 4x4 puzzles
+DISTANCE_TABLE_MAX_SIZE = 3
+
 ASTAR = 'A*'
 BREADTH_FIRST = 'Breadth First'
+BIDIRECTIONAL_BREADTH_FIRST = 'Bidirectional Breadth First'
+IDA_STAR = 'IDA*'
+PARALLEL_IDA_STAR = 'Parallel IDA*'
+MEMORY_BOUNDED_ASTAR = 'Memory-Bounded A*'
+ANYTIME_ASTAR = 'Anytime A*'
+TABLE_LOOKUP = 'Table Lookup'
 
 ALGORITHM_OPTIONS = [
     ASTAR,
-    BREADTH_FIRST
+    BREADTH_FIRST,
+    BIDIRECTIONAL_BREADTH_FIRST,
+    IDA_STAR,
+    PARALLEL_IDA_STAR,
+    MEMORY_BOUNDED_ASTAR,
+    ANYTIME_ASTAR,
+    TABLE_LOOKUP
 ]
+
+# lets the strategy registry pick the strategy and heuristic for the puzzle size
+FASTEST_OPTIMAL = 'Fastest Optimal'
@@ -0,0 +1,133 @@
+import mmap
+import os
+from math import factorial
+from typing import Dict, List, Optional, Sequence
+
+from fifteen_puzzle_solvers.domain import PuzzleEncoder
+from fifteen_puzzle_solvers.services.puzzle.constants import DISTANCE_TABLE_MAX_SIZE
+from fifteen_puzzle_solvers.services.puzzle.storage import PACKAGE_DATA_DIRECTORY, get_data_directory, \
+    write_atomically
+
+UNREACHABLE = 0xFF
+
+
+class DistanceTable:
+    """
+    Exact distance to the end position of every position of a small puzzle.
+
+    The table holds one byte per permutation of the tiles (the blank included), indexed by the rank of the
+    permutation in lexicographic order (its Lehmer code), and UNREACHABLE for the unsolvable half. The 3x3 table
+    ships with the package, and the tables of other sizes are built the first time they are needed. An optimal
+    solution walks the table downhill: every move goes to a neighbour that is one move closer to the end.
+    """
+    _tables: Dict[int, 'DistanceTable'] = {}
+
+    def __init__(self, size: int, directory: str = None):
+        if size > DISTANCE_TABLE_MAX_SIZE:
+            raise RuntimeError(f'Distance tables are limited to {DISTANCE_TABLE_MAX_SIZE}x{DISTANCE_TABLE_MAX_SIZE} '
+                               f'puzzles, the permutations of bigger ones do not fit in memory')
+        self.size = size
+        self.encoder = PuzzleEncoder.for_size(size)
+        num_tiles = size * size
+        self.num_permutations = factorial(num_tiles)
+        self._factors = [factorial(num_tiles - i - 1) for i in range(num_tiles)]
+        file_name = f'distances-{size}x{size}.bin'
+        packaged_path = os.path.join(PACKAGE_DATA_DIRECTORY, file_name)
+        if directory is None and os.path.exists(packaged_path):
+            self.path = packaged_path
+        else:
+            self.path = os.path.join(directory or get_data_directory(), file_name)
+        self._table = None
+
+    @classmethod
+    def for_size(cls, size: int) -> 'DistanceTable':
+        table = cls._tables.get(size)
+        if table is None:
+            table = cls._tables[size] = cls(size)
+        return table
+
+    @property
+    def table(self):
+        if self._table is None:
+            if not os.path.exists(self.path):
+                self.save(self.build())
+            self._table = self._load()
+        return self._table
+
+    def rank(self, tiles: Sequence[int]) -> int:
+        rank = 0
+        used = 0
+        for factor, tile in zip(self._factors, tiles):
+            rank += (tile - bin(used & ((1 << tile) - 1)).count('1')) * factor
+            used |= 1 << tile
+        return rank
+
+    def lookup(self, tiles: Sequence[int]) -> Optional[int]:
+        """Returns the number of moves from the tiles in row-major order to the end position, None if unsolvable"""
+        distance = self.table[self.rank(tiles)]
+        return None if distance == UNREACHABLE else distance
+
+    def blank_path(self, tiles: Sequence[int]) -> List[int]:
+        """Returns the positions of the blank after every move of an optimal solution"""
+        table = self.table
+        rank = self.rank
+        neighbours = self.encoder.neighbours
+        board = list(tiles)
+        blank = board.index(0)
+        distance = table[rank(board)]
+        if distance == UNREACHABLE:
+            raise RuntimeError('This puzzle is not solvable')
+
+        path = []
+        while distance:
+            for target in neighbours[blank]:
+                board[blank], board[target] = board[target], 0
+                if table[rank(board)] == distance - 1:
+                    break
+                board[target], board[blank] = board[blank], 0
+            path.append(target)
+            blank = target
+            distance -= 1
+        return path
+
+    def build(self) -> bytearray:
+        """Breadth-first search from the end position over the packed states"""
+        encoder = self.encoder
+        decode_tiles = encoder.decode_tiles
+        table = bytearray([UNREACHABLE]) * self.num_permutations
+        table[self.rank(decode_tiles(encoder.end_state))] = 0
+        frontier = [(encoder.end_state, encoder.end_blank, -1)]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for state, blank, previous_blank in frontier:
+                for move_state, _, move_blank in encoder.get_successors(state, blank, previous_blank):
+                    move_rank = self.rank(decode_tiles(move_state))
+                    if table[move_rank] == UNREACHABLE:
+                        table[move_rank] = distance
+                        next_frontier.append((move_state, move_blank, blank))
+            frontier = next_frontier
+        return table
+
+    def save(self, table: bytearray):
+        write_atomically(self.path, table)
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            # the pages of a read-only mapping are shared by all the processes that use the same table
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(table) != self.num_permutations:
+            raise RuntimeError(f'Invalid distance table file {self.path}')
+        return table
+
+
+if __name__ == '__main__':
+    # rebuilds the distance tables shipped with the package, e.g. python -m <module> 3
+    import sys
+
+    os.makedirs(PACKAGE_DATA_DIRECTORY, exist_ok=True)
+    for puzzle_size in map(int, sys.argv[1:]):
+        distance_table = DistanceTable(puzzle_size, directory=PACKAGE_DATA_DIRECTORY)
+        distance_table.save(distance_table.build())
+        print(f'Saved {distance_table.path}')
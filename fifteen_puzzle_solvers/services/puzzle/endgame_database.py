@@ -0,0 +1,170 @@
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from fifteen_puzzle_solvers.domain import PuzzleEncoder
+from fifteen_puzzle_solvers.domain.encoding import HASH_MULTIPLIER, HASH_MASK
+from fifteen_puzzle_solvers.services.puzzle.constants import ENDGAME_DATABASE_DEPTH
+from fifteen_puzzle_solvers.services.puzzle.storage import get_data_directory, write_atomically
+
+MAX_LOAD_FACTOR = 2 / 3
+
+
+class EndgameDatabase:
+    """
+    Exact distances to the end position of every position at most depth moves away from it.
+
+    The positions are found by a breadth-first search backwards from the end position and stored in an open
+    addressing hash table: a slot is the packed state (zero for an empty slot) and a byte with the distance and
+    the index of the best move in PuzzleEncoder.neighbours, so the solution of a stored position is read off the
+    table one move at a time. Only boards whose packed states fit in 64 bits (up to 4x4) are supported.
+    The table is memory mapped from disk when it is first needed.
+    """
+    _header = struct.Struct('<4sBBxxQ')
+    _magic = b'FEGD'
+    _databases: Dict[Tuple[int, int], 'EndgameDatabase'] = {}
+
+    def __init__(self, size: int, depth: int = ENDGAME_DATABASE_DEPTH, directory: str = None):
+        self.size = size
+        self.depth = depth
+        self.encoder = PuzzleEncoder.for_size(size)
+        if self.encoder.bits_per_tile * self.encoder.num_tiles > 64:
+            raise RuntimeError(f'Endgame databases are limited to boards that pack into 64 bits, not {size}x{size}')
+        if depth > 63:
+            raise RuntimeError('The depth of an endgame database must be at most 63 moves')
+        self.path = os.path.join(directory or get_data_directory(), f'endgame-{size}x{size}-{depth}.bin')
+        self._table = None
+        self._keys = None
+        self._values = None
+        self._slot_mask = 0
+        self._hash_shift = 64
+
+    @classmethod
+    def for_size(cls, size: int, depth: int = ENDGAME_DATABASE_DEPTH) -> 'EndgameDatabase':
+        key = (size, depth)
+        database = cls._databases.get(key)
+        if database is None:
+            database = cls._databases[key] = cls(size, depth)
+        return database
+
+    @property
+    def table(self):
+        if self._table is None:
+            if not os.path.exists(self.path):
+                self.save(*self.build())
+            self._table = self._load()
+        return self._table
+
+    @property
+    def num_slots(self) -> int:
+        self.table
+        return len(self._values)
+
+    def lookup(self, state: int) -> Optional[int]:
+        """
+        Returns the number of moves from the packed position to the end position, or None when it is further
+        than depth moves away
+        """
+        value = self._find(state)
+        return None if value is None else value >> 2
+
+    def blank_path(self, state: int, blank: int = None) -> List[int]:
+        """Returns the positions of the blank after every move of an optimal solution of a stored position"""
+        encoder = self.encoder
+        if blank is None:
+            blank = encoder.find_blank(state)
+        value = self._find(state)
+        if value is None:
+            raise RuntimeError(f'The position is more than {self.depth} moves away from the end position')
+        path = []
+        while value >> 2:
+            state, blank = encoder.move_blank(state, blank, encoder.neighbours[blank][value & 3])
+            path.append(blank)
+            value = self._find(state)
+        return path
+
+    def _find(self, state):
+        if self._keys is None:
+            self.table
+        keys = self._keys
+        slot = ((state * HASH_MULTIPLIER) & HASH_MASK) >> self._hash_shift
+        while True:
+            key = keys[slot]
+            if key == state:
+                return self._values[slot]
+            if not key:
+                return None
+            slot = (slot + 1) & self._slot_mask
+
+    def build(self) -> Tuple[array, bytearray]:
+        """
+        Retrograde breadth-first search from the end position, returns the keys and the values of the hash table.
+
+        The graph of positions is bipartite, so the neighbours of a level are in the level before or the level
+        after it, and only those two levels are kept in sets to find the positions that were already reached.
+        """
+        encoder = self.encoder
+        neighbours = encoder.neighbours
+        # every level is its packed states, their blank indexes and the index of the move back to the parent
+        levels = [(array('Q', [encoder.end_state]), bytearray([encoder.end_blank]), bytearray([0]))]
+        previous, current = set(), {encoder.end_state}
+
+        for _ in range(self.depth):
+            states, blanks, moves = levels[-1]
+            next_states, next_blanks, next_moves = array('Q'), bytearray(), bytearray()
+            reached = set()
+            for state, blank, move in zip(states, blanks, moves):
+                parent_blank = neighbours[blank][move] if state != encoder.end_state else -1
+                for move_state, _, move_blank in encoder.get_successors(state, blank, parent_blank):
+                    if move_state not in previous and move_state not in reached:
+                        reached.add(move_state)
+                        next_states.append(move_state)
+                        next_blanks.append(move_blank)
+                        next_moves.append(neighbours[move_blank].index(blank))
+            levels.append((next_states, next_blanks, next_moves))
+            previous, current = current, reached
+
+        num_positions = sum(len(states) for states, _, _ in levels)
+        num_slots = 1 << max(1, int(num_positions / MAX_LOAD_FACTOR)).bit_length()
+        hash_shift = 64 - num_slots.bit_length() + 1
+        slot_mask = num_slots - 1
+        keys = array('Q', bytes(8 * num_slots))
+        values = bytearray(num_slots)
+        for distance, (states, _, moves) in enumerate(levels):
+            for state, move in zip(states, moves):
+                slot = ((state * HASH_MULTIPLIER) & HASH_MASK) >> hash_shift
+                while keys[slot]:
+                    slot = (slot + 1) & slot_mask
+                keys[slot] = state
+                values[slot] = distance << 2 | move
+        return keys, values
+
+    def save(self, keys: array, values: bytearray):
+        write_atomically(self.path, [self._header.pack(self._magic, self.size, self.depth, len(values)),
+                                     keys.tobytes(), values])
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            # the pages of a read-only mapping are shared by all the processes that use the same table
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size, depth, num_slots = self._header.unpack_from(table)
+        if magic != self._magic or size != self.size or depth != self.depth or \
+                len(table) != self._header.size + 9 * num_slots:
+            raise RuntimeError(f'Invalid endgame database file {self.path}')
+        keys_end = self._header.size + 8 * num_slots
+        self._keys = memoryview(table)[self._header.size:keys_end].cast('Q')
+        self._values = memoryview(table)[keys_end:]
+        self._slot_mask = num_slots - 1
+        self._hash_shift = 64 - num_slots.bit_length() + 1
+        return table
+
+
+if __name__ == '__main__':
+    # builds an endgame database ahead of time, e.g. python -m <module> 4 20
+    import sys
+
+    endgame_database = EndgameDatabase.for_size(int(sys.argv[1]), *map(int, sys.argv[2:3]))
+    endgame_database.save(*endgame_database.build())
+    print(f'Saved {endgame_database.path}')
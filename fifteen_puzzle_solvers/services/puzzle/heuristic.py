@@ -1,10 +1,45 @@
+from bisect import bisect_left
+
+from fifteen_puzzle_solvers.domain import PuzzleEncoder
+from fifteen_puzzle_solvers.services.puzzle.constants import PATTERN_DATABASE_PARTITIONS, TOTAL_HEURISTIC_CACHE_SIZE, \
+    WALKING_DISTANCE_MAX_SIZE
+from fifteen_puzzle_solvers.services.puzzle.pattern_database import PatternDatabase
+from fifteen_puzzle_solvers.services.puzzle.walking_distance import WalkingDistanceTable
+
+
 class PuzzleHeuristicService:
     """
     Provides services for calculating puzzle heuristics.
+
+    Besides the full evaluation of a position, every heuristic has a ``*_delta`` counterpart that returns the
+    change of the heuristic caused by sliding a single tile. The delta functions share the signature
+    ``(board, tile_at, tile, from_index, to_index)``, where ``board`` is the position after the move in any
+    flat representation, ``tile_at(board, index)`` reads one of its tiles and the indexes are row-major.
     """
 
-    def __init__(self, end_position):
+    def __init__(self, end_position, pattern_partition=None):
         self.end_position = end_position
+        self.size = size = len(end_position)
+        self.pattern_partition = pattern_partition or PATTERN_DATABASE_PARTITIONS.get(size)
+        self._pattern_databases = None
+        self._tile_patterns = {}
+        self._total_parts = {}
+        self._shifts = PuzzleEncoder.for_size(size).shifts
+        end_tiles = [tile for row in end_position for tile in row]
+
+        # per-tile, per-position tables used by the delta functions
+        goal_indexes = [0] * (size * size)
+        for index, tile in enumerate(end_tiles):
+            goal_indexes[tile] = index
+        self._goal_coordinates = [divmod(index, size) for index in goal_indexes]
+        self._manhattan = [[0] * (size * size) for _ in range(size * size)]
+        self._misplaced = [[0] * (size * size) for _ in range(size * size)]
+        for tile, (goal_row, goal_col) in enumerate(self._goal_coordinates):
+            for index in range(size * size):
+                row, col = divmod(index, size)
+                if tile != 0:
+                    self._manhattan[tile][index] = abs(row - goal_row) + abs(col - goal_col)
+                self._misplaced[tile][index] = int(end_tiles[index] != tile)
 
     def heuristic_misplaced(self, position):
         misplaced = 0
@@ -26,58 +61,259 @@ class PuzzleHeuristicService:
                     distance += abs(i - target_row) + abs(j - target_col)
         return distance
 
+    def heuristic_misplaced_delta(self, board, tile_at, tile, from_index, to_index):
+        # the blank moves the opposite way of the tile and is counted by heuristic_misplaced as well
+        misplaced, blank = self._misplaced[tile], self._misplaced[0]
+        return misplaced[to_index] - misplaced[from_index] + blank[from_index] - blank[to_index]
+
+    def heuristic_manhattan_distance_delta(self, board, tile_at, tile, from_index, to_index):
+        manhattan = self._manhattan[tile]
+        return manhattan[to_index] - manhattan[from_index]
+
     @staticmethod
     def heuristic_linear_conflict(position):
+        # Two tiles in their goal row (or column) but in the wrong order block each other, and one of them has
+        # to leave the line and come back. Every tile outside of the longest correctly ordered subsequence of a
+        # line needs those two extra moves, on top of its manhattan distance.
         conflict = 0
         size = len(position)
 
         # Row conflicts
         for row in range(size):
-            max_val = -1
-            for col in range(size):
-                value = position[row][col]
-                if value != 0 and (value - 1) // size == row:
-                    if value > max_val:
-                        max_val = value
-                    else:
-                        conflict += 2
+            conflict += _count_line_conflicts(
+                [value for value in position[row] if value != 0 and (value - 1) // size == row])
 
         # Column conflicts
         for col in range(size):
-            max_val = -1
-            for row in range(size):
-                value = position[row][col]
-                if value != 0 and (value - 1) % size == col:
-                    if value > max_val:
-                        max_val = value
-                    else:
-                        conflict += 2
+            conflict += _count_line_conflicts(
+                [position[row][col] for row in range(size)
+                 if position[row][col] != 0 and (position[row][col] - 1) % size == col])
 
         return conflict
 
-    @staticmethod
-    def heuristic_walking_distance(position):
-        # Create a grid to store the walking distances
-        size = len(position)
-        distance_grid = [[0] * size for _ in range(size)]
+    def heuristic_linear_conflict_delta(self, board, tile_at, tile, from_index, to_index):
+        size = self.size
+        from_row, from_col = divmod(from_index, size)
+        to_row, to_col = divmod(to_index, size)
+        goal_row, goal_col = self._goal_coordinates[tile]
 
-        for row in range(size):
-            for col in range(size):
-                value = position[row][col]
-                if value != 0:
-                    target_row = (value - 1) // size
-                    target_col = (value - 1) % size
-                    distance_grid[row][col] = abs(row - target_row) + abs(col - target_col)
-
-        # Calculate the walking distance
-        walking_distance = 0
-        for row in range(size):
-            for col in range(size):
-                walking_distance += distance_grid[row][col]
+        # A vertical move keeps the order of every column and only changes the rows the tile leaves and enters.
+        # Those rows are affected only if one of them is the goal row of the tile, and the same holds for
+        # horizontal moves and columns.
+        if from_col == to_col:
+            if goal_row not in (from_row, to_row):
+                return 0
+            line = goal_row
+            indexes = range(line * size, (line + 1) * size)
+            is_relevant = self._is_in_goal_row
+        else:
+            if goal_col not in (from_col, to_col):
+                return 0
+            line = goal_col
+            indexes = range(line, size * size, size)
+            is_relevant = self._is_in_goal_column
+
+        after = [tile_at(board, index) for index in indexes]
+        before = list(after)
+        for position, index in enumerate(indexes):
+            if index == from_index:
+                before[position] = tile
+            elif index == to_index:
+                before[position] = 0
+        return (_count_line_conflicts([value for value in after if value != 0 and is_relevant(value, line)]) -
+                _count_line_conflicts([value for value in before if value != 0 and is_relevant(value, line)]))
+
+    def _is_in_goal_row(self, tile, line):
+        return self._goal_coordinates[tile][0] == line
+
+    def _is_in_goal_column(self, tile, line):
+        return self._goal_coordinates[tile][1] == line
+
+    def heuristic_manhattan_linear_conflict(self, position):
+        return self.heuristic_manhattan_distance(position) + self.heuristic_linear_conflict(position)
+
+    def heuristic_manhattan_linear_conflict_delta(self, board, tile_at, tile, from_index, to_index):
+        return (self.heuristic_manhattan_distance_delta(board, tile_at, tile, from_index, to_index) +
+                self.heuristic_linear_conflict_delta(board, tile_at, tile, from_index, to_index))
+
+    @property
+    def walking_distance_table(self):
+        if self.size > WALKING_DISTANCE_MAX_SIZE:
+            raise RuntimeError(f'Walking distance is only available up to {WALKING_DISTANCE_MAX_SIZE}x'
+                               f'{WALKING_DISTANCE_MAX_SIZE} puzzles')
+        return WalkingDistanceTable.for_size(self.size)
 
-        return walking_distance
+    def heuristic_walking_distance(self, position):
+        return self._walking_distance([tile for row in position for tile in row])
+
+    def _walking_distance(self, tiles):
+        size = self.size
+        table = self.walking_distance_table
+        rows, columns = [0] * (size * size), [0] * (size * size)
+        blank_row = blank_col = 0
+        for index, tile in enumerate(tiles):
+            row, col = divmod(index, size)
+            if tile != 0:
+                goal_row, goal_col = self._goal_coordinates[tile]
+                rows[row * size + goal_row] += 1
+                columns[col * size + goal_col] += 1
+            else:
+                blank_row, blank_col = row, col
+
+        # the columns are counted like the rows of the transposed board, which has the same end position
+        return table.lookup(rows, blank_row) + table.lookup(columns, blank_col)
+
+    def heuristic_walking_distance_delta(self, board, tile_at, tile, from_index, to_index):
+        size = self.size
+        table = self.walking_distance_table
+        from_row, from_col = divmod(from_index, size)
+        to_row, to_col = divmod(to_index, size)
+
+        # a vertical move only changes the row counts and a horizontal move only the column counts
+        if from_col == to_col:
+            line_of, goal, before_line, after_line = 0, self._goal_coordinates[tile][0], from_row, to_row
+        else:
+            line_of, goal, before_line, after_line = 1, self._goal_coordinates[tile][1], from_col, to_col
+
+        counts = [0] * (size * size)
+        for index in range(size * size):
+            value = tile_at(board, index)
+            if value != 0:
+                counts[divmod(index, size)[line_of] * size + self._goal_coordinates[value][line_of]] += 1
+        after = table.lookup(counts, before_line)
+        counts[after_line * size + goal] -= 1
+        counts[before_line * size + goal] += 1
+        return after - table.lookup(counts, after_line)
 
     def heuristic_total(self, position):
-        return (self.heuristic_manhattan_distance(position) +
-                self.heuristic_linear_conflict(position) +
-                self.heuristic_walking_distance(position))
+        # walking distance and linear conflict can't be added together, but the larger one is still admissible
+        if self.size > WALKING_DISTANCE_MAX_SIZE:
+            return self.heuristic_manhattan_linear_conflict(position)
+        return max(self.heuristic_manhattan_linear_conflict(position), self.heuristic_walking_distance(position))
+
+    def heuristic_total_delta(self, board, tile_at, tile, from_index, to_index):
+        if self.size > WALKING_DISTANCE_MAX_SIZE:
+            return self.heuristic_manhattan_linear_conflict_delta(board, tile_at, tile, from_index, to_index)
+
+        # The maximum can't be updated from the deltas alone, so the parts of every evaluated position are kept
+        # and the parts of a child are those of its parent updated by the move. Only a parent that is no longer
+        # kept is evaluated in full.
+        size = self.size
+        table = self.walking_distance_table
+        parts = self._total_parts
+        if isinstance(board, int):
+            key = board
+            parent_key = board + (tile << self._shifts[from_index]) - (tile << self._shifts[to_index])
+        else:
+            key = tuple(board)
+            parent_tiles = list(key)
+            parent_tiles[from_index], parent_tiles[to_index] = tile, 0
+            parent_key = tuple(parent_tiles)
+        parent = parts.get(parent_key)
+        if parent is None:
+            if isinstance(board, int):
+                parent_tiles = [tile_at(board, index) for index in range(size * size)]
+                parent_tiles[from_index], parent_tiles[to_index] = tile, 0
+            parent = self._evaluate_total_parts(parent_tiles, to_index)
+        manhattan_linear_conflict, walking_distance, rows, columns = parent
+
+        # the linear conflict delta only reads the goal line of the tile, and only one count of the rows (or the
+        # columns) changes
+        move_manhattan_linear_conflict = manhattan_linear_conflict + \
+            self.heuristic_manhattan_linear_conflict_delta(board, tile_at, tile, from_index, to_index)
+        from_row, from_col = divmod(from_index, size)
+        to_row, to_col = divmod(to_index, size)
+        goal_row, goal_col = self._goal_coordinates[tile]
+        if from_col == to_col:
+            counts = bytearray(rows)
+            counts[from_row * size + goal_row] -= 1
+            counts[to_row * size + goal_row] += 1
+            rows = bytes(counts)
+        else:
+            counts = bytearray(columns)
+            counts[from_col * size + goal_col] -= 1
+            counts[to_col * size + goal_col] += 1
+            columns = bytes(counts)
+        move_walking_distance = table.lookup(rows, from_row) + table.lookup(columns, from_col)
+
+        if len(parts) >= TOTAL_HEURISTIC_CACHE_SIZE:
+            parts.clear()
+        parts[key] = move_manhattan_linear_conflict, move_walking_distance, rows, columns
+        return max(move_manhattan_linear_conflict, move_walking_distance) - \
+            max(manhattan_linear_conflict, walking_distance)
+
+    def _evaluate_total_parts(self, tiles, blank):
+        """Returns the manhattan distance with linear conflicts, the walking distance and its row and column counts"""
+        size = self.size
+        table = self.walking_distance_table
+        rows, columns = bytearray(size * size), bytearray(size * size)
+        row_lines, column_lines = [[] for _ in range(size)], [[] for _ in range(size)]
+        manhattan_distance = 0
+        for index, tile in enumerate(tiles):
+            if tile != 0:
+                row, col = divmod(index, size)
+                goal_row, goal_col = self._goal_coordinates[tile]
+                manhattan_distance += self._manhattan[tile][index]
+                rows[row * size + goal_row] += 1
+                columns[col * size + goal_col] += 1
+                if goal_row == row:
+                    row_lines[row].append(tile)
+                if goal_col == col:
+                    column_lines[col].append(tile)
+
+        manhattan_linear_conflict = manhattan_distance + sum(map(_count_line_conflicts, row_lines)) + \
+            sum(map(_count_line_conflicts, column_lines))
+        blank_row, blank_col = divmod(blank, size)
+        rows, columns = bytes(rows), bytes(columns)
+        walking_distance = table.lookup(rows, blank_row) + table.lookup(columns, blank_col)
+        return manhattan_linear_conflict, walking_distance, rows, columns
+
+    @property
+    def pattern_databases(self):
+        self._ensure_pattern_databases()
+        return self._pattern_databases
+
+    def _ensure_pattern_databases(self):
+        """Opens the pattern databases of the partition and maps every tile to its pattern, once"""
+        if self._pattern_databases is None:
+            if not self.pattern_partition:
+                raise RuntimeError(f'No pattern database partition for {self.size}x{self.size} puzzles')
+            self._pattern_databases = [PatternDatabase.for_pattern(self.size, tiles)
+                                       for tiles in self.pattern_partition]
+            for database in self._pattern_databases:
+                for i, tile in enumerate(database.tiles):
+                    self._tile_patterns[tile] = (database, i)
+
+    def heuristic_pattern_database(self, position):
+        cells = [0] * (self.size * self.size)
+        for index, tile in enumerate(tile for row in position for tile in row):
+            cells[tile] = index
+        return sum(database.lookup([cells[tile] for tile in database.tiles]) for database in self.pattern_databases)
+
+    def heuristic_pattern_database_delta(self, board, tile_at, tile, from_index, to_index):
+        self._ensure_pattern_databases()
+        pattern = self._tile_patterns.get(tile)
+        if pattern is None:
+            return 0
+
+        # only the pattern that contains the moved tile changes its cost
+        database, moved = pattern
+        cells = [0] * (self.size * self.size)
+        for index in range(self.size * self.size):
+            cells[tile_at(board, index)] = index
+        after = [cells[pattern_tile] for pattern_tile in database.tiles]
+        before = list(after)
+        before[moved] = from_index
+        return database.lookup(after) - database.lookup(before)
+
+
+def _count_line_conflicts(values):
+    # two moves for each of the values outside of the longest increasing subsequence
+    tails = []
+    for value in values:
+        i = bisect_left(tails, value)
+        if i == len(tails):
+            tails.append(value)
+        else:
+            tails[i] = value
+    return 2 * (len(values) - len(tails))
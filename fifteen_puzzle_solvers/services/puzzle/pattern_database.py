@@ -0,0 +1,159 @@
+import mmap
+import os
+import struct
+from typing import Dict, Sequence, Tuple
+
+from fifteen_puzzle_solvers.domain import Puzzle
+from fifteen_puzzle_solvers.services.puzzle.storage import PACKAGE_DATA_DIRECTORY, get_data_directory, \
+    write_atomically
+
+UNREACHED = 0xFF
+
+
+class PatternDatabase:
+    """
+    Exact solution costs of the abstract puzzle where only the tiles of one pattern are distinguishable.
+
+    Only the moves of pattern tiles are counted, so the costs of disjoint patterns can be added together.
+    The table holds one byte per placement of the pattern tiles, indexed by the rank of the placement as
+    a k-permutation of the board cells, and is memory mapped from disk when it is first needed. The tables of
+    the default 4x4 partition ship with the package, the others are built the first time they are needed.
+    """
+    _header = struct.Struct('<4sBB')
+    _magic = b'FPDB'
+    _databases: Dict[Tuple[int, Tuple[int, ...]], 'PatternDatabase'] = {}
+
+    def __init__(self, size: int, tiles: Sequence[int], directory: str = None):
+        self.size = size
+        self.tiles = tuple(tiles)
+        file_name = f'pdb-{size}x{size}-{"-".join(map(str, self.tiles))}.bin'
+        packaged_path = os.path.join(PACKAGE_DATA_DIRECTORY, file_name)
+        if directory is None and os.path.exists(packaged_path):
+            self.path = packaged_path
+        else:
+            self.path = os.path.join(directory or get_data_directory(), file_name)
+        self._table = None
+
+        num_cells, num_tiles = size * size, len(self.tiles)
+        self._factors = [1] * num_tiles
+        for i in range(num_tiles - 2, -1, -1):
+            self._factors[i] = self._factors[i + 1] * (num_cells - i - 1)
+        self.num_placements = self._factors[0] * num_cells
+        self.file_size = self._header.size + num_tiles + self.num_placements
+
+    @classmethod
+    def for_pattern(cls, size: int, tiles: Sequence[int]) -> 'PatternDatabase':
+        key = (size, tuple(tiles))
+        database = cls._databases.get(key)
+        if database is None:
+            database = cls._databases[key] = cls(size, tiles)
+        return database
+
+    @property
+    def table(self):
+        if self._table is None:
+            # a file cut short, e.g. by a full disk, is built again instead of giving wrong costs
+            if not os.path.exists(self.path) or os.path.getsize(self.path) != self.file_size:
+                self.save(self.build())
+            self._table = self._load()
+        return self._table
+
+    def lookup(self, positions: Sequence[int]) -> int:
+        """
+        Returns the cost for the cell indexes of the pattern tiles, given in the order of self.tiles
+        """
+        return self.table[self._header.size + len(self.tiles) + self.rank(positions)]
+
+    def rank(self, positions: Sequence[int]) -> int:
+        rank = 0
+        used = 0
+        for factor, position in zip(self._factors, positions):
+            rank += (position - bin(used & ((1 << position) - 1)).count('1')) * factor
+            used |= 1 << position
+        return rank
+
+    def build(self) -> bytearray:
+        """
+        Retrograde breadth-first search from the end position over the abstract puzzle.
+
+        Moving the blank over cells without a pattern tile is free, so a state is a placement of the pattern
+        tiles together with the region of cells the blank can reach without moving any of them.
+        """
+        size, num_cells = self.size, self.size * self.size
+        neighbours = [[] for _ in range(num_cells)]
+        for cell in range(num_cells):
+            row, column = divmod(cell, size)
+            if row > 0:
+                neighbours[cell].append(cell - size)
+            if column < size - 1:
+                neighbours[cell].append(cell + 1)
+            if column > 0:
+                neighbours[cell].append(cell - 1)
+            if row < size - 1:
+                neighbours[cell].append(cell + size)
+
+        end_tiles = [tile for row in Puzzle.generate_end_position(size) for tile in row]
+        table = bytearray([UNREACHED]) * self.num_placements
+        # per placement and blank cell: 1 once queued, 2 once the region of the cell has been expanded
+        seen = bytearray(self.num_placements * num_cells)
+        start = tuple(end_tiles.index(tile) for tile in self.tiles)
+        frontier = [(start, self.rank(start), end_tiles.index(0))]
+        cost = 0
+
+        while frontier:
+            next_frontier = []
+            for positions, rank, blank in frontier:
+                offset = rank * num_cells
+                if seen[offset + blank] == 2:
+                    continue
+                if table[rank] == UNREACHED:
+                    table[rank] = cost
+
+                occupied = set(positions)
+                region = [blank]
+                seen[offset + blank] = 2
+                for cell in region:
+                    for neighbour in neighbours[cell]:
+                        if neighbour not in occupied and seen[offset + neighbour] != 2:
+                            seen[offset + neighbour] = 2
+                            region.append(neighbour)
+
+                for cell in region:
+                    for neighbour in neighbours[cell]:
+                        if neighbour in occupied:
+                            moved = positions.index(neighbour)
+                            next_positions = positions[:moved] + (cell,) + positions[moved + 1:]
+                            next_rank = self.rank(next_positions)
+                            if not seen[next_rank * num_cells + neighbour]:
+                                seen[next_rank * num_cells + neighbour] = 1
+                                next_frontier.append((next_positions, next_rank, neighbour))
+            frontier = next_frontier
+            cost += 1
+        return table
+
+    def save(self, table: bytearray):
+        write_atomically(self.path, self._header.pack(self._magic, self.size, len(self.tiles)) +
+                         bytes(self.tiles) + table)
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            # the pages of a read-only mapping are shared by all the processes that use the same table
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size, num_tiles = self._header.unpack_from(table)
+        if magic != self._magic or size != self.size or len(table) != self.file_size or \
+                tuple(table[self._header.size:self._header.size + num_tiles]) != self.tiles:
+            raise RuntimeError(f'Invalid pattern database file {self.path}')
+        return table
+
+
+if __name__ == '__main__':
+    # rebuilds the default pattern databases shipped with the package, e.g. python -m <module> 4
+    import sys
+    from fifteen_puzzle_solvers.services.puzzle.constants import PATTERN_DATABASE_PARTITIONS
+
+    os.makedirs(PACKAGE_DATA_DIRECTORY, exist_ok=True)
+    for puzzle_size in map(int, sys.argv[1:]):
+        for pattern in PATTERN_DATABASE_PARTITIONS[puzzle_size]:
+            pattern_database = PatternDatabase(puzzle_size, pattern, directory=PACKAGE_DATA_DIRECTORY)
+            pattern_database.save(pattern_database.build())
+            print(f'Saved {pattern_database.path}')
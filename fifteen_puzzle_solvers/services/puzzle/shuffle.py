@@ -9,13 +9,24 @@ class PuzzleShuffleService:
     Provides services for shuffling puzzles.
     """
 
+    @classmethod
+    def shuffle_puzzle(cls, size, generator: random.Random = None):
+        """
+        Uniformly random solvable puzzle, drawn from the given random generator or from the random module
+        """
+        tiles = cls.shuffle_tiles(size, generator)
+        return Puzzle([tiles[i:i + size] for i in range(0, len(tiles), size)])
+
     @staticmethod
-    def shuffle_puzzle(size):
-        end_position = Puzzle.generate_end_position(size)
-        while True:
-            flat_list = [item for sublist in end_position for item in sublist]
-            random.shuffle(flat_list)
-            shuffled_position = [flat_list[i:i + size] for i in range(0, len(flat_list), size)]
-            shuffled_puzzle = Puzzle(shuffled_position)
-            if PuzzleValidationService.is_solvable(shuffled_puzzle):
-                return shuffled_puzzle
+    def shuffle_tiles(size, generator: random.Random = None):
+        """
+        Shuffles the flat board and, when the permutation is not solvable, swaps the first two tiles that are not
+        the blank. The swap flips the parity of the inversions and pairs every unsolvable permutation with exactly
+        one solvable one, so no permutation has to be drawn twice and the result is still uniform.
+        """
+        tiles = list(range(1, size * size)) + [0]
+        (generator or random).shuffle(tiles)
+        if not PuzzleValidationService.is_solvable_tiles(tiles, size):
+            first, second = [index for index, tile in enumerate(tiles[:3]) if tile != 0][:2]
+            tiles[first], tiles[second] = tiles[second], tiles[first]
+        return tiles
@@ -0,0 +1,29 @@
+import os
+
+DATA_DIRECTORY_ENVIRONMENT_VARIABLE = 'FIFTEEN_PUZZLE_SOLVERS_DATA'
+PACKAGE_DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), 'data')  # tables that ship with the package
+
+
+def get_data_directory():
+    """
+    Returns the directory that holds the precomputed tables, creating it if needed.
+    It can be changed with the FIFTEEN_PUZZLE_SOLVERS_DATA environment variable.
+    """
+    directory = os.environ.get(DATA_DIRECTORY_ENVIRONMENT_VARIABLE) or \
+        os.path.join(os.path.expanduser('~'), '.cache', 'fifteen_puzzle_solvers')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def write_atomically(path, data):
+    """
+    Writes the bytes, or an iterable of byte chunks, to a temporary file and moves it into place
+    """
+    # other solver processes may be mapping the same file, so never expose a partially written table
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'wb') as f:
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            f.write(data)
+        else:
+            f.writelines(data)
+    os.replace(temporary_path, path)
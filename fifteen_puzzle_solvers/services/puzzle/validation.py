@@ -8,27 +8,41 @@ class PuzzleValidationService:
 
     @classmethod
     def is_solvable(cls, puzzle: Puzzle):
-        size = puzzle.num_rows
-        inversions_count = cls._get_inversions_count(puzzle.position)
-        blank_position = cls._get_blank_space_row_from_bottom(puzzle)
-        if size % 2 != 0 and inversions_count % 2 == 0:
-            return True
-        elif size % 2 == 0 and ((blank_position % 2 == 0 and inversions_count % 2 != 0) or (
-                blank_position % 2 != 0 and inversions_count % 2 == 0)):
-            return True
-        return False
+        return cls.is_solvable_tiles([tile for row in puzzle.position for tile in row], puzzle.num_rows)
 
     @staticmethod
-    def _get_inversions_count(position):
-        inv_count = 0
-        puzzle_list = [number for row in position for number in row if number != 0]
-        for i in range(len(puzzle_list)):
-            for j in range(i + 1, len(puzzle_list)):
-                if puzzle_list[i] > puzzle_list[j]:
-                    inv_count += 1
-        return inv_count
+    def is_solvable_tiles(tiles, size):
+        """
+        Solvability of the flat board: with an odd width every move keeps the parity of the inversions, with an even
+        width every vertical move also changes the row of the blank, so the two parities have to add up
+        """
+        inversions_count = PuzzleValidationService._count_inversions([tile for tile in tiles if tile != 0])
+        if size % 2 != 0:
+            return inversions_count % 2 == 0
+        blank_row_from_bottom = size - tiles.index(0) // size
+        return (inversions_count + blank_row_from_bottom) % 2 != 0
 
     @classmethod
-    def _get_blank_space_row_from_bottom(cls, puzzle: Puzzle):
-        zero_row, _ = puzzle.find_empty_tile()
-        return puzzle.num_rows - zero_row
+    def _get_inversions_count(cls, position):
+        return cls._count_inversions([number for row in position for number in row if number != 0])
+
+    @staticmethod
+    def _count_inversions(tiles):
+        """
+        Counts the pairs of tiles in the wrong order in O(n log n), with a Fenwick tree over the tiles seen so far
+        """
+        tree = [0] * (len(tiles) + 2)
+        inv_count = 0
+        for seen, tile in enumerate(tiles):
+            index = tile
+            not_greater = 0
+            while index > 0:
+                not_greater += tree[index]
+                index -= index & -index
+            inv_count += seen - not_greater
+
+            index = tile
+            while index < len(tree):
+                tree[index] += 1
+                index += index & -index
+        return inv_count
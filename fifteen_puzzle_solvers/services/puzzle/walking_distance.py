@@ -0,0 +1,84 @@
+import os
+from collections import deque
+from typing import Dict
+
+from fifteen_puzzle_solvers.services.puzzle.storage import get_data_directory, write_atomically
+
+
+class WalkingDistanceTable:
+    """
+    Takahashi's walking distance for one puzzle size.
+
+    A table state counts, for every row, how many of its tiles belong to each goal row, together with the row of
+    the blank. Vertical moves swap the blank with a tile of a neighbouring row, so the breadth-first distance of
+    a state from the end position is a lower bound on the vertical moves of the puzzle. By symmetry the same table
+    gives the horizontal moves when the columns are counted instead of the rows.
+    """
+    _tables: Dict[int, 'WalkingDistanceTable'] = {}
+
+    def __init__(self, size: int, directory: str = None):
+        self.size = size
+        self.path = os.path.join(directory or get_data_directory(), f'wd-{size}x{size}.bin')
+        self._distances = None
+
+    @classmethod
+    def for_size(cls, size: int) -> 'WalkingDistanceTable':
+        table = cls._tables.get(size)
+        if table is None:
+            table = cls._tables[size] = cls(size)
+        return table
+
+    @property
+    def distances(self) -> Dict[bytes, int]:
+        if self._distances is None:
+            if os.path.exists(self.path):
+                self._distances = self._load()
+            else:
+                self._distances = self.build()
+                self.save(self._distances)
+        return self._distances
+
+    def lookup(self, counts, blank_row: int) -> int:
+        """
+        Returns the walking distance for the flat size x size matrix of tile counts per (row, goal row)
+        """
+        return self.distances[bytes(counts) + bytes((blank_row,))]
+
+    def build(self) -> Dict[bytes, int]:
+        size = self.size
+        counts = [0] * (size * size)
+        for row in range(size):
+            counts[row * size + row] = size
+        counts[-1] -= 1  # the blank takes the last cell of the end position
+
+        start = bytes(counts) + bytes((size - 1,))
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            key = queue.popleft()
+            distance = distances[key] + 1
+            blank_row = key[-1]
+            for row in (blank_row - 1, blank_row + 1):
+                if not 0 <= row < size:
+                    continue
+                for goal_row in range(size):
+                    if key[row * size + goal_row]:
+                        next_key = bytearray(key)
+                        next_key[row * size + goal_row] -= 1
+                        next_key[blank_row * size + goal_row] += 1
+                        next_key[-1] = row
+                        next_key = bytes(next_key)
+                        if next_key not in distances:
+                            distances[next_key] = distance
+                            queue.append(next_key)
+        return distances
+
+    def save(self, distances: Dict[bytes, int]):
+        # fixed size records of the state followed by its distance
+        write_atomically(self.path, b''.join(key + bytes((distance,)) for key, distance in distances.items()))
+
+    def _load(self) -> Dict[bytes, int]:
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        record_size = self.size * self.size + 2
+        return {data[i:i + record_size - 1]: data[i + record_size - 1] for i in range(0, len(data), record_size)}
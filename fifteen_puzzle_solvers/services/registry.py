@@ -0,0 +1,156 @@
+import importlib
+from typing import Dict, List, NamedTuple, Optional
+
+from fifteen_puzzle_solvers.domain import Puzzle
+from fifteen_puzzle_solvers.services.puzzle.constants import (
+    HEURISTIC_MANHATTAN_DISTANCE, HEURISTIC_MISPLACED, HEURISTIC_LINEAR_CONFLICT, HEURISTIC_WALKING_DISTANCE,
+    HEURISTIC_TOTAL, HEURISTIC_PATTERN_DATABASE, PATTERN_DATABASE_PARTITIONS, WALKING_DISTANCE_MAX_SIZE,
+    ASTAR, BREADTH_FIRST, BIDIRECTIONAL_BREADTH_FIRST, IDA_STAR, PARALLEL_IDA_STAR, MEMORY_BOUNDED_ASTAR,
+    ANYTIME_ASTAR, TABLE_LOOKUP
+)
+
+
+class StrategyInfo(NamedTuple):
+    name: str
+    module: str  # imported only when the strategy is created
+    class_name: str
+    optimal: bool  # always returns an optimal solution when the search completes
+    memory_bounded: bool  # memory does not grow with the number of expanded nodes
+    parallel: bool  # spreads a single search over several processes
+    uses_heuristic: bool
+    max_size: Optional[int]  # biggest puzzle it solves in practice, None for no limit
+    speed: int  # rank among the strategies on the puzzles it supports, lower is faster
+
+    def supports(self, size: int) -> bool:
+        return self.max_size is None or size <= self.max_size
+
+
+class HeuristicInfo(NamedTuple):
+    name: str
+    function: str  # PuzzleHeuristicService method that evaluates a position
+    delta_function: str  # PuzzleHeuristicService method that updates it after a move
+    sizes: Optional[tuple]  # puzzle sizes it is available for, None for every size
+    strength: int  # rank of the estimates, higher prunes more
+
+    def supports(self, size: int) -> bool:
+        return self.sizes is None or size in self.sizes
+
+
+class StrategyRegistry:
+    """
+    Strategies and heuristics by name, with the capabilities callers choose them by.
+
+    Registering a strategy only records where its class lives, and the module is imported the first time the
+    strategy is created, so new engines are picked up by every caller (the UI, the benchmark) without importing
+    any search code up front.
+    """
+
+    def __init__(self):
+        self.strategies: Dict[str, StrategyInfo] = {}
+        self.heuristics: Dict[str, HeuristicInfo] = {}
+
+    def register_strategy(self, info: StrategyInfo):
+        self.strategies[info.name] = info
+
+    def register_heuristic(self, info: HeuristicInfo):
+        self.heuristics[info.name] = info
+
+    def get_strategy(self, name: str) -> StrategyInfo:
+        info = self.strategies.get(name)
+        if info is None:
+            raise RuntimeError(f'Invalid strategy name {name}. Must be one of {list(self.strategies)}')
+        return info
+
+    def get_heuristic(self, name: str) -> HeuristicInfo:
+        info = self.heuristics.get(name)
+        if info is None:
+            raise RuntimeError(f'Invalid Heuristic Function Name. Must be one of {list(self.heuristics)}')
+        return info
+
+    def get_strategy_class(self, name: str):
+        info = self.get_strategy(name)
+        return getattr(importlib.import_module(info.module), info.class_name)
+
+    def create(self, name: str, puzzle: Puzzle, heuristic: str = None, **options):
+        """
+        Creates the strategy for the puzzle. The heuristic is ignored by the strategies that don't use one,
+        and the options are passed on to the constructor.
+        """
+        strategy_class = self.get_strategy_class(name)
+        if heuristic and self.get_strategy(name).uses_heuristic:
+            return strategy_class(puzzle, heuristic=heuristic, **options)
+        return strategy_class(puzzle, **options)
+
+    def find_strategies(self, size: int = None, optimal: bool = None, memory_bounded: bool = None,
+                        parallel: bool = None) -> List[StrategyInfo]:
+        """The strategies with the given capabilities, fastest first"""
+        strategies = [info for info in self.strategies.values()
+                      if (size is None or info.supports(size)) and
+                      (optimal is None or info.optimal == optimal) and
+                      (memory_bounded is None or info.memory_bounded == memory_bounded) and
+                      (parallel is None or info.parallel == parallel)]
+        return sorted(strategies, key=lambda info: info.speed)
+
+    def strongest_heuristic(self, size: int) -> HeuristicInfo:
+        return max((info for info in self.heuristics.values() if info.supports(size)),
+                   key=lambda info: info.strength)
+
+    def fastest_optimal(self, size: int, memory_bounded: bool = None, parallel: bool = None):
+        """
+        Returns the name of the fastest optimal strategy for puzzles of the size, and the strongest heuristic
+        for that size when the strategy uses one (otherwise None)
+        """
+        strategies = self.find_strategies(size, optimal=True, memory_bounded=memory_bounded, parallel=parallel)
+        if not strategies:
+            raise RuntimeError(f'No optimal strategy for {size}x{size} puzzles')
+        info = strategies[0]
+        return info.name, self.strongest_heuristic(size).name if info.uses_heuristic else None
+
+    def create_fastest_optimal(self, puzzle: Puzzle, **options):
+        name, heuristic = self.fastest_optimal(puzzle.num_rows)
+        return self.create(name, puzzle, heuristic=heuristic, **options)
+
+
+registry = StrategyRegistry()
+
+_ALGORITHMS = 'fifteen_puzzle_solvers.services.algorithms.'
+
+# the breadth first searches keep every position they reach, which only fits in memory for 3x3 puzzles,
+# and A* runs out of memory on the harder 4x4 positions, where IDA* only keeps its current path. The distance table
+# of every 3x3 position answers those without a search.
+for _info in (
+        StrategyInfo(ASTAR, _ALGORITHMS + 'astar', 'AStar', optimal=True, memory_bounded=False, parallel=False,
+                     uses_heuristic=True, max_size=3, speed=1),
+        StrategyInfo(BREADTH_FIRST, _ALGORITHMS + 'breadth_first', 'BreadthFirst', optimal=True,
+                     memory_bounded=False, parallel=False, uses_heuristic=False, max_size=3, speed=6),
+        StrategyInfo(BIDIRECTIONAL_BREADTH_FIRST, _ALGORITHMS + 'bidirectional_breadth_first',
+                     'BidirectionalBreadthFirst', optimal=True, memory_bounded=False, parallel=False,
+                     uses_heuristic=False, max_size=3, speed=5),
+        StrategyInfo(IDA_STAR, _ALGORITHMS + 'ida_star', 'IDAStar', optimal=True, memory_bounded=True,
+                     parallel=False, uses_heuristic=True, max_size=None, speed=2),
+        StrategyInfo(PARALLEL_IDA_STAR, _ALGORITHMS + 'parallel_ida_star', 'ParallelIDAStar', optimal=True,
+                     memory_bounded=True, parallel=True, uses_heuristic=True, max_size=None, speed=3),
+        StrategyInfo(MEMORY_BOUNDED_ASTAR, _ALGORITHMS + 'memory_bounded_astar', 'MemoryBoundedAStar',
+                     optimal=False, memory_bounded=True, parallel=False, uses_heuristic=True, max_size=None,
+                     speed=3),
+        StrategyInfo(ANYTIME_ASTAR, _ALGORITHMS + 'anytime_astar', 'AnytimeAStar', optimal=True,
+                     memory_bounded=False, parallel=False, uses_heuristic=True, max_size=3, speed=4),
+        StrategyInfo(TABLE_LOOKUP, _ALGORITHMS + 'table_lookup', 'TableLookup', optimal=True, memory_bounded=True,
+                     parallel=False, uses_heuristic=False, max_size=3, speed=0),
+):
+    registry.register_strategy(_info)
+
+for _info in (
+        HeuristicInfo(HEURISTIC_MANHATTAN_DISTANCE, 'heuristic_manhattan_distance',
+                      'heuristic_manhattan_distance_delta', sizes=None, strength=1),
+        HeuristicInfo(HEURISTIC_MISPLACED, 'heuristic_misplaced', 'heuristic_misplaced_delta', sizes=None,
+                      strength=0),
+        HeuristicInfo(HEURISTIC_LINEAR_CONFLICT, 'heuristic_manhattan_linear_conflict',
+                      'heuristic_manhattan_linear_conflict_delta', sizes=None, strength=2),
+        HeuristicInfo(HEURISTIC_WALKING_DISTANCE, 'heuristic_walking_distance', 'heuristic_walking_distance_delta',
+                      sizes=tuple(range(2, WALKING_DISTANCE_MAX_SIZE + 1)), strength=2),
+        HeuristicInfo(HEURISTIC_TOTAL, 'heuristic_total', 'heuristic_total_delta', sizes=None, strength=3),
+        HeuristicInfo(HEURISTIC_PATTERN_DATABASE, 'heuristic_pattern_database', 'heuristic_pattern_database_delta',
+                      sizes=tuple(PATTERN_DATABASE_PARTITIONS), strength=4),
+):
+    registry.register_heuristic(_info)
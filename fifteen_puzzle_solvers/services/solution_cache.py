@@ -0,0 +1,176 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from fifteen_puzzle_solvers.domain import Puzzle, PuzzleEncoder, Solution
+from fifteen_puzzle_solvers.domain.puzzle import MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT
+from fifteen_puzzle_solvers.services.puzzle.storage import get_data_directory
+
+CACHE_FILE_NAME = 'solutions.sqlite'
+
+# the direction each move of the blank becomes on the transposed board
+TRANSPOSED_MOVES = str.maketrans({MOVE_UP: MOVE_LEFT, MOVE_LEFT: MOVE_UP, MOVE_DOWN: MOVE_RIGHT, MOVE_RIGHT: MOVE_DOWN})
+
+
+class SolutionCache:
+    """
+    Remembers optimal solutions, so that repeated positions are not searched again.
+
+    Positions are normalized under the symmetry of the end position: transposing the board and relabeling every
+    tile with the tile that belongs to its transposed place maps the end position to itself, and the moves of the
+    blank up/left and down/right to each other. A position and its transposition share one entry, which stores the
+    moves of the blank in the orientation of the normalized position.
+
+    Entries live in a LRU dictionary of max_entries positions, and in an optional sqlite file that is trimmed to
+    max_disk_bytes by dropping the least recently used entries.
+    """
+
+    def __init__(self, max_entries: int = 10000, path: str = None, max_disk_bytes: int = 64 * 2 ** 20):
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._disk_size = 0
+        if path is not None:
+            self._open()
+
+    @classmethod
+    def persistent(cls, max_entries: int = 10000, max_disk_bytes: int = 64 * 2 ** 20):
+        """A cache backed by a file in the data directory, shared by all the processes that use it"""
+        return cls(max_entries, os.path.join(get_data_directory(), CACHE_FILE_NAME), max_disk_bytes)
+
+    @property
+    def hits(self):
+        return self.memory_hits + self.disk_hits
+
+    def get(self, puzzle: Puzzle) -> Optional[Solution]:
+        """Returns the cached solution of the puzzle, or None when it is not cached"""
+        key, transposed = self._normalize(puzzle)
+        with self._lock:
+            moves = self._entries.get(key)
+            if moves is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+            else:
+                moves = self._load(key)
+                if moves is None:
+                    self.misses += 1
+                    return None
+                self.disk_hits += 1
+                self._remember(key, moves)
+
+        if transposed:
+            moves = moves.translate(TRANSPOSED_MOVES)
+        return Solution(puzzle, moves)
+
+    def put(self, puzzle: Puzzle, solution: Solution):
+        key, transposed = self._normalize(puzzle)
+        if not isinstance(solution, Solution):
+            solution = Solution.from_puzzles(solution)
+        moves = solution.moves
+        if transposed:
+            moves = moves.translate(TRANSPOSED_MOVES)
+        with self._lock:
+            self._remember(key, moves)
+            self._store(key, moves)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.execute('DELETE FROM solutions')
+                self._disk_size = 0
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _normalize(self, puzzle: Puzzle):
+        """
+        Returns the key of the puzzle and whether it is the key of the transposed puzzle
+        """
+        size = len(puzzle.position)
+        encoder = PuzzleEncoder.for_size(size)
+        state = encoder.encode(puzzle.position)
+        transposed_state = encoder.encode_tiles(transpose_tiles([tile for row in puzzle.position for tile in row]))
+        if transposed_state < state:
+            return f'{size}:{transposed_state:x}', True
+        return f'{size}:{state:x}', False
+
+    def _remember(self, key, moves):
+        self._entries[key] = moves
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS solutions '
+                                     '(key TEXT PRIMARY KEY, moves TEXT NOT NULL, last_used REAL NOT NULL)')
+        self._disk_size = self._connection.execute(
+            'SELECT COALESCE(SUM(LENGTH(key) + LENGTH(moves)), 0) FROM solutions').fetchone()[0]
+
+    def _load(self, key):
+        if self._connection is None:
+            return None
+        row = self._connection.execute('SELECT moves FROM solutions WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        with self._connection:
+            self._connection.execute('UPDATE solutions SET last_used = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+
+    def _store(self, key, moves):
+        if self._connection is None:
+            return
+        with self._connection:
+            previous = self._connection.execute('SELECT LENGTH(moves) FROM solutions WHERE key = ?',
+                                                (key,)).fetchone()
+            self._connection.execute('INSERT OR REPLACE INTO solutions (key, moves, last_used) VALUES (?, ?, ?)',
+                                     (key, moves, time.time()))
+        self._disk_size += len(moves) - previous[0] if previous else len(key) + len(moves)
+        if self._disk_size > self.max_disk_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Drops the least recently used entries until the file holds no more than 90% of its budget"""
+        excess = self._disk_size - self.max_disk_bytes * 9 // 10
+        keys = []
+        for key, size in self._connection.execute(
+                'SELECT key, LENGTH(key) + LENGTH(moves) FROM solutions ORDER BY last_used'):
+            if excess <= 0:
+                break
+            keys.append((key,))
+            excess -= size
+            self._disk_size -= size
+        with self._connection:
+            self._connection.executemany('DELETE FROM solutions WHERE key = ?', keys)
+
+
+def transpose_tiles(tiles: List[int]) -> List[int]:
+    """
+    Transposes the flat board and relabels every tile with the tile that belongs to its transposed place,
+    which keeps the end position unchanged
+    """
+    size = int(len(tiles) ** 0.5)
+    transposed = [0] * len(tiles)
+    for index, tile in enumerate(tiles):
+        row, column = divmod(index, size)
+        if tile:
+            goal_row, goal_column = divmod(tile - 1, size)
+            tile = goal_column * size + goal_row + 1
+        transposed[column * size + row] = tile
+    return transposed
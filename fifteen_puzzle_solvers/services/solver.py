@@ -1,4 +1,24 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from fifteen_puzzle_solvers.domain import Puzzle, Solution
 from fifteen_puzzle_solvers.services import PuzzleValidationService
+from fifteen_puzzle_solvers.services.algorithms.base import SearchProgress
+from fifteen_puzzle_solvers.services.solution_cache import SolutionCache
+
+
+class SolveResult(NamedTuple):
+    index: int  # position of the puzzle in the batch
+    solution: Solution
+    solution_length: int  # number of moves, -1 when no solution was found
+    num_expanded_nodes: int
+    wall_time: float
+    timed_out: bool
+    node_limit_reached: bool
+    error: Optional[str]
 
 
 class PuzzleSolver:
@@ -6,14 +26,33 @@ class PuzzleSolver:
     Executes different puzzle solver strategies (algorithms) and prints the solution and the performance
     """
 
-    def __init__(self, strategy):
+    def __init__(self, strategy, on_progress: Callable[[SearchProgress], None] = None,
+                 progress_interval: float = 0.5, cache: SolutionCache = None):
         self._strategy = strategy
         self.puzzle_validation_service = PuzzleValidationService()
+        self.cache = cache
+        self.cache_hit = False
+        self.progress = None  # latest progress of the search, only kept when there is an on_progress callback
+        self._on_progress = on_progress
+        if on_progress is not None:
+            strategy.add_progress_callback(self._update_progress, progress_interval)
 
     def run(self):
         if not self.puzzle_validation_service.is_solvable(self._strategy.start):
             raise RuntimeError('This puzzle is not solvable')
+
+        if self.cache is not None:
+            solution = self.cache.get(self._strategy.start)
+            self.cache_hit = solution is not None
+            if self.cache_hit:
+                self._strategy.solution = solution
+                self._strategy.num_expanded_nodes = 0
+                return
+
         self._strategy.solve_puzzle()
+        # only solutions proven optimal are cached, the best-effort ones of bounded searches are not
+        if self.cache is not None and self._strategy.solution and getattr(self._strategy, 'optimal', True):
+            self.cache.put(self._strategy.start, self._strategy.solution)
 
     def print_performance(self):
         print(f'{self._strategy} - Expanded Nodes: {self.get_num_expanded_nodes()}')
@@ -29,6 +68,87 @@ class PuzzleSolver:
     def get_solution(self):
         return self._strategy.solution
 
+    def _update_progress(self, progress: SearchProgress):
+        self.progress = progress
+        self._on_progress(progress)
+
     def stop(self):
         if hasattr(self._strategy, 'stop'):
-            self._strategy.stop()
\ No newline at end of file
+            self._strategy.stop()
+
+    @staticmethod
+    def solve_many(puzzles: Iterable[Puzzle], strategy, heuristic: str = None, workers: int = None,
+                   timeout: float = None, max_nodes: int = None) -> Iterator[SolveResult]:
+        """
+        Solves every puzzle with a new instance of the strategy class, spread over a pool of worker processes,
+        and yields the results in the order they finish. A search that runs longer than the timeout (in seconds),
+        or expands more than max_nodes nodes, is stopped and reported as timed out or over the node limit.
+        The puzzles are read as the workers free up, so they can come from an unbounded stream.
+        """
+        if workers == 1:
+            for index, puzzle in enumerate(puzzles):
+                yield _solve_instance(index, puzzle, strategy, heuristic, timeout, max_nodes)
+            return
+
+        max_pending = 2 * (workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for index, puzzle in enumerate(puzzles):
+                pending.add(executor.submit(_solve_instance, index, puzzle, strategy, heuristic, timeout, max_nodes))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in as_completed(pending):
+                yield future.result()
+
+
+def _solve_instance(index, puzzle, strategy, heuristic, timeout, max_nodes=None,
+                    is_cancelled: Callable[[], bool] = None) -> SolveResult:
+    timed_out = threading.Event()
+    node_limit_reached = threading.Event()
+
+    def on_progress(progress):
+        if progress.finished:
+            return
+        if max_nodes is not None and progress.expanded_nodes >= max_nodes:
+            node_limit_reached.set()
+            solver.stop()
+        elif is_cancelled is not None and is_cancelled():
+            solver.stop()
+
+    # The progress callback looks at the node limit and the cancellation every PROGRESS_CHECK_INTERVAL nodes,
+    # and Parallel IDA* every time a subtree of its frontier is done. Table Lookup reads its solution off a table
+    # without a search, so it has nothing to limit.
+    watched = max_nodes is not None or is_cancelled is not None
+    try:
+        solver = PuzzleSolver(strategy(puzzle, heuristic=heuristic) if heuristic else strategy(puzzle),
+                              on_progress=on_progress if watched else None, progress_interval=0)
+    except Exception as e:
+        # e.g. a strategy that does not support the size of the puzzle, which only fails this puzzle of the batch
+        return SolveResult(index=index, solution=Solution(), solution_length=-1, num_expanded_nodes=0, wall_time=0.0,
+                           timed_out=False, node_limit_reached=False, error=str(e))
+
+    def on_timeout():
+        timed_out.set()
+        solver.stop()
+
+    timer = threading.Timer(timeout, on_timeout) if timeout is not None else None
+    start_time = time.perf_counter()
+    error = None
+    if timer:
+        timer.start()
+    try:
+        solver.run()
+    except Exception as e:
+        # an error only fails the puzzle that raised it, the rest of the batch goes on
+        error = str(e) or type(e).__name__
+    finally:
+        if timer:
+            timer.cancel()
+    wall_time = time.perf_counter() - start_time
+
+    solution = solver.get_solution() or Solution()
+    return SolveResult(index=index, solution=solution, solution_length=len(solution) - 1 if solution else -1,
+                       num_expanded_nodes=solver.get_num_expanded_nodes(), wall_time=wall_time,
+                       timed_out=timed_out.is_set(), node_limit_reached=node_limit_reached.is_set(), error=error)
@@ -1,7 +1,33 @@
+import asyncio
+import contextlib
+import functools
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+from operator import getitem
+
 from fifteen_puzzle_solvers.domain.puzzle import Puzzle
+from fifteen_puzzle_solvers.domain.encoding import PuzzleEncoder
+from fifteen_puzzle_solvers.domain.solution import Solution
 from fifteen_puzzle_solvers.services.puzzle import PuzzleHeuristicService, PuzzleShuffleService, PuzzleValidationService
-from fifteen_puzzle_solvers.services.algorithms import AStar, BreadthFirst
+from fifteen_puzzle_solvers.services.puzzle import PatternDatabase, WalkingDistanceTable, BatchHeuristicService
+from fifteen_puzzle_solvers.services.puzzle import EndgameDatabase, DistanceTable, batch_heuristic
+from fifteen_puzzle_solvers.services.puzzle.storage import DATA_DIRECTORY_ENVIRONMENT_VARIABLE, PACKAGE_DATA_DIRECTORY
+from fifteen_puzzle_solvers.services.puzzle.constants import PATTERN_DATABASE_PARTITIONS
+from fifteen_puzzle_solvers.services.algorithms import AStar, BreadthFirst, BidirectionalBreadthFirst, IDAStar, ParallelIDAStar, \
+    MemoryBoundedAStar, AnytimeAStar, TranspositionTable
 from fifteen_puzzle_solvers.services.solver import PuzzleSolver
+from fifteen_puzzle_solvers.services.solution_cache import SolutionCache, transpose_tiles
+from fifteen_puzzle_solvers.services.generation import PuzzleGenerationService
+from fifteen_puzzle_solvers.services.external_breadth_first import ExternalBreadthFirst
+from fifteen_puzzle_solvers.services.registry import registry, StrategyInfo
+from fifteen_puzzle_solvers.cli import main as command_line_main
+from fifteen_puzzle_solvers.services.async_solver import AsyncPuzzleSolver, SolverBusyError
+from fifteen_puzzle_solvers.server import SolverServer
+from fifteen_puzzle_solvers.benchmark import scrambled_instances, run_benchmark, compare_results
 
 
 def test_generate_end_position():
@@ -53,6 +79,24 @@ def test_all_possible_moves():
                                   [12, 13, 14, 15]], "Failed to move tile down correctly"
 
 
+def test_packed_state_encoding():
+    puzzle = Puzzle([[1, 2, 3, 4], [5, 6, 0, 7], [8, 9, 10, 11], [12, 13, 14, 15]])
+    encoder = PuzzleEncoder.for_size(4)
+    state = encoder.encode(puzzle.position)
+    assert state < 2 ** 64, "Expected a 4x4 state to fit in 64 bits"
+    assert encoder.decode(state) == puzzle.position, "Failed to decode the packed state"
+    assert encoder.find_blank(state) == 6, f"Expected the blank at index 6, got {encoder.find_blank(state)}"
+    assert encoder.end_state == encoder.encode(Puzzle.generate_end_position(4)), "Unexpected packed end state"
+
+    moves = [encoder.decode(move_state) for move_state, _ in encoder.get_moves(state, 6)]
+    assert moves == [move.position for move in puzzle.get_moves()], "Packed moves should match Puzzle.get_moves"
+
+    position_5x5 = Puzzle.generate_end_position(5)
+    encoder_5x5 = PuzzleEncoder.for_size(5)
+    assert encoder_5x5.bits_per_tile == 5, f"Expected 5 bits per tile for 5x5, got {encoder_5x5.bits_per_tile}"
+    assert encoder_5x5.decode(encoder_5x5.encode(position_5x5)) == position_5x5, "Failed to round trip a 5x5 state"
+
+
 def test_heuristic_misplaced():
     end_position = Puzzle.generate_end_position(4)
 
@@ -73,6 +117,68 @@ def test_heuristic_manhattan_distance():
     assert distance == 27, f"Expected Manhattan distance of 27, got {distance}"
 
 
+def test_heuristic_linear_conflict():
+    puzzle = Puzzle([[3, 1, 2], [4, 5, 6], [7, 8, 0]])
+    conflict = PuzzleHeuristicService.heuristic_linear_conflict(puzzle.position)
+    assert conflict == 2, f"Expected 2 linear conflict moves, got {conflict}"
+
+    puzzle = Puzzle([[3, 2, 1], [4, 5, 6], [7, 8, 0]])
+    conflict = PuzzleHeuristicService.heuristic_linear_conflict(puzzle.position)
+    assert conflict == 4, f"Expected 4 linear conflict moves, got {conflict}"
+
+
+def test_heuristic_walking_distance():
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ[DATA_DIRECTORY_ENVIRONMENT_VARIABLE] = directory
+        try:
+            WalkingDistanceTable._tables.clear()
+            heuristic_service = PuzzleHeuristicService(Puzzle.generate_end_position(4))
+            end_position = Puzzle.generate_end_position(4)
+            assert heuristic_service.heuristic_walking_distance(end_position) == 0, "Expected no walking distance"
+            assert os.path.exists(WalkingDistanceTable.for_size(4).path), "The table should be cached to disk"
+
+            random.seed(5)
+            for _ in range(20):
+                position = PuzzleShuffleService.shuffle_puzzle(4).position
+                walking_distance = heuristic_service.heuristic_walking_distance(position)
+                manhattan_distance = heuristic_service.heuristic_manhattan_distance(position)
+                assert walking_distance >= manhattan_distance, "Walking distance should dominate manhattan distance"
+
+            WalkingDistanceTable._tables.clear()
+            assert heuristic_service.heuristic_walking_distance(position) == walking_distance, "Failed to load table"
+
+            # the heuristics have to stay admissible, the hardest 3x3 puzzle needs 31 moves
+            position = [[8, 6, 7], [2, 5, 4], [3, 0, 1]]
+            heuristic_service = PuzzleHeuristicService(Puzzle.generate_end_position(3))
+            for name in ['heuristic_manhattan_linear_conflict', 'heuristic_walking_distance', 'heuristic_total']:
+                assert getattr(heuristic_service, name)(position) <= 31, f"Expected {name} to be admissible"
+        finally:
+            del os.environ[DATA_DIRECTORY_ENVIRONMENT_VARIABLE]
+            WalkingDistanceTable._tables.clear()
+
+
+def test_heuristic_deltas():
+    random.seed(3)
+    encoder = PuzzleEncoder.for_size(4)
+    heuristic_service = PuzzleHeuristicService(Puzzle.generate_end_position(4))
+    puzzle = PuzzleShuffleService.shuffle_puzzle(4)
+    state, blank = encoder.encode(puzzle.position), encoder.find_blank(encoder.encode(puzzle.position))
+
+    for _ in range(200):
+        move_state, move_blank = random.choice(encoder.get_moves(state, blank))
+        tile = encoder.tile_at(move_state, blank)
+        for name in ['heuristic_misplaced', 'heuristic_manhattan_distance', 'heuristic_linear_conflict',
+                     'heuristic_manhattan_linear_conflict', 'heuristic_walking_distance', 'heuristic_total']:
+            heuristic = getattr(heuristic_service, name)
+            heuristic_delta = getattr(heuristic_service, name + '_delta')
+            expected = heuristic(encoder.decode(move_state)) - heuristic(encoder.decode(state))
+            delta = heuristic_delta(move_state, encoder.tile_at, tile, move_blank, blank)
+            assert delta == expected, f"Expected {name} delta of {expected}, got {delta}"
+            delta = heuristic_delta(encoder.decode_tiles(move_state), getitem, tile, move_blank, blank)
+            assert delta == expected, f"Expected {name} delta of {expected} on a flat board, got {delta}"
+        state, blank = move_state, move_blank
+
+
 def test_unsolvable_puzzle():
     puzzle = Puzzle([[1, 8, 2], [0, 4, 3], [7, 6, 5]])
     assert PuzzleValidationService._get_inversions_count(puzzle.position) == 10, "Expected 10 inversions"
@@ -114,11 +220,20 @@ def test_performance_low_complexity():
 
 
 def test_performance_mid_complexity():
-    puzzle_start = Puzzle([[1, 14, 3, 12], [8, 10, 11, 7], [9, 0, 5, 4], [15, 6, 13, 2]])
+    # A* expands 881204 nodes in about 45 seconds on the 51 move position [[1, 14, 3, 12], [8, 10, 11, 7],
+    # [9, 0, 5, 4], [15, 6, 13, 2]], so the baseline uses a 42 move position instead
+    puzzle_start = Puzzle([[1, 10, 9, 7], [14, 3, 8, 12], [11, 2, 0, 5], [13, 6, 4, 15]])
     s1 = PuzzleSolver(AStar(puzzle_start))
     s1.run()
+    assert s1.get_num_expanded_nodes() == 9560, f"Expected 9560 expanded nodes for A* with mid complexity, got {s1.get_num_expanded_nodes()}"
+    assert len(s1.get_solution()) == 43, f"Expected a 42 move solution, got {len(s1.get_solution()) - 1} moves"
+
+    # IDA* with the pattern databases that ship with the package is what the registry picks for 4x4 puzzles
+    s1 = PuzzleSolver(IDAStar(puzzle_start, heuristic='pattern_database'))
+    s1.run()
     s1.print_solution()
-    assert s1.get_num_expanded_nodes() == 277, f"Expected 277 expanded nodes for A* with mid complexity, got {s1.get_num_expanded_nodes()}"
+    assert s1.get_num_expanded_nodes() == 9366, f"Expected 9366 expanded nodes for IDA* with mid complexity, got {s1.get_num_expanded_nodes()}"
+    assert len(s1.get_solution()) == 43, f"Expected a 42 move solution, got {len(s1.get_solution()) - 1} moves"
 
 
 def test_performance_high_complexity():
@@ -126,7 +241,514 @@ def test_performance_high_complexity():
     s1 = PuzzleSolver(AStar(puzzle_start))
     s1.run()
     s1.print_solution()
-    assert s1.get_num_expanded_nodes() == 873, f"Expected 873 expanded nodes for A* with high complexity, got {s1.get_num_expanded_nodes()}"
+    assert s1.get_num_expanded_nodes() == 49756, f"Expected 49756 expanded nodes for A* with high complexity, got {s1.get_num_expanded_nodes()}"
+    assert len(s1.get_solution()) == 43, f"Expected a 42 move solution, got {len(s1.get_solution()) - 1} moves"
+
+
+def test_ida_star():
+    puzzle_start = Puzzle([[1, 2, 3, 4], [5, 6, 7, 8], [0, 10, 11, 12], [9, 13, 14, 15]])
+    s1 = PuzzleSolver(IDAStar(puzzle_start))
+    s1.run()
+    assert s1.get_num_expanded_nodes() == 4, f"Expected 4 expanded nodes for IDA*, got {s1.get_num_expanded_nodes()}"
+    assert s1.get_solution()[-1].position == Puzzle.generate_end_position(4), "IDA* should reach the end position"
+
+    puzzle_start = Puzzle([[1, 8, 2], [0, 4, 3], [7, 6, 5]])
+    s1 = PuzzleSolver(IDAStar(puzzle_start))
+    s1.run()
+    s2 = PuzzleSolver(BreadthFirst(puzzle_start))
+    s2.run()
+    assert len(s1.get_solution()) == len(s2.get_solution()), "IDA* should find the optimal solution"
+    assert s1._strategy.iteration_expanded_nodes[-1] <= s1.get_num_expanded_nodes(), "Unexpected iteration counts"
+    for current, following in zip(s1.get_solution(), s1.get_solution()[1:]):
+        assert following.position in [move.position for move in current.get_moves()], "Invalid move in solution"
+
+
+def test_parallel_ida_star():
+    puzzle_start = Puzzle([[1, 2, 3, 4], [5, 6, 7, 8], [0, 10, 11, 12], [9, 13, 14, 15]])
+    s1 = PuzzleSolver(ParallelIDAStar(puzzle_start, workers=2))
+    s1.run()
+    assert len(s1.get_solution()) == 5, f"Expected 5 states in the solution, got {len(s1.get_solution())}"
+
+    puzzle_start = Puzzle([[8, 6, 7], [2, 5, 4], [3, 0, 1]])
+    s1 = PuzzleSolver(ParallelIDAStar(puzzle_start, workers=2, frontier_size=50))
+    s1.run()
+    assert len(s1.get_solution()) == 32, f"Expected 32 states in the solution, got {len(s1.get_solution())}"
+    assert s1.get_solution()[-1].position == Puzzle.generate_end_position(3), "Expected to reach the end position"
+    for current, following in zip(s1.get_solution(), s1.get_solution()[1:]):
+        assert following.position in [move.position for move in current.get_moves()], "Invalid move in solution"
+
+    # the frontier is evaluated by the batch heuristics when NumPy is installed, one position at a time otherwise
+    s1 = PuzzleSolver(ParallelIDAStar(puzzle_start, heuristic='linear_conflict', workers=2, frontier_size=50))
+    s1.run()
+    assert len(s1.get_solution()) == 32, f"Expected 32 states in the solution, got {len(s1.get_solution())}"
+
+
+def test_bidirectional_breadth_first():
+    puzzle_start = Puzzle([[8, 1, 3], [4, 0, 2], [7, 6, 5]])
+    s1 = PuzzleSolver(BidirectionalBreadthFirst(puzzle_start))
+    s1.run()
+    s2 = PuzzleSolver(BreadthFirst(puzzle_start))
+    s2.run()
+    assert len(s1.get_solution()) == len(s2.get_solution()), "Bidirectional search should find the optimal solution"
+    assert s1.get_num_expanded_nodes() < s2.get_num_expanded_nodes(), "Expected fewer expanded nodes"
+    assert s1.get_solution()[0].position == puzzle_start.position, "The solution should start at the initial position"
+    assert s1.get_solution()[-1].position == Puzzle.generate_end_position(3), "The solution should reach the end"
+    for current, following in zip(s1.get_solution(), s1.get_solution()[1:]):
+        assert following.position in [move.position for move in current.get_moves()], "Invalid move in solution"
+
+
+def test_solve_many():
+    puzzles = [Puzzle([[1, 2, 3], [4, 5, 6], [0, 7, 8]]),
+               Puzzle([[8, 1, 3], [4, 0, 2], [7, 6, 5]]),
+               Puzzle([[2, 1, 3], [4, 5, 6], [7, 8, 0]])]
+    results = sorted(PuzzleSolver.solve_many(puzzles, AStar, heuristic='manhattan_distance', workers=2),
+                     key=lambda result: result.index)
+    assert [result.solution_length for result in results[:2]] == [2, 14], "Unexpected solution lengths"
+    assert all(result.num_expanded_nodes > 0 and result.wall_time > 0 for result in results[:2]), "Missing stats"
+    assert results[2].error == 'This puzzle is not solvable', "Expected the unsolvable puzzle to be reported"
+
+    puzzle = Puzzle([[1, 14, 3, 12], [8, 10, 11, 7], [9, 0, 5, 4], [15, 6, 13, 2]])
+    result = next(PuzzleSolver.solve_many([puzzle], BreadthFirst, workers=1, timeout=0.2))
+    assert result.timed_out and result.solution_length == -1, "Expected the search to be stopped by the timeout"
+
+    results = list(PuzzleSolver.solve_many([puzzle], registry.get_strategy_class('Table Lookup'), workers=1))
+    assert results[0].error and results[0].solution_length == -1, "Expected an error record for the 4x4 puzzle"
+
+    results = list(PuzzleSolver.solve_many([Puzzle([[1, 2, 3], [4, 5, 6], [0, 7, 8.0]])], AStar, workers=1))
+    assert results[0].error and results[0].solution_length == -1, "Expected an error record for the float tile"
+
+    # the node limit stops Parallel IDA* within an iteration, as the subtrees of its frontier are done
+    results = list(PuzzleSolver.solve_many([puzzle], functools.partial(ParallelIDAStar, workers=2), workers=1,
+                                           max_nodes=20000))
+    assert results[0].node_limit_reached and results[0].num_expanded_nodes < 100000, "Expected the node limit"
+
+
+def test_pattern_database():
+    with tempfile.TemporaryDirectory() as directory:
+        database = PatternDatabase(3, (1, 2, 3, 4), directory=directory)
+        end_cells = (0, 1, 2, 3)
+        assert database.lookup(end_cells) == 0, "Expected no cost for the pattern tiles in their end cells"
+        assert os.path.exists(database.path), "The pattern database should be saved on first use"
+        assert database.lookup((1, 0, 2, 3)) >= 1, "Swapped pattern tiles need at least one move"
+
+        loaded = PatternDatabase(3, (1, 2, 3, 4), directory=directory)
+        assert all(loaded.lookup(cells) == database.lookup(cells) for cells in [(0, 1, 2, 3), (8, 7, 6, 5), (4, 2, 0, 6)])
+
+        # the table of database stays mapped, so the costs are read before the file is cut short
+        costs = [database.lookup(cells) for cells in [(0, 1, 2, 3), (8, 7, 6, 5), (4, 2, 0, 6)]]
+        with open(database.path, 'r+b') as f:
+            f.truncate(database.file_size - 100)
+        truncated = PatternDatabase(3, (1, 2, 3, 4), directory=directory)
+        assert [truncated.lookup(cells) for cells in [(0, 1, 2, 3), (8, 7, 6, 5), (4, 2, 0, 6)]] == costs, \
+            "Expected a truncated table to be rebuilt"
+        assert os.path.getsize(database.path) == database.file_size, "Expected the rebuilt table to be saved"
+        assert all(os.path.dirname(PatternDatabase(4, tiles).path) == PACKAGE_DATA_DIRECTORY
+                   for tiles in PATTERN_DATABASE_PARTITIONS[4]), "Expected the 4x4 tables to ship with the package"
+
+        os.environ[DATA_DIRECTORY_ENVIRONMENT_VARIABLE] = directory
+        try:
+            PatternDatabase._databases.clear()
+            puzzle_start = Puzzle([[8, 6, 7], [2, 5, 4], [3, 0, 1]])
+            for strategy in [AStar, IDAStar]:
+                s1 = PuzzleSolver(strategy(puzzle_start, heuristic='pattern_database'))
+                s1.run()
+                assert len(s1.get_solution()) == 32, f"Expected a 31 move solution, got {len(s1.get_solution()) - 1}"
+
+            s2 = PuzzleSolver(AStar(puzzle_start, heuristic='manhattan_distance'))
+            s2.run()
+            assert s1.get_num_expanded_nodes() < s2.get_num_expanded_nodes(), "Expected fewer expanded nodes"
+        finally:
+            del os.environ[DATA_DIRECTORY_ENVIRONMENT_VARIABLE]
+            PatternDatabase._databases.clear()
+
+
+def test_benchmark():
+    instances = scrambled_instances(3, (8, 12), 1, seed=1)
+    assert [p.position for p in instances] == [p.position for p in scrambled_instances(3, (8, 12), 1, seed=1)], \
+        "Expected the same instances for the same seed"
+
+    results = run_benchmark({'scramble': instances}, [('A*', None)])
+    assert results[0]['solved'] == 2, f"Expected 2 solved instances, got {results[0]['solved']}"
+    assert all(0 < length <= 12 for length in results[0]['solution_lengths']), "Unexpected solution lengths"
+    assert compare_results(results, results) == [], "Expected no regressions against the same results"
+
+    slower = [dict(results[0], expanded_nodes=results[0]['expanded_nodes'] * 2)]
+    assert len(compare_results(results, slower)) == 1, "Expected the expanded nodes regression to be reported"
+
+
+def test_progress_callbacks():
+    updates = []
+    strategy = AStar(Puzzle([[8, 6, 7], [2, 5, 4], [3, 0, 1]]), heuristic='manhattan_distance')
+    strategy.enable_phase_timing()
+    s1 = PuzzleSolver(strategy, on_progress=updates.append, progress_interval=0)
+    s1.run()
+    assert len(updates) > 1 and updates[-1].finished, "Expected progress updates and a final one"
+    assert updates[-1] == s1.progress, "Expected the solver to keep the latest progress"
+    assert updates[-1].expanded_nodes == s1.get_num_expanded_nodes(), "Unexpected expanded nodes in the progress"
+    assert [u.expanded_nodes for u in updates] == sorted(u.expanded_nodes for u in updates), "Unexpected progress"
+    assert set(updates[-1].phase_times) == {'heuristic', 'move_generation', 'queue'}, "Expected timed phases"
+    assert updates[-1].memory_estimate > 0, "Expected a memory estimate"
+
+    s2 = PuzzleSolver(AStar(Puzzle([[8, 6, 7], [2, 5, 4], [3, 0, 1]])))
+    assert s2._strategy._progress_reporter() is None, "Expected no progress reports without callbacks"
+
+
+def test_memory_bounded_astar():
+    puzzle_start = Puzzle([[7, 10, 3, 4], [14, 0, 12, 8], [9, 2, 15, 6], [13, 5, 1, 11]])
+    s1 = PuzzleSolver(MemoryBoundedAStar(puzzle_start, max_nodes=50000))
+    s1.run()
+    assert len(s1.get_solution()) == 43, f"Expected 43 states in the solution, got {len(s1.get_solution())}"
+    assert s1._strategy.optimal and s1._strategy.num_evicted_nodes > 0, "Expected an optimal solution after evictions"
+
+    s2 = PuzzleSolver(MemoryBoundedAStar(puzzle_start, max_bytes=250 * 1000))
+    s2.run()
+    assert s2._strategy.max_nodes == 1000, f"Expected a budget of 1000 nodes, got {s2._strategy.max_nodes}"
+    assert not s2._strategy.optimal, "Expected a best-effort solution"
+    assert s2._strategy.lower_bound <= 42 < len(s2.get_solution()), "Unexpected solution bounds"
+    for current, following in zip(s2.get_solution(), s2.get_solution()[1:]):
+        assert following.position in [move.position for move in current.get_moves()], "Invalid move in solution"
+
+
+def test_anytime_astar():
+    puzzle_start = Puzzle([[8, 6, 7], [2, 5, 4], [3, 0, 1]])
+    strategy = AnytimeAStar(puzzle_start, weight=3)
+    published = []
+    strategy.add_solution_callback(published.append)
+    PuzzleSolver(strategy).run()
+    assert len(strategy.solution) == 32, f"Expected 32 states in the solution, got {len(strategy.solution)}"
+    assert strategy.suboptimality_bound == 1, "Expected the last solution to be proven optimal"
+    assert len(published) > 1 and published == strategy.solutions, "Expected every improvement to be published"
+    assert len(published[0].solution) > 32 and published[0].bound <= 3, "Expected a quick suboptimal first solution"
+    for solution in published:
+        assert len(solution.solution) - 1 <= 31 * solution.bound, "Solution outside of its suboptimality bound"
+
+    strategy = AnytimeAStar(Puzzle([[7, 10, 3, 4], [14, 0, 12, 8], [9, 2, 15, 6], [13, 5, 1, 11]]), deadline=0.2)
+    strategy.solve_puzzle()
+    assert strategy.solution and len(strategy.solution) - 1 <= 42 * strategy.suboptimality_bound, \
+        "Expected a bounded solution before the deadline"
+
+
+def test_solution_cache():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SolutionCache(max_entries=1, path=os.path.join(directory, 'solutions.sqlite'))
+        puzzle_start = Puzzle([[8, 6, 7], [2, 5, 4], [3, 0, 1]])
+        s1 = PuzzleSolver(AStar(puzzle_start), cache=cache)
+        s1.run()
+        assert not s1.cache_hit and cache.misses == 1, "Expected a cache miss for a new puzzle"
+
+        tiles = transpose_tiles([tile for row in puzzle_start.position for tile in row])
+        transposed = Puzzle([tiles[i:i + 3] for i in range(0, 9, 3)])
+        s2 = PuzzleSolver(AStar(transposed), cache=cache)
+        s2.run()
+        assert s2.cache_hit and s2.get_num_expanded_nodes() == 0, "Expected the transposed puzzle to hit the cache"
+        assert s2.get_solution()[0].position == transposed.position, "Expected the solution of the transposed puzzle"
+        assert len(s2.get_solution()) == 32, f"Expected 32 states in the solution, got {len(s2.get_solution())}"
+        for current, following in zip(s2.get_solution(), s2.get_solution()[1:]):
+            assert following.position in [move.position for move in current.get_moves()], "Invalid move in solution"
+
+        PuzzleSolver(AStar(Puzzle([[1, 2, 3], [4, 5, 6], [0, 7, 8]])), cache=cache).run()  # evicts from memory
+        cache.close()
+        cache = SolutionCache(path=os.path.join(directory, 'solutions.sqlite'))
+        assert len(cache.get(puzzle_start)) == 32 and cache.disk_hits == 1, "Expected a hit from the sqlite file"
+        cache.close()
+
+
+def test_solution():
+    puzzle_start = Puzzle([[1, 2, 3], [4, 0, 6], [7, 5, 8]])
+    solution = Solution(puzzle_start, 'DR')
+    assert len(solution) == 3, f"Expected 3 states in the solution, got {len(solution)}"
+    assert [p.position for p in solution] == [[[1, 2, 3], [4, 0, 6], [7, 5, 8]], [[1, 2, 3], [4, 5, 6], [7, 0, 8]],
+                                              [[1, 2, 3], [4, 5, 6], [7, 8, 0]]], "Unexpected replayed positions"
+    assert solution[-1].position == Puzzle.generate_end_position(3), "Expected the end position at the last index"
+    assert solution.blank_path == [7, 8], f"Unexpected blank path {solution.blank_path}"
+    assert Solution.from_puzzles(solution.to_list()) == solution, "Expected the same solution from its positions"
+    assert puzzle_start.move_blank('D').move_blank('R').position == solution[2].position, "Unexpected blank move"
+    assert not Solution() and len(Solution()) == 0, "Expected an empty solution"
+
+    s1 = PuzzleSolver(AStar(Puzzle([[8, 6, 7], [2, 5, 4], [3, 0, 1]])))
+    s1.run()
+    assert isinstance(s1.get_solution(), Solution) and len(s1.get_solution().moves) == 31, "Expected 31 moves"
+
+
+def test_instance_generation():
+    assert PuzzleValidationService._get_inversions_count([[8, 6, 7], [2, 5, 4], [3, 0, 1]]) == 24, \
+        "Unexpected inversions count"
+    generator = random.Random(7)
+    for _ in range(100):
+        assert PuzzleValidationService.is_solvable(PuzzleShuffleService.shuffle_puzzle(4, generator)), \
+            "The shuffled puzzle should be solvable"
+
+    puzzle = PuzzleGenerationService.random_walk(3, 20, generator)
+    s1 = PuzzleSolver(BidirectionalBreadthFirst(puzzle))
+    s1.run()
+    assert len(s1.get_solution()) == 21, f"Expected an optimal distance of 20, got {len(s1.get_solution()) - 1}"
+
+    puzzle = PuzzleGenerationService.random_walk_in_range(4, 10, 12, generator)
+    assert 10 <= PuzzleHeuristicService(Puzzle.generate_end_position(4)).heuristic_manhattan_distance(
+        puzzle.position) <= 12, "Expected the heuristic within the range"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'instances.bin')
+        PuzzleGenerationService.generate_file(path, 4, 1000, seed=3)
+        assert os.path.getsize(path) == 14 + 1000 * 8, f"Unexpected file size {os.path.getsize(path)}"
+        puzzles = [puzzle.position for puzzle in PuzzleGenerationService.read_file(path)]
+        PuzzleGenerationService.generate_file(path, 4, 1000, seed=3)
+        assert puzzles == [puzzle.position for puzzle in PuzzleGenerationService.read_file(path)], \
+            "Expected the same boards for the same seed"
+        assert all(PuzzleValidationService.is_solvable(Puzzle(position)) for position in puzzles), \
+            "Expected solvable boards"
+
+
+def skip_test(reason):
+    """Skips the running test under pytest, and reports the skip when the tests run as a script"""
+    if 'pytest' in sys.modules:
+        import pytest
+        pytest.skip(reason)
+    print(f'Skipped: {reason}')
+
+
+def test_batch_heuristics():
+    if not batch_heuristic.is_available():
+        skip_test('The batch heuristics need NumPy, install the numpy extra')
+        return
+
+    generator = random.Random(17)
+    for size in (3, 4, 5):
+        puzzle_heuristic_service = PuzzleHeuristicService(Puzzle.generate_end_position(size))
+        batch_service = BatchHeuristicService(size)
+        positions = [PuzzleShuffleService.shuffle_puzzle(size, generator).position for _ in range(200)]
+        positions.append(Puzzle.generate_end_position(size))
+        boards = batch_service.boards_from_positions(positions)
+        encoder = PuzzleEncoder.for_size(size)
+        assert (batch_service.boards_from_states([encoder.encode(position) for position in positions]) ==
+                boards).all(), "Expected the same boards from the packed positions"
+        assert batch_service.evaluate(boards, 'manhattan_distance').tolist() == \
+            [puzzle_heuristic_service.heuristic_manhattan_distance(position) for position in positions]
+        assert batch_service.evaluate(boards, 'misplaced').tolist() == \
+            [puzzle_heuristic_service.heuristic_misplaced(position) for position in positions]
+        assert batch_service.evaluate(boards, 'linear_conflict').tolist() == \
+            [puzzle_heuristic_service.heuristic_manhattan_linear_conflict(position) for position in positions]
+
+
+def test_strategy_registry():
+    assert registry.fastest_optimal(3) == ('Table Lookup', None), "Expected the distance table for 3x3 puzzles"
+    assert registry.fastest_optimal(4) == ('IDA*', 'pattern_database'), "Expected IDA* for 4x4 puzzles"
+    assert registry.fastest_optimal(5) == ('IDA*', 'total'), "Expected IDA* for 5x5 puzzles"
+    assert registry.fastest_optimal(3, parallel=True)[0] == 'Parallel IDA*', "Expected the parallel IDA*"
+    assert all(info.optimal for info in registry.find_strategies(optimal=True)), "Expected optimal strategies"
+
+    puzzle_start = Puzzle([[1, 2, 3], [4, 5, 6], [0, 7, 8]])
+    strategy = registry.create('Breadth First', puzzle_start, heuristic='misplaced')
+    assert isinstance(strategy, BreadthFirst), f"Expected a breadth first search, got {strategy}"
+    s1 = PuzzleSolver(registry.create_fastest_optimal(puzzle_start))
+    s1.run()
+    assert len(s1.get_solution()) == 3, f"Expected 3 states in the solution, got {len(s1.get_solution())}"
+
+    try:
+        registry.create('Unknown', puzzle_start)
+        assert False, "Expected an error for an unknown strategy"
+    except RuntimeError:
+        pass
+
+    registry.register_strategy(StrategyInfo('Test BFS', 'fifteen_puzzle_solvers.services.algorithms.breadth_first',
+                                            'BreadthFirst', optimal=True, memory_bounded=False, parallel=False,
+                                            uses_heuristic=False, max_size=2, speed=-1))
+    try:
+        assert registry.fastest_optimal(2) == ('Test BFS', None), "Expected the registered strategy"
+        assert registry.fastest_optimal(3)[0] == 'Table Lookup', "The registered strategy only supports 2x2 puzzles"
+    finally:
+        del registry.strategies['Test BFS']
+
+
+def test_command_line():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'boards.ndjson')
+        with open(path, 'w') as f:
+            f.write('[[1, 2, 3], [4, 5, 6], [0, 7, 8]]\n')
+            f.write('{"id": "hard", "tiles": [8, 6, 7, 2, 5, 4, 3, 0, 1]}\n')
+            f.write('[1, 2, 3]\n')
+            f.write('[1, 2, 3, 4, 5, 6, 0, 7, 8.0]\n')
+            f.write('[[1, 2, 3], [4, 5, 6], [7, 0, 8]]\n')
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            assert command_line_main(['solve', path, '--strategy', 'A*', '--heuristic', 'manhattan_distance']) == 0
+        results = {result['id']: result for result in map(json.loads, output.getvalue().splitlines())}
+        assert results[1]['moves'] == 'RR' and results[1]['length'] == 2, f"Unexpected result {results[1]}"
+        assert results['hard']['length'] == 31, f"Expected 31 moves, got {results['hard']['length']}"
+        assert 'error' in results[3], "Expected an error for the invalid board"
+        assert 'error' in results[4], "Expected an error for the float tile"
+        assert results[5]['moves'] == 'R', "Expected the boards after an invalid one to be solved"
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            command_line_main(['solve', path, '--strategy', 'A*', '--heuristic', 'misplaced', '--max-nodes', '2000'])
+        results = {result['id']: result for result in map(json.loads, output.getvalue().splitlines())}
+        assert results['hard']['node_limit_reached'] and results['hard']['length'] == -1, \
+            "Expected the search to stop at the node limit"
+
+
+def test_async_solver():
+    hard_puzzle = PuzzleShuffleService.shuffle_puzzle(4, random.Random(3))
+
+    async def run():
+        async with AsyncPuzzleSolver('A*', heuristic='manhattan_distance', workers=1, max_queued_jobs=1) as solver:
+            result = await solver.solve(Puzzle([[8, 6, 7], [2, 5, 4], [3, 0, 1]]))
+            assert result.solution_length == 31, f"Expected 31 moves, got {result.solution_length}"
+
+            # one running and one queued solve, the third one is rejected
+            tasks = [asyncio.ensure_future(solver.solve(hard_puzzle)) for _ in range(3)]
+            await asyncio.sleep(0.3)
+            assert tasks[2].done() and isinstance(tasks[2].exception(), SolverBusyError), "Expected a full queue"
+            assert solver.num_running_jobs == 1 and solver.num_queued_jobs == 1, "Expected one running solve"
+            for task in tasks[:2]:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.sleep(0.3)
+            assert solver.num_running_jobs == 0, "Expected the cancelled search to stop"
+
+            result = await solver.solve(hard_puzzle, timeout=0.2)
+            assert result.timed_out and result.solution_length == -1, "Expected the search to time out"
+
+            server = await SolverServer(solver).start('127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            body = json.dumps({'id': 'easy', 'tiles': [1, 2, 3, 4, 5, 6, 0, 7, 8]}).encode()
+            writer.write(b'POST /solve HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body) + body)
+            response = (await reader.read()).decode()
+            writer.close()
+            assert response.startswith('HTTP/1.1 200'), f"Unexpected response {response}"
+            assert json.loads(response.split('\r\n\r\n', 1)[1])['moves'] == 'RR', "Expected the solution"
+
+            requests = [json.dumps(dict(limits, tiles=[1, 2, 3, 4, 5, 6, 0, 7, 8])).encode()
+                        for limits in ({'timeout': '5'}, {'max_nodes': 'x'}, {'max_nodes': -1})]
+            requests = [b'POST /solve HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body) + body for body in requests]
+            body = b'{"tiles": [1, 2, 3, 4, 5, 6, 0, 7, 8.0]}'
+            requests += [b'POST /solve HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body) + body,
+                         b'POST /solve HTTP/1.1\r\nContent-Length: abc\r\n\r\n']
+            for request in requests:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(request)
+                response = (await reader.read()).decode()
+                writer.close()
+                assert response.startswith('HTTP/1.1 400'), f"Expected {request} to be rejected, got {response}"
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_move_tables():
+    encoder = PuzzleEncoder.for_size(4)
+    assert encoder.neighbours[0] == (1, 4) and encoder.neighbours[5] == (1, 6, 4, 9), "Unexpected blank moves"
+    puzzle = Puzzle([[1, 2, 3, 4], [5, 6, 0, 7], [8, 9, 10, 11], [12, 13, 14, 15]])
+    state, blank = puzzle.to_state(), 6
+    successors = encoder.get_successors(state, blank)
+    assert [(s, b) for s, _, b in successors] == encoder.get_moves(state, blank), "Expected the same moves"
+    assert [s for s, _, _ in successors] == [move.to_state() for move in puzzle.get_moves()], "Expected the moves"
+    assert [tile for _, tile, _ in successors] == [3, 7, 6, 10], "Expected the tiles that slide"
+    assert [b for _, _, b in encoder.get_successors(state, blank, previous_blank=2)] == [7, 5, 10], \
+        "Expected no move back to the previous blank"
+
+    assert not hasattr(puzzle, '__dict__'), "Expected a puzzle without an attribute dictionary"
+    assert puzzle.find_empty_tile() == (1, 2)
+    puzzle.position = puzzle.swap_tiles(1, 2, 1, 3)
+    assert puzzle.find_empty_tile() == (1, 3), "Expected the blank to follow the new position"
+
+
+def test_endgame_database():
+    with tempfile.TemporaryDirectory() as directory:
+        database = EndgameDatabase(4, 12, directory=directory)
+        encoder = database.encoder
+        assert database.lookup(encoder.end_state) == 0 and database.blank_path(encoder.end_state) == []
+        one_move = Puzzle([[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12], [13, 14, 0, 15]])
+        assert database.lookup(one_move.to_state()) == 1 and database.blank_path(one_move.to_state()) == [15]
+        assert os.path.exists(database.path), "The endgame database should be saved on first use"
+        far = PuzzleShuffleService.shuffle_puzzle(4, random.Random(4))
+        assert database.lookup(far.to_state()) is None, "Expected no distance beyond the depth"
+
+        shallow = PuzzleGenerationService.random_walk(4, 10, random.Random(1))
+        s1 = AStar(shallow, heuristic='manhattan_distance', endgame_database=database)
+        solution = s1.solve_puzzle()
+        assert s1.num_expanded_nodes == 0, "Expected a shallow position to be answered from the table"
+        assert len(solution) == len(AStar(shallow, heuristic='manhattan_distance').solve_puzzle())
+
+        deep = PuzzleGenerationService.random_walk(4, 30, random.Random(2))
+        for strategy in [AStar, IDAStar]:
+            s2 = strategy(deep, heuristic='linear_conflict', endgame_database=EndgameDatabase(4, 12, directory))
+            solution = s2.solve_puzzle()
+            assert len(solution) == len(IDAStar(deep, heuristic='linear_conflict').solve_puzzle()), \
+                f"Expected an optimal solution from {s2}"
+            assert solution[-1].position == Puzzle.generate_end_position(4), "Expected to reach the end position"
+
+
+def test_distance_table():
+    table = DistanceTable.for_size(3)
+    assert table.rank(range(9)) == 0 and table.rank(range(8, -1, -1)) == table.num_permutations - 1
+    assert table.lookup([1, 2, 3, 4, 5, 6, 7, 8, 0]) == 0
+    assert table.lookup([8, 6, 7, 2, 5, 4, 3, 0, 1]) == 31, "Expected one of the hardest 3x3 positions"
+    assert table.lookup([2, 1, 3, 4, 5, 6, 7, 8, 0]) is None, "Expected no distance for an unsolvable position"
+
+    puzzle_start = Puzzle([[8, 6, 7], [2, 5, 4], [3, 0, 1]])
+    s1 = PuzzleSolver(registry.create_fastest_optimal(puzzle_start))
+    s1.run()
+    assert len(s1.get_solution()) == 32, f"Expected a 31 move solution, got {len(s1.get_solution()) - 1}"
+    assert s1.get_solution()[-1].position == Puzzle.generate_end_position(3), "Expected to reach the end position"
+
+    with tempfile.TemporaryDirectory() as directory:
+        small_table = DistanceTable(2, directory=directory)
+        assert small_table.blank_path([0, 3, 2, 1]) == [1, 3, 2, 0, 1, 3], "Expected the 6 move solution"
+        assert os.path.exists(small_table.path), "Tables that don't ship with the package are built on first use"
+
+
+def test_transposition_table():
+    table = TranspositionTable(capacity=4)
+    assert table.offer(5, 3, -1) and table.get(5) == (3, -1, 1), "Expected a new open state without a parent"
+    assert not table.offer(5, 3, 2) and not table.offer(5, 4, 2), "Expected no path that is no shorter"
+    assert table.offer(5, 2, 7) and table.get(5) == (2, 7, 1), "Expected the shorter path"
+    assert not table.close(5, 3), "Expected a stale cost not to close the state"
+    assert table.close(5, 2) and not table.close(5, 2), "Expected the state to be closed once"
+    for state in range(6, 1006):
+        table.offer(state, state % 50, state % 16)
+    assert len(table) == 1001 and all(table.get(state)[0] == state % 50 for state in range(6, 1006)), \
+        "Expected every state to survive the growth of the table"
+    assert 5 in table and 1006 not in table and table.get(1006) is None
+    assert 0 < table.load_factor <= 0.75 and table.memory_usage == 12 * table.num_slots
+    try:
+        TranspositionTable(8 * 256, num_tiles=256)
+        assert False, "Expected an error for boards with more cells than the parent byte can index"
+    except RuntimeError:
+        pass
+
+    s1 = AStar(Puzzle([[8, 6, 7], [2, 5, 4], [3, 0, 1]]), heuristic='manhattan_distance')
+    assert len(s1.solve_puzzle()) == 32, "Expected a 31 move solution"
+    assert len(s1.transposition_table) > s1.num_expanded_nodes, "Expected the open positions in the table as well"
+
+
+def test_external_breadth_first():
+    with tempfile.TemporaryDirectory() as directory:
+        result = ExternalBreadthFirst(3, directory, chunk_size=1000).run(max_depth=12)
+        assert not result.complete and len(result.level_sizes) == 13, "Expected the sweep to stop at depth 12"
+        assert result.level_sizes[:4] == [1, 2, 4, 8], f"Unexpected level sizes {result.level_sizes}"
+
+        # an interrupted level leaves runs behind, which the resumed sweep discards
+        with open(os.path.join(directory, 'run-013-000000.bin'), 'wb') as f:
+            f.write(b'partial')
+        sweep = ExternalBreadthFirst(3, directory, chunk_size=1000)
+        result = sweep.run()
+        assert result.complete and sum(result.level_sizes) == 181440, "Expected every solvable 3x3 position"
+        assert len(result.level_sizes) == 32 and result.level_sizes[-1] == 2, "Expected two positions 31 moves away"
+        assert not any(name.startswith('run-') for name in os.listdir(directory)), "Expected the runs to be removed"
+        states = list(sweep.read_level(20))
+        assert states == sorted(set(states)) and len(states) == result.level_sizes[20], "Expected a sorted level"
+        assert all(DistanceTable.for_size(3).lookup([tile for row in puzzle.position for tile in row]) == 31
+                   for puzzle in sweep.hardest_positions(result)), "Expected the hardest positions"
+
+        # a checkpoint of the same number of other start positions is not resumed
+        other_start = Puzzle([[1, 2, 3], [4, 5, 6], [7, 0, 8]]).to_state()
+        try:
+            ExternalBreadthFirst(3, directory, chunk_size=1000, start_states=[other_start]).run()
+            assert False, "Expected an error for a sweep from other start positions"
+        except RuntimeError:
+            pass
 
 
 if __name__ == "__main__":
@@ -135,10 +757,35 @@ if __name__ == "__main__":
     test_swap()
     test_get_coordinates()
     test_all_possible_moves()
+    test_packed_state_encoding()
     test_heuristic_misplaced()
     test_heuristic_manhattan_distance()
+    test_heuristic_linear_conflict()
+    test_heuristic_walking_distance()
+    test_heuristic_deltas()
     test_unsolvable_puzzle()
     test_performance_low_complexity()
     test_performance_mid_complexity()
     test_performance_high_complexity()
+    test_ida_star()
+    test_parallel_ida_star()
+    test_bidirectional_breadth_first()
+    test_solve_many()
+    test_pattern_database()
+    test_benchmark()
+    test_progress_callbacks()
+    test_memory_bounded_astar()
+    test_anytime_astar()
+    test_solution_cache()
+    test_solution()
+    test_instance_generation()
+    test_batch_heuristics()
+    test_strategy_registry()
+    test_command_line()
+    test_async_solver()
+    test_move_tables()
+    test_endgame_database()
+    test_distance_table()
+    test_transposition_table()
+    test_external_breadth_first()
     print("Everything passed")
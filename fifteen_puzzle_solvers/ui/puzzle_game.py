@@ -1,10 +1,11 @@
 import tkinter as tk
 import threading
-from fifteen_puzzle_solvers.services.algorithms import AStar, BreadthFirst
+from fifteen_puzzle_solvers.domain import Solution
+from fifteen_puzzle_solvers.domain.puzzle import INVERSE_MOVES
 from fifteen_puzzle_solvers.services.solver import PuzzleSolver
 from fifteen_puzzle_solvers.services.puzzle.shuffle import PuzzleShuffleService
-from fifteen_puzzle_solvers.services.puzzle.constants import (
-    HEURISTIC_OPTIONS, HEURISTIC_TOTAL, ALGORITHM_OPTIONS, ASTAR)
+from fifteen_puzzle_solvers.services.puzzle.constants import HEURISTIC_TOTAL, ASTAR, FASTEST_OPTIMAL
+from fifteen_puzzle_solvers.services.registry import registry
 
 
 class PuzzleGame:
@@ -16,7 +17,7 @@ class PuzzleGame:
 
         self.puzzle_size = 4
         self.puzzle = PuzzleShuffleService.shuffle_puzzle(self.puzzle_size)
-        self.solution_steps = []
+        self.solution_steps = Solution()
         self.current_step = 0
         self.num_expanded_nodes = 0
         self.solver = None
@@ -51,15 +52,15 @@ class PuzzleGame:
                                         fg='#FFFFFF', bg='#2E2E2E')
         self.algorithm_label.grid(row=0, column=0, pady=5, padx=5, sticky='e')
 
-        self.algorithm_menu = tk.OptionMenu(self.controls_frame, self.selected_algorithm, *ALGORITHM_OPTIONS,
-                                            command=self.on_algorithm_change)
+        self.algorithm_menu = tk.OptionMenu(self.controls_frame, self.selected_algorithm, FASTEST_OPTIMAL,
+                                            *registry.strategies, command=self.on_algorithm_change)
         self.algorithm_menu.grid(row=0, column=1, pady=5, padx=5)
 
         self.heuristic_label = tk.Label(self.controls_frame, text='Select Heuristic:', font=('Helvetica', 12),
                                         fg='#FFFFFF', bg='#2E2E2E')
         self.heuristic_label.grid(row=1, column=0, pady=5, padx=5, sticky='e')
 
-        self.heuristic_menu = tk.OptionMenu(self.controls_frame, self.selected_heuristic, *HEURISTIC_OPTIONS)
+        self.heuristic_menu = tk.OptionMenu(self.controls_frame, self.selected_heuristic, *registry.heuristics)
         self.heuristic_menu.grid(row=1, column=1, pady=5, padx=5)
 
         self.solve_button = tk.Button(self.controls_frame, text='Solve', command=self.start_solve_puzzle, bg='#FFC107',
@@ -92,7 +93,8 @@ class PuzzleGame:
         self.create_tiles()
 
     def on_algorithm_change(self, value):
-        if value == 'A*':
+        # the fastest optimal strategy comes with the strongest heuristic for the puzzle size
+        if value != FASTEST_OPTIMAL and registry.get_strategy(value).uses_heuristic:
             self.heuristic_label.grid()
             self.heuristic_menu.grid()
         else:
@@ -139,13 +141,18 @@ class PuzzleGame:
         empty_i, empty_j = self.puzzle.find_empty_tile()
         if (abs(empty_i - i) == 1 and empty_j == j) or (abs(empty_j - j) == 1 and empty_i == i):
             self.puzzle.position = self.puzzle.swap_tiles(i, j, empty_i, empty_j)
+            if self.solution_steps:
+                # the steps of the solution are replayed move by move, they no longer apply to this position
+                self.solution_steps = Solution()
+                self.previous_button.grid_remove()
+                self.next_button.grid_remove()
             self.update_tiles()
             self.current_step += 1
             self.update_status_label()
 
     def shuffle_puzzle(self):
         self.puzzle = PuzzleShuffleService.shuffle_puzzle(self.puzzle_size)
-        self.solution_steps = []
+        self.solution_steps = Solution()
         self.current_step = 0
         self.num_expanded_nodes = 0
         self.update_tiles()
@@ -172,11 +179,12 @@ class PuzzleGame:
 
     def solve_puzzle(self):
         selected_algorithm = self.selected_algorithm.get()
-        if selected_algorithm == 'A*':
-            selected_heuristic = self.selected_heuristic.get() or HEURISTIC_TOTAL
-            self.solver = PuzzleSolver(AStar(self.puzzle, heuristic=selected_heuristic))
+        if selected_algorithm == FASTEST_OPTIMAL:
+            strategy = registry.create_fastest_optimal(self.puzzle)
         else:
-            self.solver = PuzzleSolver(BreadthFirst(self.puzzle))
+            strategy = registry.create(selected_algorithm, self.puzzle,
+                                       heuristic=self.selected_heuristic.get() or HEURISTIC_TOTAL)
+        self.solver = PuzzleSolver(strategy, on_progress=self.on_solve_progress)
 
         self.solver.run()
         self.solution_steps = self.solver.get_solution()
@@ -184,6 +192,17 @@ class PuzzleGame:
         self.current_step = 0
         self.master.after(0, self.on_solve_complete)
 
+    def on_solve_progress(self, progress):
+        # called from the solver thread, the label is updated from the Tk main loop
+        if progress.finished:
+            return
+        text = (f'Solving...\n'
+                f'Expanded Nodes: {progress.expanded_nodes} ({progress.nodes_per_second:.0f}/s)\n'
+                f'Open: {progress.open_nodes}  Closed: {progress.closed_nodes}\n'
+                f'Bound: {progress.f_bound if progress.f_bound is not None else "-"}  '
+                f'Memory: ~{progress.memory_estimate / 2 ** 20:.0f} MB')
+        self.master.after(0, lambda: self.status_label.config(text=text))
+
     def on_solve_complete(self):
         self.update_tiles()
         self.update_status_label()
@@ -196,13 +215,13 @@ class PuzzleGame:
     def previous_step(self):
         if self.current_step > 0:
             self.current_step -= 1
-            self.puzzle = self.solution_steps[self.current_step]
+            self.puzzle = self.puzzle.move_blank(INVERSE_MOVES[self.solution_steps.moves[self.current_step]])
             self.update_tiles()
             self.update_status_label()
 
     def next_step(self):
         if self.current_step < len(self.solution_steps) - 1:
+            self.puzzle = self.puzzle.move_blank(self.solution_steps.moves[self.current_step])
             self.current_step += 1
-            self.puzzle = self.solution_steps[self.current_step]
             self.update_tiles()
             self.update_status_label()
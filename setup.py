@@ -10,6 +10,9 @@ setup(
     long_description_content_type='text/markdown',
     url='https://github.com/MilanPecov/15-Puzzle-Solvers',
     packages=find_packages(include=['fifteen_puzzle_solvers', 'fifteen_puzzle_solvers.*']),
+    package_data={
+        'fifteen_puzzle_solvers.services.puzzle': ['data/*.bin'],
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
@@ -23,5 +26,13 @@ setup(
         'Topic :: Software Development :: Libraries :: Python Modules',
     ],
     keywords='15-puzzle sliding-game algorithms A* breadth-first search heuristics python path-finding',
-    python_requires='>=3.6',
+    python_requires='>=3.7',
+    extras_require={
+        'numpy': ['numpy'],
+    },
+    entry_points={
+        'console_scripts': [
+            'fifteen-puzzle=fifteen_puzzle_solvers.cli:main',
+        ],
+    },
 )